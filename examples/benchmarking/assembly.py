@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+## 
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ # 
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #  
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ # 
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  
+ # ###################################################################
+ ##
+
+"""
+Time the assembly of a transient, diffusion, convection and source
+equation on square `Grid2D` meshes of increasing size, with and without
+caching the sparsity pattern of the matrix (see
+:meth:`~fipy.terms.term.Term.cacheSparsityPattern`).
+
+Each sweep builds the matrix, converts it to its final form (CSR for the
+SciPy solvers) and forms the residual, but does not solve::
+
+    $ python examples/benchmarking/assembly.py --scipy --numberOfSweeps=10
+"""
+
+import time
+
+from fipy import Grid2D, CellVariable, TransientTerm, DiffusionTerm
+from fipy import ExponentialConvectionTerm, ImplicitSourceTerm, DummySolver
+from fipy.tools import numerix
+from fipy.tools.parser import parse
+
+sweeps = parse('--numberOfSweeps', action='store',
+               type='int', default=10)
+
+def assemblyTime(numberOfElements, cacheSparsityPattern):
+    N = int(numerix.sqrt(numberOfElements))
+    mesh = Grid2D(nx=N, ny=N)
+    var = CellVariable(mesh=mesh, value=mesh.x)
+    var.constrain(0., mesh.facesLeft)
+    
+    eq = (TransientTerm() 
+          == DiffusionTerm(coeff=1.) 
+          + ExponentialConvectionTerm(coeff=(1., 0.)) 
+          - ImplicitSourceTerm(coeff=var))
+    if cacheSparsityPattern:
+        eq.cacheSparsityPattern()
+        
+    solver = DummySolver()
+    
+    # the first sweep calculates the geometry of the mesh
+    # (and the sparsity pattern, if cached)
+    eq.justResidualVector(var, solver=solver, dt=1.)
+    
+    start = time.time()
+    for sweep in range(sweeps):
+        eq.justResidualVector(var, solver=solver, dt=1.)
+        
+    return (time.time() - start) / sweeps, N**2
+
+print "cells\tassembly / (s / sweep / cell)\tcached pattern / (s / sweep / cell)"
+
+for size in numerix.arange(2,6.5,0.5):
+    cpu, cells = assemblyTime(int(10**size), cacheSparsityPattern=False)
+    cachedCpu, cells = assemblyTime(int(10**size), cacheSparsityPattern=True)
+    
+    print "%d\t%g\t%g" % (cells, cpu / cells, cachedCpu / cells)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "boundaryConditionTable.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+from fipy.tools import vector
+from fipy.variables.variable import Variable
+from fipy.boundaryConditions.fixedValue import FixedValue
+from fipy.boundaryConditions.fixedFlux import FixedFlux
+from fipy.boundaryConditions.nthOrderBoundaryCondition import NthOrderBoundaryCondition
+
+def _buildsLike(bc, cls):
+    """Whether `bc` is a `cls` that has not overridden `cls._buildMatrix`"""
+    return (isinstance(bc, cls)
+            and type(bc)._buildMatrix.__func__ is cls._buildMatrix.__func__)
+
+def _concatenate(arrays, dtype):
+    if len(arrays) == 0:
+        return numerix.zeros((0,), dtype)
+    else:
+        return numerix.concatenate(arrays).astype(dtype)
+
+class _BoundaryConditionTable(object):
+    """The faces, cells and values of a set of boundary conditions,
+    gathered into single arrays, so that their contributions to a term
+    are made with one `addAt` and one `putAdd`, instead of with a
+    `SparseMatrix` for each boundary condition.
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=3)
+        >>> bcs = (FixedValue(faces=m.facesLeft, value=2.),
+        ...        FixedValue(faces=m.facesRight, value=Variable(3.)),
+        ...        FixedFlux(faces=m.facesRight, value=1.))
+        >>> table = _BoundaryConditionTable(bcs)
+        >>> print table.matches(bcs), table.matches(bcs[:2])
+        True False
+        >>> print table.valueFaceIDs, table.valueCellIDs, table.fluxCellIDs
+        [0 3] [0 2] [2]
+        >>> coeff = {'cell 1 diag': FaceVariable(mesh=m, value=-1.),
+        ...          'cell 1 offdiag': FaceVariable(mesh=m, value=1.)}
+        >>> for bc in bcs:
+        ...     bc._resetBoundaryConditionApplied()
+        >>> [(LL, bb)] = table._buildMatrices(DefaultSolver()._matrixClass, 3, 2, coeff)
+        >>> print LL.takeDiagonal()
+        [-1.  0. -1.]
+        >>> print bb
+        [-2.  0. -4.]
+
+    The same contributions are made by the boundary conditions one at a
+    time
+
+        >>> for bc in bcs:
+        ...     bc._resetBoundaryConditionApplied()
+        >>> L = DefaultSolver()._matrixClass(mesh=m)
+        >>> b = numerix.zeros((3,), 'd')
+        >>> for bc in bcs:
+        ...     LL, bb = bc._buildMatrix(DefaultSolver()._matrixClass, 3, 2, coeff)
+        ...     L += LL
+        ...     b += bb
+        >>> print L.takeDiagonal()
+        [-1.  0. -1.]
+        >>> print b
+        [-2.  0. -4.]
+
+    A `FixedFlux` only contributes once to an equation
+
+        >>> [(LL, bb)] = table._buildMatrices(DefaultSolver()._matrixClass, 3, 2, coeff)
+        >>> print bb
+        [-2.  0. -3.]
+
+    and subclasses that make their own contributions are still asked to
+
+        >>> class _Source(FixedFlux):
+        ...     def _buildMatrix(self, SparseMatrix, Ncells, MaxFaces, coeff):
+        ...         return (0, numerix.ones((Ncells,), 'd'))
+        >>> table = _BoundaryConditionTable(bcs[:1] + (_Source(faces=m.facesLeft, value=0.),))
+        >>> [(LL0, bb0), (LL1, bb1)] = table._buildMatrices(DefaultSolver()._matrixClass, 3, 2, coeff)
+        >>> print bb0, bb1
+        [-2.  0.  0.] [ 1.  1.  1.]
+    """
+    def __init__(self, boundaryConditions):
+        self.boundaryConditions = list(boundaryConditions)
+
+        self.fixedValues = [bc for bc in self.boundaryConditions if _buildsLike(bc, FixedValue)]
+        self.fixedFluxes = [bc for bc in self.boundaryConditions if _buildsLike(bc, FixedFlux)]
+        self.others = [bc for bc in self.boundaryConditions
+                       if bc not in self.fixedValues
+                       and bc not in self.fixedFluxes
+                       and not _buildsLike(bc, NthOrderBoundaryCondition)]
+
+        self.valueFaceIDs = _concatenate([numerix.nonzero(bc.faces.value)[0] for bc in self.fixedValues],
+                                         numerix.INT_DTYPE)
+        self.valueCellIDs = _concatenate([bc.adjacentCellIDs for bc in self.fixedValues],
+                                         numerix.INT_DTYPE)
+        self.fluxCellIDs = _concatenate([bc.adjacentCellIDs for bc in self.fixedFluxes],
+                                        numerix.INT_DTYPE)
+
+        if not [bc for bc in self.fixedValues if isinstance(bc.value, Variable)]:
+            self._values = self._getValues()
+        if not [bc for bc in self.fixedFluxes if isinstance(bc.contribution, Variable)]:
+            self._contributions = self._getContributions(self.fixedFluxes)
+
+    def matches(self, boundaryConditions):
+        return (len(boundaryConditions) == len(self.boundaryConditions)
+                and not [bc for bc, other in zip(boundaryConditions, self.boundaryConditions)
+                         if bc is not other])
+
+    def _getValues(self):
+        values = []
+        for bc in self.fixedValues:
+            faces = bc.faces.value
+            value = numerix.array(bc.value)
+            if value.shape == faces.shape:
+                value = value[faces]
+            values.append(value * numerix.ones((len(bc.adjacentCellIDs),)))
+        return _concatenate(values, float)
+
+    def _getContributions(self, fixedFluxes):
+        return _concatenate([numerix.array(bc.contribution) for bc in fixedFluxes], float)
+
+    def _addValueContributions(self, bb, coeff):
+        values = getattr(self, "_values", None)
+        if values is None:
+            values = self._getValues()
+        vector.putAdd(bb, self.valueCellIDs,
+                      -numerix.take(numerix.array(coeff['cell 1 offdiag']), self.valueFaceIDs, axis=-1) * values)
+
+    def _addFluxContributions(self, bb):
+        pending = [bc for bc in self.fixedFluxes if not bc.boundaryConditionApplied]
+        if len(pending) == len(self.fixedFluxes):
+            cellIDs = self.fluxCellIDs
+            contributions = getattr(self, "_contributions", None)
+            if contributions is None:
+                contributions = self._getContributions(pending)
+        else:
+            cellIDs = _concatenate([bc.adjacentCellIDs for bc in pending], numerix.INT_DTYPE)
+            contributions = self._getContributions(pending)
+        vector.putAdd(bb, cellIDs, -contributions)
+        for bc in pending:
+            bc.boundaryConditionApplied = True
+
+    def _buildMatrices(self, SparseMatrix, Ncells, MaxFaces, coeff):
+        """Return the (`LL`, `bb`) contributions of the boundary conditions
+
+        The contributions of `FixedValue` and `FixedFlux` conditions are
+        made in one scatter; any other condition is asked for its own.
+
+        :Parameters:
+          - `SparseMatrix`: Sparse matrix class to use
+          - `Ncells`:       Size of matrices
+          - `MaxFaces`:     bandwidth of **L**
+          - `coeff`:        contribution to adjacent cell diagonal and
+            **b**-vector by each exterior face
+        """
+        bb = numerix.zeros((Ncells,), 'd')
+
+        if len(self.fixedValues) > 0:
+            mesh = self.fixedValues[0].faces.mesh
+            LL = SparseMatrix(mesh=mesh, sizeHint=len(self.valueCellIDs), bandwidth=1)
+            LL.addAt(numerix.take(numerix.array(coeff['cell 1 diag']), self.valueFaceIDs, axis=-1),
+                     self.valueCellIDs, self.valueCellIDs)
+            self._addValueContributions(bb, coeff)
+        else:
+            LL = 0
+
+        self._addFluxContributions(bb)
+
+        return [(LL, bb)] + [bc._buildMatrix(SparseMatrix, Ncells, MaxFaces, coeff) for bc in self.others]
+
+    def _buildDiagonal(self, Ncells, coeff):
+        """Return the diagonal of the `LL` and the `bb` that
+        `_buildMatrices()` would return, without building a matrix
+
+            >>> from fipy import *
+            >>> m = Grid1D(nx=3)
+            >>> bcs = (FixedValue(faces=m.facesLeft, value=2.),
+            ...        FixedFlux(faces=m.facesRight, value=1.))
+            >>> coeff = {'cell 1 diag': FaceVariable(mesh=m, value=-1.),
+            ...          'cell 1 offdiag': FaceVariable(mesh=m, value=1.)}
+            >>> diagonal, bb = _BoundaryConditionTable(bcs)._buildDiagonal(3, coeff)
+            >>> print diagonal, bb
+            [-1.  0.  0.] [-2.  0. -1.]
+
+        Conditions that make their own contributions may not be diagonal
+
+            >>> class _Source(FixedFlux):
+            ...     def _buildMatrix(self, SparseMatrix, Ncells, MaxFaces, coeff):
+            ...         return (0, numerix.ones((Ncells,), 'd'))
+            >>> _BoundaryConditionTable((_Source(faces=m.facesLeft, value=0.),))._buildDiagonal(3, coeff)
+            Traceback (most recent call last):
+                ...
+            _NotDiagonalError: The matrix of the term is not diagonal.
+        """
+        if len(self.others) > 0:
+            from fipy.terms import _NotDiagonalError
+            raise _NotDiagonalError
+
+        diagonal = numerix.zeros((Ncells,), 'd')
+        bb = numerix.zeros((Ncells,), 'd')
+
+        if len(self.fixedValues) > 0:
+            vector.putAdd(diagonal, self.valueCellIDs,
+                          numerix.take(numerix.array(coeff['cell 1 diag']), self.valueFaceIDs, axis=-1))
+            self._addValueContributions(bb, coeff)
+
+        self._addFluxContributions(bb)
+
+        return diagonal, bb
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
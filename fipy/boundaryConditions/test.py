@@ -44,6 +44,7 @@ def _suite():
         docTestModuleNames = (
             'fipy.boundaryConditions.boundaryCondition',
             'fipy.boundaryConditions.fixedFlux',
+            'fipy.boundaryConditions.boundaryConditionTable',
         ))
     
 if __name__ == '__main__':
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "distributedScipyMatrix.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+from fipy.tools.comms.haloExchange import _HaloExchange
+
+class _DistributedScipyMatrix(object):
+    """The rows of a `_ScipyMeshMatrix` owned by this processor
+
+    Each processor assembles the matrix of its overlapping cells, but
+    only the rows of the cells it owns are complete. Those rows are kept
+    as a CSR block, with columns in the local overlapping numbering, and
+    vectors are distributed by the same non-overlapping ownership. A
+    product with the matrix first exchanges the ghost values of the vector
+    through the mesh's communicator.
+
+    >>> from fipy import *
+    >>> from fipy.matrices.scipyMatrix import _ScipyMeshMatrix
+    >>> m = Grid1D(nx=4)
+    >>> L = _ScipyMeshMatrix(mesh=m)
+    >>> L.addAt((2., -1., -1., 2., -1., -1., 2., -1., -1., 2.),
+    ...         (0, 0, 1, 1, 1, 2, 2, 2, 3, 3),
+    ...         (0, 1, 0, 1, 2, 1, 2, 3, 2, 3))
+    >>> A = _DistributedScipyMatrix(L)
+    >>> x = A.owned(numerix.array((1., 2., 3., 4.)))
+    >>> print A.matvec(x)
+    [ 0.  0.  0.  5.]
+    >>> print A.dot(x, x), A.norm(x)**2
+    30.0 30.0
+    >>> print A.localBlock.toarray()
+    [[ 2. -1.  0.  0.]
+     [-1.  2. -1.  0.]
+     [ 0. -1.  2. -1.]
+     [ 0.  0. -1.  2.]]
+
+    :Parameters:
+      - `matrix`: The local `_ScipyMeshMatrix`.
+    """
+    def __init__(self, matrix):
+        mesh = matrix.mesh
+        self.comm = mesh.communicator
+
+        numberOfVariables = matrix.numberOfVariables
+        blocks = numerix.arange(numberOfVariables)[..., numerix.newaxis]
+        localIDs = numerix.array(mesh._localNonOverlappingCellIDs, dtype=numerix.INT_DTYPE)
+        globalIDs = numerix.array(mesh._globalOverlappingCellIDs, dtype=numerix.INT_DTYPE)
+
+        # coupled variables are stacked in blocks of cells
+        overlappingIDs = (globalIDs + blocks * mesh.globalNumberOfCells).ravel()
+        ownedIDs = (globalIDs[localIDs] + blocks * mesh.globalNumberOfCells).ravel()
+
+        self.halo = _HaloExchange(self.comm, ownedIDs=ownedIDs, overlappingIDs=overlappingIDs)
+        self.matrix = matrix.matrix.tocsr()[self.halo.ownedIndices]
+
+    @property
+    def localBlock(self):
+        """The square block of the owned rows and columns, for
+        block-Jacobi preconditioning
+        """
+        return self.matrix[..., self.halo.ownedIndices]
+
+    def owned(self, overlapping):
+        """Return the owned entries of an `overlapping` vector
+        """
+        return self.halo.owned(overlapping)
+
+    def overlapping(self, owned):
+        """Return the overlapping vector whose owned entries are `owned`
+        """
+        return self.halo(owned)
+
+    def matvec(self, x):
+        """Multiply the owned vector `x`, returning the owned product
+        """
+        return self.matrix * self.halo(x)
+
+    def dot(self, a, b):
+        """The global inner product of the owned vectors `a` and `b`
+        """
+        return self.comm.sum(a * b)
+
+    def norm(self, a):
+        """The global L2 norm of the owned vector `a`
+        """
+        return numerix.sqrt(self.dot(a, a))
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -51,6 +51,13 @@ def OffsetSparseMatrix(SparseMatrix, numberOfVariables, numberOfEquations):
             SparseMatrix.__init__(self, mesh=mesh, bandwidth=bandwidth, sizeHint=sizeHint, 
                                   numberOfVariables=numberOfVariables, numberOfEquations=numberOfEquations) 
 
+        @classmethod
+        def _assemblyKey(cls):
+            # the class is rebuilt for every assembly of a coupled or
+            # vector equation, so identify it by what it builds
+            return (SparseMatrix._assemblyKey(), numberOfVariables, numberOfEquations,
+                    cls.equationIndex, cls.varIndex)
+
         def put(self, vector, id1, id2):
             SparseMatrix.put(self, vector, id1 + self.mesh.numberOfCells * self.equationIndex, id2 + self.mesh.numberOfCells * self.varIndex)
 
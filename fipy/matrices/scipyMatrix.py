@@ -42,6 +42,162 @@ from fipy.tools import numerix
 
 from fipy.matrices.sparseMatrix import _SparseMatrix
 
+class _ScipyStencil(object):
+    """Symbolic CSR structure of the contributions made by `addAt`.
+
+    The row indices `id1` and column indices `id2` are sorted once into
+    the `indices` and `indptr` arrays of a CSR matrix, along with the
+    nonzero slot that each contribution scatters into. Assembling a
+    matrix with new values then only sums the values into their slots.
+
+        >>> stencil = _ScipyStencil(shape=(3, 3), id1=[1, 0, 1, 2], id2=[2, 0, 2, 1])
+        >>> print stencil.scatter
+        [1 0 1 2]
+        >>> print stencil.values([1., 2., 3., 4.])
+        [ 2.  4.  4.]
+        >>> print stencil.asMatrix([1., 2., 3., 4.]).toarray()
+        [[ 2.  0.  0.]
+         [ 0.  0.  4.]
+         [ 0.  4.  0.]]
+
+    The union of two stencils scatters the nonzeros of the first,
+    followed by those of the second.
+
+        >>> other = _ScipyStencil(shape=(3, 3), id1=[0, 2], id2=[0, 0])
+        >>> print stencil.union(other).scatter
+        [0 1 3 0 2]
+    """
+    def __init__(self, shape, id1, id2):
+        self.shape = shape
+        self.id1 = numerix.array(id1, dtype=numerix.INT_DTYPE)
+        self.id2 = numerix.array(id2, dtype=numerix.INT_DTYPE)
+
+        rows, cols = shape
+        unique, self.scatter = numerix.unique(self.id1 * cols + self.id2, return_inverse=True)
+
+        # store the structure in the index type that scipy would pick
+        # anyway, so that it isn't rescanned on every assembly
+        if max(rows, cols, len(unique)) < 2**31:
+            dtype = numerix.int32
+        else:
+            dtype = numerix.int64
+        self.indices = (unique % max(cols, 1)).astype(dtype)
+        self.indptr = numerix.zeros((rows + 1,), dtype=dtype)
+        self.indptr[1:] = numerix.cumsum(numerix.bincount(unique // max(cols, 1), minlength=rows))
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def matches(self, shape, id1, id2):
+        return (shape == self.shape
+                and len(id1) == len(self.id1)
+                and numerix.array_equal(id1, self.id1)
+                and numerix.array_equal(id2, self.id2))
+
+    def values(self, vector):
+        """Sum `vector` into the nonzero slots of the stencil."""
+        return numerix.bincount(self.scatter, weights=numerix.asarray(vector, dtype=float), minlength=self.nnz)
+
+    def asMatrix(self, data):
+        """Wrap `values(vector)` of the stencil in a `csr_matrix`."""
+        return sp.csr_matrix((self.values(data), self.indices, self.indptr), shape=self.shape)
+
+    def _rows(self):
+        return numerix.repeat(numerix.arange(self.shape[0]), numerix.diff(self.indptr))
+
+    def union(self, other):
+        return _ScipyStencil(shape=self.shape,
+                             id1=numerix.concatenate((self._rows(), other._rows())),
+                             id2=numerix.concatenate((self.indices, other.indices)))
+
+class _ScipyCOOBuffer(object):
+    """Coordinate (COO) storage for deferred `addAt` calls.
+
+    The values of each contribution are copied when it is appended, as
+    the array they came from may be recalculated in place before the
+    buffer is summed. Contributions are only gathered into contiguous
+    `data`, `row` and `col` arrays when they are needed.
+
+        >>> buf = _ScipyCOOBuffer()
+        >>> buf.append([1., 2.], [0, 1], [1, 0])
+        >>> values = numerix.array([3.])
+        >>> buf.append(values, [0], [1])
+        >>> values[0] = 4.
+        >>> print len(buf), buf.data, buf.row, buf.col
+        3 [ 1.  2.  3.] [0 1 0] [1 0 1]
+
+    Appending another buffer shares its contributions, negated if
+    requested.
+
+        >>> other = _ScipyCOOBuffer()
+        >>> other.extend(buf, sign=-1)
+        >>> print other.data
+        [-1. -2. -3.]
+    """
+    def __init__(self):
+        self._chunks = []
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, vector, id1, id2):
+        self._chunks.append((numerix.array(vector, dtype=float),
+                             numerix.asarray(id1, dtype=numerix.INT_DTYPE),
+                             numerix.asarray(id2, dtype=numerix.INT_DTYPE)))
+        self._size += len(vector)
+
+    def extend(self, other, sign=1):
+        if sign == 1:
+            self._chunks.extend(other._chunks)
+        else:
+            self._chunks.extend([(sign * data, row, col) for data, row, col in other._chunks])
+        self._size += other._size
+
+    def coalesce(self):
+        """Sum the contributions made at identical positions.
+
+        Terms built on the same mesh scatter to the same face or cell
+        positions, so this usually leaves only a few contributions to
+        convert into a sparse matrix.
+
+            >>> buf = _ScipyCOOBuffer()
+            >>> buf.append([1., 2.], [0, 1], [0, 1])
+            >>> buf.append([3.], [0], [1])
+            >>> buf.append([4., 5.], [0, 1], [0, 1])
+            >>> buf.coalesce()
+            >>> print len(buf), buf.data, buf.row, buf.col
+            3 [ 5.  7.  3.] [0 1 0] [0 1 1]
+        """
+        chunks = []
+        for data, row, col in self._chunks:
+            for i, (data0, row0, col0) in enumerate(chunks):
+                if (len(row) == len(row0)
+                    and (row is row0 or numerix.array_equal(row, row0))
+                    and (col is col0 or numerix.array_equal(col, col0))):
+                    chunks[i] = (data0 + data, row0, col0)
+                    break
+            else:
+                chunks.append((data, row, col))
+        self._chunks = chunks
+        self._size = sum(len(data) for data, row, col in chunks)
+
+    def _gather(self, index, dtype):
+        if len(self._chunks) == 1:
+            return self._chunks[0][index]
+        gathered = numerix.empty((self._size,), dtype)
+        start = 0
+        for chunk in self._chunks:
+            stop = start + len(chunk[index])
+            gathered[start:stop] = chunk[index]
+            start = stop
+        return gathered
+
+    data = property(lambda s: s._gather(0, float))
+    row = property(lambda s: s._gather(1, numerix.INT_DTYPE))
+    col = property(lambda s: s._gather(2, numerix.INT_DTYPE))
+
 class _ScipyMatrix(_SparseMatrix):
     
     """class wrapper for a scipy sparse matrix.
@@ -49,8 +205,17 @@ class _ScipyMatrix(_SparseMatrix):
     `_ScipyMatrix` is always NxN.
     Allows basic python operations __add__, __sub__ etc.
     Facilitate matrix populating in an easy way.
+
+    Contributions from `addAt` and from other `_ScipyMatrix` objects
+    added in place are deferred in a `_ScipyCOOBuffer` and only summed
+    into the CSR `matrix` by `finalize()`, which happens automatically
+    the first time `matrix` is needed (e.g., by a solver).
     """
 
+    _sparsityPatterns = None
+    _stencil = None
+    _coo = None
+
     def __init__(self, matrix):
         """Creates a `_ScipyMatrix`.
 
@@ -59,6 +224,80 @@ class _ScipyMatrix(_SparseMatrix):
         """
         self.matrix = matrix
 
+    def _getMatrix(self):
+        if self._coo is not None:
+            self.finalize()
+        return self._matrix
+
+    def _setMatrix(self, matrix):
+        self._coo = None
+        self._matrix = matrix
+
+    def _delMatrix(self):
+        self._coo = None
+        del self._matrix
+
+    matrix = property(_getMatrix, _setMatrix, _delMatrix)
+
+    def finalize(self):
+        """Sum the deferred contributions into the CSR `matrix`.
+
+            >>> L = _ScipyMatrixFromShape(size=3)
+            >>> L.addAt([1., 2., 3.], [0, 1, 0], [0, 1, 0])
+            >>> print L._matrix.nnz, len(L._coo)
+            0 3
+            >>> L.finalize()
+            >>> print L._matrix.nnz, L._coo
+            2 None
+            >>> print L.takeDiagonal()
+            [ 4.  2.  0.]
+        """
+        coo, self._coo = self._coo, None
+        if coo is None or len(coo) == 0:
+            return
+
+        coo.coalesce()
+
+        if self._sparsityPatterns is not None:
+            stencil = self._getStencil(coo.row, coo.col)
+            self._addStencilValues(stencil, stencil.values(coo.data), stencil=self._currentStencil())
+        else:
+            temp = sp.coo_matrix((coo.data, (coo.row, coo.col)), shape=self._matrix.shape).tocsr()
+            if self._matrix.nnz == 0:
+                self._matrix = temp
+            else:
+                self._matrix = self._matrix + temp
+
+    def _getCOO(self):
+        if self._coo is None:
+            self._coo = _ScipyCOOBuffer()
+        return self._coo
+
+    def _appendMatrix(self, other, sign=1):
+        """Add the contributions of `other`, sharing any that it has
+        deferred rather than summing them.
+
+            >>> L = _ScipyMatrixFromShape(size=2)
+            >>> L.addAt([1., 2.], [0, 1], [0, 1])
+            >>> M = _ScipyMatrixFromShape(size=2)
+            >>> M += L
+            >>> print len(L._coo), len(M._coo)
+            2 2
+            >>> print M.takeDiagonal()
+            [ 1.  2.]
+        """
+        if (self._coo is None and other._coo is None
+            and self._matrix.nnz == 0 and sign == 1):
+            # adding a finalized matrix to an empty matrix is a copy
+            self._matrix = other._matrix.tocsr(copy=True)
+            return
+        if other._coo is not None:
+            self._getCOO().extend(other._coo, sign=sign)
+        if other._matrix.nnz > 0:
+            csr = other._matrix.tocsr()
+            rows = numerix.repeat(numerix.arange(csr.shape[0]), numerix.diff(csr.indptr))
+            self._getCOO().append(sign * csr.data, rows, csr.indices)
+
     def getCoupledClass(self):
         return _CoupledScipyMeshMatrix
     
@@ -76,7 +315,9 @@ class _ScipyMatrix(_SparseMatrix):
         return self._iadd(other)
 
     def _iadd(self, other, sign=1):
-        if hasattr(other, "matrix"):
+        if isinstance(other, _ScipyMatrix) and other._shape == self._shape:
+            self._appendMatrix(other, sign=sign)
+        elif hasattr(other, "matrix"):
             self.matrix = self.matrix + (sign * other.matrix)
         elif type(other) in [float, int]:
             fillVec = numerix.repeat(other, self.matrix.nnz)
@@ -186,7 +427,7 @@ class _ScipyMatrix(_SparseMatrix):
 
     @property
     def _shape(self):
-        return self.matrix.shape
+        return self._matrix.shape
 
     @property
     def _range(self):
@@ -252,9 +493,56 @@ class _ScipyMatrix(_SparseMatrix):
         """
         assert(len(id1) == len(id2) == len(vector))
 
-        temp = sp.csr_matrix((vector, (id1, id2)), self.matrix.shape)
-
-        self.matrix = self.matrix + temp
+        self._getCOO().append(vector, id1, id2)
+
+    @classmethod
+    def _withSparsityPatterns(cls, patterns):
+        key = ('class', cls)
+        if key not in patterns:
+            class _PatternedMatrix(cls):
+                _sparsityPatterns = patterns
+            patterns[key] = _PatternedMatrix
+        return patterns[key]
+
+    def _getStencil(self, id1, id2):
+        stencils = self._sparsityPatterns.setdefault(('addAt', len(id1)), [])
+        for stencil in stencils:
+            if stencil.matches(self._shape, id1, id2):
+                return stencil
+        stencil = _ScipyStencil(shape=self._shape, id1=id1, id2=id2)
+        stencils.append(stencil)
+        return stencil
+
+    def _currentStencil(self):
+        """The stencil of `self.matrix`, or `None` if its structure has changed."""
+        if self._stencil is not None:
+            stencil, indices, indptr = self._stencil
+            if self.matrix.indices is indices and self.matrix.indptr is indptr:
+                return stencil
+        return None
+
+    def _setStencilValues(self, stencil, data):
+        self.matrix = sp.csr_matrix((data, stencil.indices, stencil.indptr), shape=stencil.shape)
+        self._stencil = (stencil, self.matrix.indices, self.matrix.indptr)
+
+    def _addStencilValues(self, other, data, stencil=None):
+        """Add nonzero `data` laid out by the `other` stencil.
+
+        Only the value arrays are summed when `self.matrix` is empty or
+        follows `stencil`; the union of the two stencils is cached.
+        """
+        if self.matrix.nnz == 0:
+            self._setStencilValues(other, numerix.array(data))
+        elif stencil is other:
+            self._setStencilValues(other, self.matrix.data + data)
+        elif stencil is not None and self._sparsityPatterns is not None:
+            key = ('union', id(stencil), id(other))
+            if key not in self._sparsityPatterns:
+                self._sparsityPatterns[key] = stencil.union(other)
+            union = self._sparsityPatterns[key]
+            self._setStencilValues(union, union.values(numerix.concatenate((self.matrix.data, data))))
+        else:
+            self.matrix = self.matrix + sp.csr_matrix((data, other.indices, other.indptr), shape=other.shape)
 
     def addAtDiagonal(self, vector):
         if type(vector) in [type(1), type(1.)]:
@@ -273,6 +561,11 @@ class _ScipyMatrix(_SparseMatrix):
         """
         return self * x
 
+    @property
+    def linearOperator(self):
+        """The operator that scipy's iterative solvers multiply by."""
+        return self.matrix
+
     def __getitem__(self, indices):
         return self.matrix[indices]
 
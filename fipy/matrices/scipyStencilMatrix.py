@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "scipyStencilMatrix.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator
+
+from fipy.tools import numerix
+from fipy.matrices.scipyMatrix import _ScipyMatrix, _ScipyMeshMatrix
+
+def _bandSlices(offset, size):
+    """The rows and the columns of the entries `A[i, i + offset]` of an
+    NxN matrix `A`, as slices.
+
+        >>> print _bandSlices(2, 5)
+        (slice(0, 3, None), slice(2, 5, None))
+        >>> print _bandSlices(-1, 5)
+        (slice(1, 5, None), slice(0, 4, None))
+    """
+    if offset >= 0:
+        return slice(0, size - offset), slice(offset, size)
+    else:
+        return slice(-offset, size), slice(0, size + offset)
+
+class _StencilOperator(LinearOperator):
+    """Product of a matrix stored by stencil offset with a vector.
+
+    `bands[k][i]` holds `A[i, i + k]`. Each band multiplies a shifted,
+    contiguous view of the vector, so no sparse index arrays are stored
+    or traversed.
+
+        >>> A = _StencilOperator({0: numerix.array((2., 2., 2.)),
+        ...                       1: numerix.array((-1., -1., 0.)),
+        ...                       -1: numerix.array((0., -1., -1.))}, size=3)
+        >>> print A.matvec(numerix.array((1., 2., 3.)))
+        [ 0.  0.  4.]
+        >>> print A.tocsr().toarray()
+        [[ 2. -1.  0.]
+         [-1.  2. -1.]
+         [ 0. -1.  2.]]
+        >>> print A.rmatvec(numerix.array((1., 0., 0.)))
+        [ 2. -1.  0.]
+    """
+    def __init__(self, bands, size):
+        self.bands = bands
+        LinearOperator.__init__(self, dtype=numerix.dtype(float), shape=(size, size))
+
+    def _apply(self, x, transpose=False):
+        x = numerix.asarray(x).ravel()
+        N = self.shape[0]
+        y = numerix.zeros((N,), dtype=numerix.result_type(x, float))
+        scratch = numerix.empty_like(y)
+        for offset, band in self.bands.items():
+            rows, cols = _bandSlices(offset, N)
+            if transpose:
+                rows, cols = cols, rows
+                band = band[cols]
+            else:
+                band = band[rows]
+            numerix.multiply(band, x[cols], out=scratch[rows])
+            y[rows] += scratch[rows]
+        return y
+
+    def _matvec(self, x):
+        return self._apply(x)
+
+    def _rmatvec(self, x):
+        return self._apply(x, transpose=True)
+
+    def tocsr(self):
+        N = self.shape[0]
+        if len(self.bands) == 0:
+            return sp.csr_matrix((N, N))
+        offsets = sorted(self.bands.keys())
+        return sp.diags([self.bands[k][_bandSlices(k, N)[0]] for k in offsets],
+                        offsets, shape=(N, N), format='csr')
+
+class _ScipyStencilMatrix(_ScipyMeshMatrix):
+    """Banded `_ScipyMeshMatrix` for meshes with a fixed stencil.
+
+    On a `UniformGrid`, every cell couples to its neighbors at the same
+    offsets in cell ID, so the matrix is held as one band of coefficients
+    per offset (a diagonal, or DIA, layout). Assembly sums the face
+    coefficients straight into the bands, without sorting any indices.
+    The bands are applied to vectors through a `_StencilOperator`, and
+    the CSR `matrix` is only built, and then kept until the bands
+    change, when it is asked for, e.g., by a preconditioner.
+
+        >>> from fipy import *
+        >>> mesh = Grid2D(nx=3, ny=2)
+        >>> L = _ScipyStencilMatrix(mesh=mesh)
+        >>> L.addAt((1., 2., 3., 4.), (0, 1, 1, 4), (1, 1, 4, 3))
+        >>> L.addAtDiagonal(1.)
+        >>> print sorted(L.bands.keys())
+        [-1, 0, 1, 3]
+        >>> print L
+         1.000000   1.000000      ---        ---        ---        ---    
+            ---     3.000000      ---        ---     3.000000      ---    
+            ---        ---     1.000000      ---        ---        ---    
+            ---        ---        ---     1.000000      ---        ---    
+            ---        ---        ---     4.000000   1.000000      ---    
+            ---        ---        ---        ---        ---     1.000000  
+        >>> print L * numerix.arange(6.)
+        [  1.  15.   2.   3.  16.   5.]
+
+    The stencil of the terms of an equation gives the same matrix as
+    the assembled `_ScipyMeshMatrix`
+
+        >>> var = CellVariable(mesh=mesh, value=mesh.cellCenters[0])
+        >>> eq = (TransientTerm() == DiffusionTerm(coeff=1. + mesh.faceCenters[0])
+        ...       + PowerLawConvectionTerm(coeff=(1., 2.)))
+        >>> assembled = eq._buildAndAddMatrices(var=var, SparseMatrix=_ScipyMeshMatrix, dt=1.)[1]
+        >>> stencil = eq._buildAndAddMatrices(var=var, SparseMatrix=_ScipyStencilMatrix, dt=1.)[1]
+        >>> print isinstance(stencil, _ScipyStencilMatrix)
+        True
+        >>> print numerix.allclose(stencil.numpyArray, assembled.numpyArray)
+        True
+        >>> x = numerix.random.random(mesh.numberOfCells)
+        >>> print numerix.allclose(stencil * x, assembled * x)
+        True
+
+    and so does that of coupled equations, whose diagonal blocks are
+    offset from the diagonal of the matrix
+
+        >>> v0 = CellVariable(mesh=mesh, value=mesh.cellCenters[0])
+        >>> v1 = CellVariable(mesh=mesh, value=1.)
+        >>> eq0 = (TransientTerm(var=v0) == DiffusionTerm(coeff=1., var=v0)
+        ...        + ImplicitSourceTerm(coeff=2., var=v1))
+        >>> eq1 = (TransientTerm(coeff=3., var=v1) == DiffusionTerm(coeff=2., var=v1)
+        ...        - ImplicitSourceTerm(coeff=1., var=v0))
+        >>> coupled = eq0 & eq1
+        >>> coupledVar = coupled._verifyVar(None)
+        >>> assembled = coupled._buildAndAddMatrices(var=coupledVar, SparseMatrix=_ScipyMeshMatrix, dt=1.)[1]
+        >>> stencil = coupled._buildAndAddMatrices(var=coupledVar, SparseMatrix=_ScipyStencilMatrix, dt=1.)[1]
+        >>> print numerix.allclose(stencil.numpyArray, assembled.numpyArray)
+        True
+
+    The scipy solvers assemble this matrix for a `UniformGrid` when they
+    are asked to use its bands, with `matrixFree` or `banded`. Cached
+    sparsity patterns and deferred COO assembly do not apply to it
+
+        >>> from fipy.solvers.scipy import LinearGMRESSolver
+        >>> solver = LinearGMRESSolver(tolerance=1e-12)
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print isinstance(solver.matrix, _ScipyStencilMatrix)
+        False
+        >>> value = var.value.copy()
+
+    Matrix-free Krylov solvers use the stencil for the products of the
+    matrix with the residual
+
+        >>> var.value = mesh.cellCenters[0]
+        >>> solver = LinearGMRESSolver(tolerance=1e-12, matrixFree=True)
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print isinstance(solver.matrix, _ScipyStencilMatrix)
+        True
+        >>> print numerix.allclose(var, value)
+        True
+    """
+    def __init__(self, mesh, bandwidth=0, sizeHint=None, matrix=None, numberOfVariables=1, numberOfEquations=1, storeZeros=True):
+        """Creates a `_ScipyStencilMatrix` associated with a `Mesh`.
+
+        :Parameters:
+          - `mesh`: The `Mesh` to assemble the matrix for.
+          - `bandwidth`: The proposed band width of the matrix.
+          - `matrix`: The starting `spmatrix`, if any.
+          - `numberOfVariables`: The columns of the matrix is determined by numberOfVariables * self.mesh.numberOfCells.
+          - `numberOfEquations`: The rows of the matrix is determined by numberOfEquations * self.mesh.numberOfCells.
+          - `storeZeros`: Unused; the bands always store zeros.
+        """
+        self.mesh = mesh
+        self.numberOfVariables = numberOfVariables
+        assert numberOfEquations == self.numberOfVariables
+        self.size = self.numberOfVariables * self.mesh.numberOfCells
+        self.bands = {}
+        self._csr = None
+        if matrix is not None:
+            self.matrix = matrix
+
+    def _band(self, offset):
+        """The band at `offset`, which the caller is about to change"""
+        self._csr = None
+        band = self.bands.get(offset)
+        if band is None:
+            band = self.bands[offset] = numerix.zeros((self.size,), 'd')
+        return band
+
+    @property
+    def linearOperator(self):
+        return _StencilOperator(self.bands, self.size)
+
+    def _getMatrix(self):
+        if self._csr is None:
+            self._csr = self.linearOperator.tocsr()
+        return self._csr
+
+    def _setMatrix(self, matrix):
+        self.bands = {}
+        coo = sp.coo_matrix(matrix)
+        _ScipyStencilMatrix.addAt(self, coo.data, coo.row, coo.col)
+
+    def _delMatrix(self):
+        self.bands = {}
+        self._csr = None
+
+    matrix = property(_getMatrix, _setMatrix, _delMatrix)
+    _matrix = property(_getMatrix)
+
+    @property
+    def _shape(self):
+        return (self.size, self.size)
+
+    def finalize(self):
+        pass
+
+    def copy(self):
+        """A copy with its own bands, which keeps the banded layout
+
+            >>> from fipy import Grid1D
+            >>> L = _ScipyStencilMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAtDiagonal(2.)
+            >>> M = L.copy()
+            >>> M.addAtDiagonal(1.)
+            >>> print isinstance(M, _ScipyStencilMatrix), L.takeDiagonal(), M.takeDiagonal()
+            True [ 2.  2.  2.] [ 3.  3.  3.]
+            >>> print M.banded()
+            [[ 3.  3.  3.]]
+        """
+        other = _ScipyStencilMatrix(mesh=self.mesh, numberOfVariables=self.numberOfVariables,
+                                    numberOfEquations=self.numberOfVariables)
+        other.bands = dict((k, band.copy()) for k, band in self.bands.items())
+        return other
+
+    def _offsets(self, id1, id2):
+        """The distinct `id2 - id1` and a mask of the positions of each"""
+        offsets = id2 - id1
+        low = offsets.min()
+        present = numerix.nonzero(numerix.bincount(offsets - low))[0] + low
+        if len(present) == 1:
+            return [(present[0], slice(None))]
+        else:
+            return [(k, offsets == k) for k in present]
+
+    def addAt(self, vector, id1, id2):
+        """
+        Add elements of `vector` to the positions in the matrix corresponding to (`id1`,`id2`)
+
+            >>> from fipy import Grid1D
+            >>> L = _ScipyStencilMatrix(mesh=Grid1D(nx=3))
+            >>> L.put([3.,10.,numerix.pi,2.5], [0,0,1,2], [2,1,1,0])
+            >>> L.addAt([1.73,2.2,8.4,3.9,1.23], [1,2,0,0,1], [2,2,0,0,2])
+            >>> print L
+            12.300000  10.000000   3.000000  
+                ---     3.141593   2.960000  
+             2.500000      ---     2.200000  
+        """
+        assert(len(id1) == len(id2) == len(vector))
+        if len(vector) == 0:
+            return
+
+        vector = numerix.asarray(vector, dtype=float)
+        id1 = numerix.asarray(id1, dtype=numerix.INT_DTYPE)
+        id2 = numerix.asarray(id2, dtype=numerix.INT_DTYPE)
+        for offset, mask in self._offsets(id1, id2):
+            # the same position may be added to more than once
+            self._band(offset)[:] += numerix.bincount(id1[mask], weights=vector[mask],
+                                                      minlength=self.size)
+
+    def put(self, vector, id1, id2):
+        assert(len(id1) == len(id2) == len(vector))
+        if len(vector) == 0:
+            return
+
+        vector = numerix.asarray(vector, dtype=float)
+        id1 = numerix.asarray(id1, dtype=numerix.INT_DTYPE)
+        id2 = numerix.asarray(id2, dtype=numerix.INT_DTYPE)
+        for offset, mask in self._offsets(id1, id2):
+            self._band(offset)[id1[mask]] = vector[mask]
+
+    def addAtDiagonal(self, vector):
+        """
+        Add `vector` along the diagonal. Like `_ScipyMatrix`, this goes
+        through `addAt()`, so that the blocks of coupled equations land
+        where an `OffsetSparseMatrix` puts them
+
+            >>> from fipy import Grid1D
+            >>> from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
+            >>> SparseMatrix = OffsetSparseMatrix(SparseMatrix=_ScipyStencilMatrix,
+            ...                                   numberOfVariables=2, numberOfEquations=2)
+            >>> SparseMatrix.equationIndex = 1
+            >>> SparseMatrix.varIndex = 0
+            >>> L = SparseMatrix(mesh=Grid1D(nx=2))
+            >>> L.addAtDiagonal((1., 2.))
+            >>> L.addAtDiagonal(3.)
+            >>> print L.numpyArray
+            [[ 0.  0.  0.  0.]
+             [ 0.  0.  0.  0.]
+             [ 4.  0.  0.  0.]
+             [ 0.  5.  0.  0.]]
+        """
+        if type(vector) in [type(1), type(1.)]:
+            vector = numerix.repeat(vector, self._shape[0])
+
+        ids = numerix.arange(len(vector))
+        self.addAt(vector, ids, ids)
+
+    def putDiagonal(self, vector):
+        if type(vector) in [type(1), type(1.)]:
+            vector = numerix.repeat(vector, self._shape[0])
+
+        ids = numerix.arange(len(vector))
+        self.put(vector, ids, ids)
+
+    def takeDiagonal(self):
+        if 0 in self.bands:
+            return self.bands[0].copy()
+        else:
+            return numerix.zeros((self.size,), 'd')
+
+    @property
+    def bandwidths(self):
+        """The numbers of bands below and above the diagonal"""
+        offsets = [k for k, band in self.bands.items() if band.any()] or [0]
+        return max(0, -min(offsets)), max(0, max(offsets))
+
+    def banded(self, lower=None, upper=None):
+        """The bands in the LAPACK layout used by `scipy.linalg.solve_banded`
+        and the `gbtrf` factorization, with `A[i, j]` at
+        `ab[upper + i - j, j]`.
+
+            >>> from fipy import Grid1D
+            >>> L = _ScipyStencilMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAt((-1., -1., -1., -1.), (0, 1, 1, 2), (1, 0, 2, 1))
+            >>> L.addAtDiagonal(2.)
+            >>> print L.bandwidths
+            (1, 1)
+            >>> print L.banded()
+            [[ 0. -1. -1.]
+             [ 2.  2.  2.]
+             [-1. -1.  0.]]
+            >>> from scipy.linalg import solve_banded
+            >>> print solve_banded(L.bandwidths, L.banded(), (1., 0., 1.))
+            [ 1.  1.  1.]
+
+        Extra rows above the matrix, which `gbtrf` needs to hold the
+        fill-in of pivoting, are left empty if `upper` is larger than the
+        upper bandwidth.
+
+        :Parameters:
+          - `lower`: The number of bands to store below the diagonal.
+          - `upper`: The number of rows to store above the diagonal.
+        """
+        l, u = self.bandwidths
+        lower = max(lower or 0, l)
+        upper = max(upper or 0, u)
+        ab = numerix.zeros((lower + upper + 1, self.size), 'd')
+        for offset, band in self.bands.items():
+            if -lower <= offset <= upper:
+                rows, cols = _bandSlices(offset, self.size)
+                ab[upper - offset, cols] = band[rows]
+        return ab
+
+    def _iadd(self, other, sign=1):
+        if isinstance(other, _ScipyStencilMatrix) and other._shape == self._shape:
+            for offset, band in other.bands.items():
+                if sign == 1:
+                    self._band(offset)[:] += band
+                else:
+                    self._band(offset)[:] -= band
+        elif isinstance(other, _ScipyMatrix) and other._shape == self._shape:
+            coo = other.matrix.tocoo()
+            # the entries of `other` are already in place, so bypass any
+            # `OffsetSparseMatrix` shift
+            _ScipyStencilMatrix.addAt(self, sign * coo.data, coo.row, coo.col)
+        else:
+            _ScipyMeshMatrix._iadd(self, other, sign=sign)
+
+        return self
+
+    def __add__(self, other):
+        if isinstance(other, _ScipyMatrix):
+            return self.copy()._iadd(other)
+        else:
+            return _ScipyMeshMatrix.__add__(self, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, _ScipyMatrix):
+            return self.copy()._iadd(other, sign=-1)
+        else:
+            return _ScipyMeshMatrix.__sub__(self, other)
+
+    def __mul__(self, other):
+        shape = numerix.shape(other)
+        if isinstance(other, _ScipyMatrix):
+            return _ScipyMeshMatrix.__mul__(self, other)
+        elif shape == ():
+            product = self.copy()
+            for band in product.bands.values():
+                band *= other
+            return product
+        elif shape == (self.size,):
+            return self.linearOperator.matvec(other)
+        else:
+            raise TypeError
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -61,6 +61,12 @@ class _SparseMatrix(object):
         else: 
             return NotImplemented
     
+    @classmethod
+    def _assemblyKey(cls):
+        """Identifies the matrices built by this class, so that a `Term`
+        can tell when it may reuse one that it assembled before."""
+        return cls
+
     def copy(self):
         pass
         
@@ -150,6 +156,16 @@ class _SparseMatrix(object):
     def addAtDiagonal(self, vector):
         pass
 
+    @classmethod
+    def _withSparsityPatterns(cls, patterns):
+        """Return a matrix class that records its sparsity patterns in the
+        `patterns` dictionary and reuses them on later assemblies.
+
+        Matrix packages that cannot exploit a known sparsity pattern
+        return themselves.
+        """
+        return cls
+
     def exportMmf(self, filename):
         pass
         
@@ -43,7 +43,7 @@ if solver == 'trilinos':
 elif solver == 'no-pysparse':
     docTestModuleNames = ('trilinosMatrix',)
 elif solver == 'scipy' or solver == 'pyamg':
-    docTestModuleNames = ('scipyMatrix',)
+    docTestModuleNames = ('scipyMatrix', 'scipyStencilMatrix', 'distributedScipyMatrix')
 elif solver == 'pysparse':
     docTestModuleNames = ('pysparseMatrix',)
 else:
@@ -5,6 +5,7 @@ from fipy.meshes.periodicGrid3D import *
 from fipy.meshes.skewedGrid2D import *
 from fipy.meshes.tri2D import *
 from fipy.meshes.gmshMesh import *
+from fipy.meshes.meshTransfer import *
 
 __all__ = []
 __all__.extend(factoryMeshes.__all__)
@@ -14,4 +15,5 @@ __all__.extend(periodicGrid3D.__all__)
 __all__.extend(skewedGrid2D.__all__)
 __all__.extend(tri2D.__all__)
 __all__.extend(gmshMesh.__all__)
+__all__.extend(meshTransfer.__all__)
 
@@ -91,7 +91,41 @@ class AbstractMesh(object):
 
     def getNearestCell(self, point):
         return self._getCellsByID([self._getNearestCellID(point)])[0]
-                  
+
+    def _getContainingCellID(self, points):
+        """Return the IDs of the cells that contain `points`
+
+        Points outside of the mesh are assigned to the nearest cell. On a
+        grid, the nearest cell center always belongs to the containing cell.
+        """
+        return self._getNearestCellID(points)
+
+    def _getInterpolator(self, points):
+        """Return a reusable `_CellInterpolator` from the cells of this mesh
+        to `points`
+        """
+        from fipy.meshes.pointLocator import _CellInterpolator
+        return _CellInterpolator(mesh=self, points=points)
+
+    def getTransfer(self, destination, conservative=False):
+        """Return a reusable `MeshTransfer` of cell values from this mesh
+        to the cells of `destination`
+
+        :Parameters:
+          - `destination`: The mesh to transfer the values to
+          - `conservative`: Whether to preserve integrals rather than
+            interpolate linearly
+
+        >>> from fipy import *
+        >>> coarse = Grid1D(nx=4, dx=1.)
+        >>> fine = Grid1D(nx=8, dx=.5)
+        >>> print numerix.allclose(coarse.getTransfer(fine)(coarse.x), fine.x) # doctest: +SCIPY
+        True
+        """
+        from fipy.meshes.meshTransfer import MeshTransfer
+        return MeshTransfer(source=self, destination=destination,
+                            conservative=conservative)
+
     def _getCellFaceIDsInternal(self):
         return self._cellFaceIDs
 
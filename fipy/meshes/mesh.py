@@ -359,6 +359,8 @@ class Mesh(AbstractMesh):
         self._setScaledValues() 
 
     def _setScaledValues(self):
+        self._cellCenterTree = None
+        self._pointLocator = None
         self._scaledFaceAreas = self._scale['area'] * self._faceAreas
         self._scaledCellVolumes = self._scale['volume'] * self._cellVolumes
         self._scaledCellCenters = self._scale['length'] * self._cellCenters
@@ -567,6 +569,8 @@ class Mesh(AbstractMesh):
 
 
     """scaling"""
+
+    _cellCenterTree = None
     
     def _getNearestCellID(self, points):
         """
@@ -577,9 +581,55 @@ class Mesh(AbstractMesh):
            >>> m1 = Grid2D(nx=2, ny=2, dx=5., dy=5.)
            >>> print m0._getNearestCellID(m1.cellCenters.globalValue)
            [4 5 7 8]
+
+        The spatial index over the cell centers is built on first use and
+        reused by subsequent queries
+        
+           >>> tree = m0._cellCenterTree
+           >>> print m0._getNearestCellID(((0., 20.), (0., 20.)))
+           [0 8]
+           >>> m0._cellCenterTree is tree
+           True
            
         """
-        return numerix.nearest(data=self.cellCenters.globalValue, points=points)
+        if self._cellCenterTree is None:
+            self._cellCenterTree = numerix._NearestTree(self.cellCenters.globalValue)
+        return self._cellCenterTree.query(points)
+
+    _pointLocator = None
+
+    def _getContainingCellID(self, points):
+        """
+        Unlike the nearest cell center, the containing cell of a point
+        near a skewed face is not always obvious
+        
+           >>> from fipy import *
+           >>> from fipy.meshes.mesh2D import Mesh2D
+           >>> m = Mesh2D(vertexCoords=numerix.array(((0., 4., 0., 4.), (0., 0., 1., 1.))),
+           ...            faceVertexIDs=numerix.array(((0, 1, 2, 1, 3), (1, 2, 0, 3, 2))),
+           ...            cellFaceIDs=numerix.array(((0, 1), (1, 3), (2, 4))))
+           >>> print m._getNearestCellID(((3.5, 0.5, 5.), (0.1, 0.9, 0.5)))
+           [1 0 1]
+
+        Points outside of the mesh are assigned to the nearest cell
+        
+           >>> print m._getContainingCellID(((3.5, 0.5, 5.), (0.1, 0.9, 0.5)))
+           [0 1 1]
+           
+        """
+        if self.communicator.Nproc > 1:
+            # cell neighbors are only known within each partition
+            return self._getNearestCellID(points)
+            
+        if self._pointLocator is None:
+            from fipy.meshes.pointLocator import _PointLocator
+            self._pointLocator = _PointLocator(mesh=self)
+            
+        cellIDs = self._pointLocator.locate(points)
+        outside = cellIDs == -1
+        if outside.any():
+            cellIDs[outside] = self._getNearestCellID(numerix.array(points, dtype=float)[..., outside])
+        return cellIDs
 
     def _test(self):
         """
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "meshTransfer.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+
+__all__ = ["MeshTransfer"]
+
+class MeshTransfer(object):
+    """Reusable transfer of cell values from one mesh to another
+
+    The transfer is a sparse matrix from the cells of the `source` mesh to
+    the cells of the `destination` mesh, so each variable costs a single
+    matrix-vector product once it has been built.
+
+    A transfer is usually obtained from the source mesh with
+    `getTransfer()`.
+
+    By default, values are linearly interpolated to the destination cell
+    centers (see `_CellInterpolator`), which reproduces fields that vary
+    linearly in space
+
+    >>> from fipy import *
+    >>> coarse = Grid2D(nx=3, ny=3, dx=1., dy=1.)
+    >>> fine = Tri2D(nx=4, ny=4, dx=.75, dy=.75)
+    >>> transfer = MeshTransfer(coarse, fine) # doctest: +SCIPY
+    >>> x, y = fine.cellCenters
+    >>> print numerix.allclose(transfer(2 * coarse.x - coarse.y), 2 * x - y) # doctest: +SCIPY
+    True
+    >>> print numerix.allclose(transfer(coarse.cellCenters), fine.cellCenters) # doctest: +SCIPY
+    True
+
+    A `conservative` transfer instead preserves the volume integral of
+    the field, weighting each destination cell by estimates of its overlap
+    with the source cells
+
+    >>> transfer = MeshTransfer(coarse, fine, conservative=True) # doctest: +SCIPY, +SERIAL
+    >>> phi = CellVariable(mesh=coarse, value=coarse.x**2 + coarse.y)
+    >>> print numerix.allclose((transfer(phi) * fine.cellVolumes).sum(),
+    ...                        (phi * coarse.cellVolumes).sum()) # doctest: +SCIPY, +SERIAL
+    True
+    >>> print numerix.allclose(transfer(numerix.ones(9)), 1.) # doctest: +SCIPY, +SERIAL
+    True
+
+    and can go back again. Conservative transfers need the cell volumes of
+    both meshes, so they are not available in parallel.
+
+    >>> transfer = MeshTransfer(fine, coarse, conservative=True) # doctest: +SCIPY, +SERIAL
+    >>> print numerix.allclose((transfer(x * y) * coarse.cellVolumes).sum(),
+    ...                        (x * y * fine.cellVolumes).sum()) # doctest: +SCIPY, +SERIAL
+    True
+
+    :Parameters:
+      - `source`: The mesh the values are defined on
+      - `destination`: The mesh to transfer the values to
+      - `conservative`: Whether to preserve integrals rather than
+        interpolate linearly
+      - `tolerance`: Relative error in the overlap volumes of a
+        `conservative` transfer
+      - `iterations`: Maximum number of sweeps used to balance the overlap
+        volumes of a `conservative` transfer
+    """
+    def __init__(self, source, destination, conservative=False,
+                 tolerance=1e-10, iterations=1000):
+        self.source = source
+        self.destination = destination
+
+        if conservative:
+            if source.communicator.Nproc > 1 or destination.communicator.Nproc > 1:
+                raise NotImplementedError("conservative transfer is not supported in parallel")
+            self.matrix = self._conservativeMatrix(tolerance=tolerance,
+                                                   iterations=iterations)
+        else:
+            self.matrix = source._getInterpolator(destination.cellCenters.globalValue).matrix
+
+    @staticmethod
+    def _samplePoints(mesh):
+        """Points spread through each cell, and the cells they belong to
+
+        Each cell is sampled at its center and three quarters of the way
+        from its center to each of its face centers.
+        """
+        from fipy.tools.numerix import MA
+
+        centers = numerix.array(mesh.cellCenters.globalValue)
+        faceCenters = numerix.array(mesh.faceCenters.globalValue)
+        faceIDs = mesh.cellFaceIDs
+        exists = ~MA.getmaskarray(faceIDs)
+
+        towardFaces = (0.25 * centers[..., numerix.newaxis, :]
+                       + 0.75 * faceCenters[..., MA.filled(faceIDs, 0)])
+        cellIDs = numerix.arange(centers.shape[-1])
+        points = numerix.concatenate((centers, towardFaces[..., exists]), axis=-1)
+        cellIDs = numerix.concatenate((cellIDs,
+                                       (numerix.zeros(faceIDs.shape, dtype=int) + cellIDs)[exists]))
+        return points, cellIDs
+
+    def _conservativeMatrix(self, tolerance, iterations):
+        """Sparse matrix of approximate overlap volumes between the cells
+        of the two meshes, divided by the destination cell volumes
+
+        The overlaps are first estimated by locating sample points of each
+        mesh in the other. They are then balanced, by iterative proportional
+        fitting, until they sum to the volume of the source cell in each
+        column, exactly, and to the volume of the destination cell in each
+        row, to within `tolerance`. If the two meshes do not cover the same
+        volume, the rows cannot be balanced and a constant field will not
+        remain constant.
+        """
+        from scipy import sparse
+
+        source, destination = self.source, self.destination
+        sourceVolumes = numerix.array(source.cellVolumes, dtype=float)
+        destinationVolumes = numerix.array(destination.cellVolumes, dtype=float)
+        shape = (len(destinationVolumes), len(sourceVolumes))
+
+        def estimate(mesh, other, volumes):
+            points, cellIDs = self._samplePoints(mesh)
+            samplesPerCell = numerix.bincount(cellIDs, minlength=len(volumes))
+            return (cellIDs, other._getContainingCellID(points),
+                    (volumes / samplesPerCell)[cellIDs])
+
+        rows1, cols1, weights1 = estimate(destination, source, destinationVolumes)
+        cols2, rows2, weights2 = estimate(source, destination, sourceVolumes)
+
+        overlap = sparse.csr_matrix((numerix.concatenate((weights1, weights2)) / 2.,
+                                     (numerix.concatenate((rows1, rows2)),
+                                      numerix.concatenate((cols1, cols2)))),
+                                    shape=shape)
+        overlap.sum_duplicates()
+        rowOfEntry = numerix.repeat(numerix.arange(shape[0]), numerix.diff(overlap.indptr))
+
+        for sweep in range(iterations):
+            rowSums = numerix.array(overlap.sum(axis=1)).ravel()
+            overlap.data *= (destinationVolumes / rowSums)[rowOfEntry]
+            colSums = numerix.array(overlap.sum(axis=0)).ravel()
+            overlap.data *= (sourceVolumes / colSums)[overlap.indices]
+
+            rowSums = numerix.array(overlap.sum(axis=1)).ravel()
+            if numerix.allclose(rowSums, destinationVolumes, rtol=tolerance, atol=0):
+                break
+
+        return sparse.diags(1. / destinationVolumes).dot(overlap).tocsr()
+
+    def __call__(self, var):
+        """Transfer the cell values of `var` to the destination mesh
+
+        Vector variables are transferred component by component.
+        """
+        if hasattr(var, "globalValue"):
+            var = var.globalValue
+        var = numerix.asarray(var)
+        shape = var.shape
+        var = var.reshape((-1, shape[-1]))
+        return numerix.transpose(self.matrix.dot(numerix.transpose(var))).reshape(shape[:-1] + (-1,))
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
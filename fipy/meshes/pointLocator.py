@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "pointLocator.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+__all__ = []
+
+class _PointLocator(object):
+    """Find the cells of a mesh that contain a set of points
+
+    Each point walks from a starting cell towards the face it lies furthest
+    outside of, until it is inside every face of the current cell. All
+    points are walked together, so the cost is proportional to the number
+    of points times the (usually small) number of steps. Walks start from
+    the cells found by the previous call with the same number of points,
+    or from the nearest cell center.
+
+    Cells are assumed to be convex. Points that leave the mesh through an
+    exterior face, or that do not settle within `maxSteps`, are reported
+    as `-1`.
+
+    A point on one side of a long, skewed face can be closer to the center
+    of the cell on the other side
+
+    >>> from fipy import *
+    >>> from fipy.meshes.mesh2D import Mesh2D
+    >>> m = Mesh2D(vertexCoords=numerix.array(((0., 4., 0., 4.), (0., 0., 1., 1.))),
+    ...            faceVertexIDs=numerix.array(((0, 1, 2, 1, 3), (1, 2, 0, 3, 2))),
+    ...            cellFaceIDs=numerix.array(((0, 1), (1, 3), (2, 4))))
+    >>> print m._getNearestCellID(((3.5, 0.5, 5.), (0.1, 0.9, 0.5)))
+    [1 0 1]
+    >>> locator = _PointLocator(m)
+    >>> print locator.locate(((3.5, 0.5, 5.), (0.1, 0.9, 0.5)))
+    [ 0  1 -1]
+
+    Repeated calls with the same number of points walk from the previously
+    located cells
+
+    >>> print locator._lastCellIDs
+    [0 1 1]
+    >>> print locator.locate(((0.5, 3.5, 5.), (0.1, 0.9, 0.5)))
+    [ 0  1 -1]
+    """
+    def __init__(self, mesh, maxSteps=100):
+        self.mesh = mesh
+        self.maxSteps = maxSteps
+        self._lastCellIDs = None
+
+    @property
+    def _geometry(self):
+        if not hasattr(self, "_geometryCache"):
+            mesh = self.mesh
+            faceCenters = numerix.array(mesh.faceCenters.globalValue)
+            extent = faceCenters.max(axis=-1) - faceCenters.min(axis=-1)
+            self._geometryCache = (faceCenters,
+                                   numerix.array(MA.filled(mesh.faceNormals, 0.)),
+                                   MA.getmaskarray(mesh.cellFaceIDs),
+                                   numerix.array(MA.filled(mesh.cellFaceIDs, 0)),
+                                   numerix.array(mesh._cellToFaceOrientations),
+                                   numerix.array(MA.filled(mesh._cellToCellIDs, -1)),
+                                   1e-10 * max(extent.max(), 1.))
+
+        return self._geometryCache
+
+    def locate(self, points, startIDs=None):
+        """Return the IDs of the cells containing `points`, or `-1`
+
+        :Parameters:
+          - `points`: A (D, P) array of point coordinates
+          - `startIDs`: Optional (P,) array of cell IDs to start walking from
+        """
+        points = numerix.array(points, dtype=float)
+        P = points.shape[-1]
+
+        if self.mesh.numberOfCells == 0 or P == 0:
+            return -numerix.ones((P,), dtype=numerix.INT_DTYPE)
+
+        fromLast = (startIDs is None
+                    and self._lastCellIDs is not None
+                    and len(self._lastCellIDs) == P)
+
+        if fromLast:
+            startIDs = self._lastCellIDs
+        elif startIDs is None:
+            startIDs = self.mesh._getNearestCellID(points)
+
+        startIDs = numerix.array(startIDs, dtype=numerix.INT_DTYPE)
+        cellIDs = self._walk(points, startIDs)
+
+        if fromLast:
+            # a point can walk out of a non-convex mesh on its way from a
+            # stale starting cell, so try again from the nearest cell
+            lost = numerix.nonzero(cellIDs == -1)[0]
+            if len(lost) > 0:
+                cellIDs[lost] = self._walk(points[..., lost],
+                                           self.mesh._getNearestCellID(points[..., lost]))
+
+        self._lastCellIDs = numerix.where(cellIDs == -1, startIDs, cellIDs)
+
+        return cellIDs
+
+    def _walk(self, points, cellIDs):
+        """Walk `points` from `cellIDs` to their containing cells
+        """
+        (faceCenters, faceNormals, faceMask, cellFaceIDs,
+         orientations, cellToCellIDs, tolerance) = self._geometry
+
+        P = points.shape[-1]
+        cells = cellIDs.copy()
+        located = -numerix.ones((P,), dtype=numerix.INT_DTYPE)
+        active = numerix.arange(P)
+
+        for step in range(self.maxSteps):
+            if len(active) == 0:
+                break
+
+            c = cells[active]
+            faces = cellFaceIDs[..., c]
+
+            # (D, M, A) outward normals of the faces of each active cell
+            normals = faceNormals[..., faces] * orientations[..., c]
+            distances = numerix.sum((points[..., numerix.newaxis, active]
+                                     - faceCenters[..., faces]) * normals, axis=0)
+            distances = numerix.where(faceMask[..., c], -numerix.inf, distances)
+
+            furthest = numerix.argmax(distances, axis=0)
+            inside = distances[furthest, numerix.arange(len(active))] <= tolerance
+            located[active[inside]] = c[inside]
+
+            neighbors = cellToCellIDs[furthest, c]
+            move = ~inside & (neighbors != -1) & (neighbors != c)
+            cells[active[move]] = neighbors[move]
+            active = active[move]
+
+        return located
+
+class _CellInterpolator(object):
+    """Reusable interpolation of cell values to a set of points
+
+    The value at each point is a weighted sum of the value in the cell that
+    contains it and the values in that cell's neighbors. The weights
+    reproduce any field that varies linearly in space, using a least-squares
+    fit of the neighboring cell centers, and they only depend on the mesh,
+    so they can be applied to any number of variables or time steps.
+
+    >>> from fipy import *
+    >>> m = Tri2D(nx=3, ny=3)
+    >>> x, y = m.cellCenters
+    >>> interpolator = _CellInterpolator(m, ((0.9, 1.5, 2.2), (0.5, 1.5, 1.7)))
+    >>> print numerix.allclose(interpolator(CellVariable(mesh=m, value=3 * x - 2 * y + 1)),
+    ...                        (2.7, 2.5, 4.2))
+    True
+    >>> print numerix.allclose(interpolator(CellVariable(mesh=m, value=(x, y), rank=1)),
+    ...                        ((0.9, 1.5, 2.2), (0.5, 1.5, 1.7)))
+    True
+
+    Points outside of the mesh are extrapolated from the nearest cell.
+
+    >>> print numerix.allclose(_CellInterpolator(m, ((4.,), (1.,)))(x), 4.)
+    True
+    """
+    def __init__(self, mesh, points, cellIDs=None):
+        points = numerix.array(points, dtype=float)
+
+        if cellIDs is None:
+            cellIDs = mesh._getContainingCellID(points)
+
+        cellIDs = numerix.array(cellIDs, dtype=numerix.INT_DTYPE)
+        self.numberOfCells = mesh.globalNumberOfCells
+
+        if mesh.communicator.Nproc > 1:
+            # neighbor IDs are local to each partition,
+            # so only the containing cell contributes
+            self.cellIDs = cellIDs[numerix.newaxis, ...]
+            self.weights = numerix.ones(self.cellIDs.shape)
+            return
+
+        centers = numerix.array(mesh.cellCenters.globalValue)
+
+        # (M, P) neighbors of each containing cell,
+        # with exterior faces pointing back at the cell itself
+        neighbors = numerix.array(MA.filled(mesh._cellToCellIDs, -1))[..., cellIDs]
+        neighbors = numerix.where(neighbors == -1, cellIDs, neighbors)
+
+        # (P, M, D) displacements to the neighboring cell centers
+        A = numerix.transpose(centers[..., neighbors] - centers[..., numerix.newaxis, cellIDs],
+                              (2, 1, 0))
+        # (P, D) displacement of each point from its cell center
+        dx = numerix.transpose(points - centers[..., cellIDs])
+
+        weights = numerix.sum(dx[..., numerix.newaxis] * numerix.linalg.pinv(A), axis=1)
+        weights = numerix.transpose(weights)
+
+        self.cellIDs = numerix.concatenate((cellIDs[numerix.newaxis, ...], neighbors))
+        self.weights = numerix.concatenate(((1 - weights.sum(axis=0))[numerix.newaxis, ...],
+                                            weights))
+
+    @property
+    def matrix(self):
+        """The interpolation as a `scipy.sparse` matrix from cells to points
+        """
+        from scipy import sparse
+
+        K, P = self.cellIDs.shape
+        points = numerix.repeat(numerix.arange(P)[numerix.newaxis, ...], K, axis=0)
+        return sparse.csr_matrix((self.weights.ravel(),
+                                  (points.ravel(), self.cellIDs.ravel())),
+                                 shape=(P, self.numberOfCells))
+
+    def __call__(self, var):
+        """Interpolate the cell values of `var` to the points
+        """
+        if hasattr(var, "globalValue"):
+            var = var.globalValue
+        var = numerix.asarray(var)
+        return numerix.sum(var[..., self.cellIDs] * self.weights, axis=-2)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -69,34 +69,39 @@ class _GridRepresentation(_AbstractRepresentation):
         Check that the following grid classes can be pickled and unpickled.
 
         >>> import fipy as fp
+        >>> import os, tempfile
+        >>> f, filename = tempfile.mkstemp('.gz')
 
         >>> m = fp.PeriodicGrid2DLeftRight(nx=10, ny=10)
         >>> v = fp.CellVariable(mesh=m, value=m.x)
-        >>> fp.dump.write(v, filename='dump.gz')
-        >>> v0 = fp.dump.read(filename='dump.gz')
+        >>> fp.dump.write(v, filename=filename)
+        >>> v0 = fp.dump.read(filename=filename)
         >>> print (v == v0.mesh.x).all()
         True
         
         >>> m = fp.PeriodicGrid1D(nx=10)
         >>> v = fp.CellVariable(mesh=m, value=m.x)
-        >>> fp.dump.write(v, filename='dump.gz')
-        >>> v0 = fp.dump.read(filename='dump.gz')
+        >>> fp.dump.write(v, filename=filename)
+        >>> v0 = fp.dump.read(filename=filename)
         >>> print (v == v0.mesh.x).all()
         True
         
         >>> m = fp.Tri2D(nx=10, ny=10)
         >>> v = fp.CellVariable(mesh=m, value=m.x)
-        >>> fp.dump.write(v, filename='dump.gz')
-        >>> v0 = fp.dump.read(filename='dump.gz')
+        >>> fp.dump.write(v, filename=filename)
+        >>> v0 = fp.dump.read(filename=filename)
         >>> print (v == v0.mesh.x).all()
         True
         
         >>> m = fp.SkewedGrid2D(nx=10, ny=10)
         >>> v = fp.CellVariable(mesh=m, value=m.x)
-        >>> fp.dump.write(v, filename='dump.gz')
-        >>> v0 = fp.dump.read(filename='dump.gz')
+        >>> fp.dump.write(v, filename=filename)
+        >>> v0 = fp.dump.read(filename=filename)
         >>> print (v == v0.mesh.x).all()
         True
+
+        >>> os.close(f)
+        >>> os.remove(filename)
         
         """
         
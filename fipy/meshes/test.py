@@ -60,6 +60,8 @@ def _suite():
         'fipy.meshes.cylindricalNonUniformGrid2D',
         'fipy.meshes.factoryMeshes',
         'fipy.meshes.abstractMesh',
+        'fipy.meshes.pointLocator',
+        'fipy.meshes.meshTransfer',
         'fipy.meshes.representations.gridRepresentation'))
     
 if __name__ == '__main__':
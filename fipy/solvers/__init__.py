@@ -4,6 +4,12 @@ from fipy.tools  import parallelComm as _parallelComm
 from fipy.solvers.solver import *
 __all__ = list(solver.__all__)
 
+from fipy.solvers.refreshPolicy import *
+__all__.extend(refreshPolicy.__all__)
+
+from fipy.solvers.solverLog import *
+__all__.extend(solverLog.__all__)
+
 solver = _parseSolver()
 
 def _envSolver(solver):
@@ -38,16 +44,12 @@ elif solver == "trilinos":
         _MeshMatrix =  _TrilinosMeshMatrix
 
 elif solver == "scipy":
-    if _parallelComm.Nproc > 1:
-        raise SerialSolverError('scipy')
     from fipy.solvers.scipy import *
     __all__.extend(scipy.__all__)
     from fipy.matrices.scipyMatrix import _ScipyMeshMatrix
     _MeshMatrix = _ScipyMeshMatrix
     
 elif solver == "pyamg":
-    if _parallelComm.Nproc > 1:
-        raise SerialSolverError('pyamg')
     from fipy.solvers.pyAMG import *
     __all__.extend(pyAMG.__all__)
     from fipy.matrices.scipyMatrix import _ScipyMeshMatrix
@@ -92,8 +94,6 @@ elif solver is None:
             exceptions.append(inst)
 
             try:
-                if _parallelComm.Nproc > 1:
-                    raise SerialSolverError('pyamg')
                 from fipy.solvers.pyAMG import *
                 __all__.extend(pyAMG.__all__)
                 solver = "pyamg"
@@ -103,8 +103,6 @@ elif solver is None:
                 exceptions.append(inst)
 
                 try:
-                    if _parallelComm.Nproc > 1:
-                        raise SerialSolverError('scipy')
                     from fipy.solvers.scipy import *
                     __all__.extend(scipy.__all__)
                     solver = "scipy"
@@ -3,11 +3,19 @@ from fipy.solvers.pyAMG.linearCGSSolver import *
 from fipy.solvers.pyAMG.linearPCGSolver import *
 from fipy.solvers.pyAMG.linearLUSolver import *
 from fipy.solvers.pyAMG.linearGeneralSolver import *
+from fipy.solvers.scipy.newtonKrylovSolver import *
+
+from fipy.tools import parallelComm as _parallelComm
 
 DefaultSolver = LinearGMRESSolver
-DefaultAsymmetricSolver = LinearLUSolver
 DummySolver = LinearGMRESSolver
-GeneralSolver = LinearGeneralSolver
+if _parallelComm.Nproc > 1:
+    # neither LU factorization nor pyamg.solve run in parallel
+    DefaultAsymmetricSolver = LinearGMRESSolver
+    GeneralSolver = LinearGMRESSolver
+else:
+    DefaultAsymmetricSolver = LinearLUSolver
+    GeneralSolver = LinearGeneralSolver
 
 __all__ = ["DefaultSolver",
            "DummySolver",
@@ -19,3 +27,4 @@ __all__.extend(linearCGSSolver.__all__)
 __all__.extend(linearPCGSolver.__all__)
 __all__.extend(linearLUSolver.__all__)
 __all__.extend(linearGeneralSolver.__all__)
+__all__.extend(["NewtonKrylovSolver"])
@@ -37,10 +37,21 @@ from pyamg import smoothed_aggregation_solver
 
 __all__ = ["SmoothedAggregationPreconditioner"]
 
+from fipy.solvers.refreshPolicy import _ReusedSetup
+
 class SmoothedAggregationPreconditioner():
-    def __init__(self):
-        pass
+    def __init__(self, refresh=None):
+        """
+        :Parameters:
+          - `refresh`: The `RefreshPolicy` that decides when the multigrid
+            hierarchy is built again. By default, it is built for every
+            solve.
+        """
+        self._hierarchy = _ReusedSetup(refresh)
         
     def _applyToMatrix(self, A):
-        return smoothed_aggregation_solver(A).aspreconditioner(cycle='V')
+        return self._hierarchy.get(A, lambda: smoothed_aggregation_solver(A).aspreconditioner(cycle='V'))
+
+    def _solved(self, iterations):
+        self._hierarchy.solved(iterations=iterations)
 
@@ -84,7 +84,8 @@ class LinearLUSolver(PysparseSolver):
         L = L * (1 / maxdiag)
         b = b * (1 / maxdiag)
 
-        LU = superlu.factorize(L.matrix.to_csr())
+        with self._timing("setup"):
+            LU = superlu.factorize(L.matrix.to_csr())
 
         if DEBUG:
             import sys
@@ -92,16 +93,24 @@ class LinearLUSolver(PysparseSolver):
 
         error0 = numerix.sqrt(numerix.sum((L * x - b)**2))
 
-        for iteration in range(self.iterations):
-            errorVector = L * x - b
+        history = self._residualHistory
+        bNorm = numerix.sqrt(numerix.sum(b**2)) or 1.
 
-            if (numerix.sqrt(numerix.sum(errorVector**2)) / error0)  <= self.tolerance:
-                break
+        with self._timing("solve"):
+            for iteration in range(self.iterations):
+                errorVector = L * x - b
+                errorNorm = numerix.sqrt(numerix.sum(errorVector**2))
+                history.append(errorNorm / bNorm)
 
-            xError = numerix.zeros(len(b),'d')
-            LU.solve(errorVector, xError)
-            x[:] = x - xError
+                if (errorNorm / error0)  <= self.tolerance:
+                    break
+
+                xError = numerix.zeros(len(b),'d')
+                LU.solve(errorVector, xError)
+                x[:] = x - xError
             
+        self.stats['iterations'] = iteration + 1
+
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             from fipy.tools.debug import PRINT        
             PRINT('iterations: %d / %d' % (iteration+1, self.iterations))
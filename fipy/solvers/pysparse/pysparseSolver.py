@@ -70,10 +70,14 @@ class PysparseSolver(_PysparseMatrixSolver):
         if self.preconditioner is None:
             P = None
         else:
-            P, A = self.preconditioner._applyToMatrix(A)
+            with self._timing("setup"):
+                P, A = self.preconditioner._applyToMatrix(A)
 
-        info, iter, relres = self.solveFnc(A, b, x, self.tolerance, 
-                                           self.iterations, P)
+        with self._timing("solve"):
+            info, iter, relres = self.solveFnc(A, b, x, self.tolerance, 
+                                               self.iterations, P)
+        
+        self.stats['iterations'] = iter
         
         self._raiseWarning(info, iter, relres)
         
@@ -100,10 +104,14 @@ class PysparseSolver(_PysparseMatrixSolver):
 
             raise SolutionVariableNumberError
 
+        array = self._initialGuess(array)
+
         self._solve_(self.matrix, array, self.RHSvector)
-        factor = self.var.unit.factor
-        if factor != 1:
-            array /= self.var.unit.factor
+        
+        with self._timing("scatter"):
+            factor = self.var.unit.factor
+            if factor != 1:
+                array /= self.var.unit.factor
 
-        self.var[:] = array.reshape(self.var.shape)
+            self.var[:] = array.reshape(self.var.shape)
 
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ # 
+ #  FILE: "refreshPolicy.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #  
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ # 
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+
+__all__ = ["RefreshPolicy"]
+
+class RefreshPolicy(object):
+    """
+    When a solver should rebuild the factorization, or the preconditioner,
+    that it keeps from one solve to the next.
+
+    The setup is always rebuilt for the first solve, or when the size of
+    the matrix changes. Otherwise, it is rebuilt when any of the given
+    criteria is met
+
+        >>> from scipy import sparse
+        >>> A = sparse.identity(3, format='csr')
+        >>> setup = _ReusedSetup(RefreshPolicy(every=2))
+        >>> builds = []
+        >>> def build():
+        ...     builds.append(1)
+        ...     return len(builds)
+        >>> print setup.get(A, build), setup.get(A, build), setup.get(A, build)
+        1 1 2
+        >>> setup = _ReusedSetup(RefreshPolicy(tolerance=0.1))
+        >>> print setup.get(A, build), setup.get(1.01 * A, build), setup.get(1.5 * A, build)
+        3 3 4
+        >>> print setup.get(sparse.identity(4, format='csr'), build)
+        5
+
+    A solver that takes more than `iterations` iterations asks for the next
+    solve to use a new setup
+
+        >>> setup = _ReusedSetup(RefreshPolicy(iterations=5))
+        >>> print setup.get(A, build)
+        6
+        >>> setup.solved(iterations=5)
+        >>> print setup.get(A, build)
+        6
+        >>> setup.solved(iterations=6)
+        >>> print setup.get(A, build)
+        7
+
+    Without a `RefreshPolicy`, the setup is rebuilt for every solve
+
+        >>> setup = _ReusedSetup(None)
+        >>> print setup.get(A, build), setup.get(A, build)
+        8 9
+    """
+    
+    def __init__(self, every=None, iterations=None, tolerance=None):
+        """
+        :Parameters:
+          - `every`: Rebuild after this many solves.
+          - `iterations`: Rebuild after a solve that took more than this
+            many iterations.
+          - `tolerance`: Rebuild when the matrix differs from the one
+            that the setup was built from by more than this, relative to
+            the Frobenius norm of that matrix.
+        """
+        self.every = every
+        self.iterations = iterations
+        self.tolerance = tolerance
+        
+    def _changed(self, reference, matrix):
+        difference = (matrix - reference).tocsr()
+        referenceNorm = numerix.sqrt(numerix.sum(reference.tocsr().data**2))
+        differenceNorm = numerix.sqrt(numerix.sum(difference.data**2))
+        return differenceNorm > self.tolerance * referenceNorm
+
+    def __repr__(self):
+        return "%s(every=%s, iterations=%s, tolerance=%s)" \
+            % (self.__class__.__name__, self.every, self.iterations, self.tolerance)
+        
+class _ReusedSetup(object):
+    """
+    A factorization or preconditioner, kept for as long as its
+    `RefreshPolicy` allows
+    """
+    def __init__(self, policy):
+        self.policy = policy
+        self.setup = None
+        
+    def get(self, A, build):
+        """Return the kept setup for the matrix `A`, or a new one from
+        `build()` if it has to be refreshed.
+
+        :Parameters:
+          - `A`: a `_ScipyMatrix` or a `scipy.sparse` matrix
+          - `build`: function of no arguments that builds a setup for `A`
+        """
+        if self._stale(A):
+            self.setup = build()
+            self.shape = self._shapeOf(A)
+            self.solves = 0
+            self.iterations = 0
+            if self.policy is not None and self.policy.tolerance is not None:
+                self.reference = self._matrixOf(A).copy()
+        self.solves += 1
+        return self.setup
+        
+    def solved(self, iterations):
+        """Record the number of `iterations` that a solve with the setup took"""
+        self.iterations = iterations
+
+    def reset(self):
+        self.setup = None
+        
+    @staticmethod
+    def _matrixOf(A):
+        # only converted to `scipy.sparse` when it must be compared
+        return getattr(A, "matrix", A)
+        
+    @staticmethod
+    def _shapeOf(A):
+        return getattr(A, "_shape", None) or A.shape
+
+    def _stale(self, A):
+        policy = self.policy
+        return (self.setup is None
+                or policy is None
+                or self._shapeOf(A) != self.shape
+                or (policy.every is not None and self.solves >= policy.every)
+                or (policy.iterations is not None and self.iterations > policy.iterations)
+                or (policy.tolerance is not None and policy._changed(self.reference, self._matrixOf(A))))
+
+def _test(): 
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+    
+if __name__ == "__main__": 
+    _test()
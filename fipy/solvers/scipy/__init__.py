@@ -3,11 +3,21 @@ from fipy.solvers.scipy.linearGMRESSolver import *
 from fipy.solvers.scipy.linearBicgstabSolver import *
 from fipy.solvers.scipy.linearLUSolver import *
 from fipy.solvers.scipy.linearPCGSolver import *
+from fipy.solvers.scipy.newtonKrylovSolver import *
 
-DefaultSolver = LinearLUSolver
-DummySolver = LinearGMRESSolver
-DefaultAsymmetricSolver = LinearLUSolver
-GeneralSolver = LinearLUSolver
+from fipy.tools import parallelComm as _parallelComm
+
+if _parallelComm.Nproc > 1:
+    # LU factorization does not run in parallel
+    DefaultSolver = LinearGMRESSolver
+    DummySolver = LinearGMRESSolver
+    DefaultAsymmetricSolver = LinearGMRESSolver
+    GeneralSolver = LinearGMRESSolver
+else:
+    DefaultSolver = LinearLUSolver
+    DummySolver = LinearGMRESSolver
+    DefaultAsymmetricSolver = LinearLUSolver
+    GeneralSolver = LinearLUSolver
 
 __all__ = ["DefaultSolver",
            "DummySolver",
@@ -19,3 +29,4 @@ __all__.extend(linearGMRESSolver.__all__)
 __all__.extend(linearBicgstabSolver.__all__)
 __all__.extend(linearLUSolver.__all__)
 __all__.extend(linearPCGSolver.__all__)
+__all__.extend(newtonKrylovSolver.__all__)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "distributedKrylov.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+"""Krylov solvers for a `_DistributedScipyMatrix`
+
+These mirror the calling convention of their `scipy.sparse.linalg`
+counterparts, returning the solution and an `info` flag that is `0` on
+convergence, the number of iterations if the tolerance was not reached, and
+negative on breakdown, but every inner product and norm is reduced over all
+processors. The preconditioner `M` is a function returning the
+(approximate) solution of the preconditioning system for a residual. Like
+their counterparts, they call `callback` after each iteration, with the
+current solution or, for GMRES, the relative residual.
+
+    >>> from fipy import *
+    >>> from fipy.matrices.scipyMatrix import _ScipyMeshMatrix
+    >>> from fipy.matrices.distributedScipyMatrix import _DistributedScipyMatrix
+    >>> m = Grid1D(nx=20)
+    >>> L = _ScipyMeshMatrix(mesh=m)
+    >>> ids = numerix.arange(20)
+    >>> L.addAt(3. * numerix.ones(20), ids, ids)
+    >>> L.addAt(-numerix.ones(19), ids[:-1], ids[1:])
+    >>> L.addAt(-numerix.ones(19), ids[1:], ids[:-1])
+    >>> A = _DistributedScipyMatrix(L)
+    >>> b = A.matvec(numerix.linspace(0., 1., 20))
+    >>> identity = lambda r: r
+    >>> for fn in (_cg, _bicgstab, _gmres):
+    ...     x, info = fn(A, b, numerix.zeros(20), tol=1e-10, maxiter=100, M=identity)
+    ...     print fn.__name__, info, numerix.allclose(x, numerix.linspace(0., 1., 20))
+    _cg 0 True
+    _bicgstab 0 True
+    _gmres 0 True
+
+    >>> residuals = []
+    >>> x, info = _gmres(A, b, numerix.zeros(20), tol=1e-10, maxiter=100, M=identity,
+    ...                  callback=residuals.append)
+    >>> print len(residuals) > 0, residuals[-1] <= 1e-10
+    True True
+
+Restarted GMRES reports the iterations it took when it runs out
+
+    >>> x, info = _gmres(A, b, numerix.zeros(20), tol=1e-10, maxiter=3, M=identity, restart=2)
+    >>> print info
+    3
+"""
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+def _cg(A, b, x, tol, maxiter, M, callback=None):
+    """Preconditioned conjugate gradients
+    """
+    bnorm = A.norm(b) or 1.
+
+    r = b - A.matvec(x)
+    z = M(r)
+    p = z
+    rz = A.dot(r, z)
+
+    for iteration in range(maxiter):
+        if A.norm(r) <= tol * bnorm:
+            return x, 0
+
+        q = A.matvec(p)
+        pq = A.dot(p, q)
+        if pq == 0:
+            return x, -1
+
+        alpha = rz / pq
+        x = x + alpha * p
+        r = r - alpha * q
+        if callback is not None:
+            callback(x)
+
+        z = M(r)
+        rzNext = A.dot(r, z)
+        p = z + (rzNext / rz) * p
+        rz = rzNext
+
+    if A.norm(r) <= tol * bnorm:
+        return x, 0
+
+    return x, maxiter
+
+def _bicgstab(A, b, x, tol, maxiter, M, callback=None):
+    """Right-preconditioned biconjugate gradients stabilized
+    """
+    bnorm = A.norm(b) or 1.
+
+    r = b - A.matvec(x)
+    rhat = r.copy()
+    rho = alpha = omega = 1.
+    p = v = numerix.zeros(r.shape, dtype=r.dtype)
+
+    for iteration in range(maxiter):
+        if A.norm(r) <= tol * bnorm:
+            return x, 0
+
+        rhoNext = A.dot(rhat, r)
+        if rhoNext == 0:
+            return x, -1
+
+        p = r + (rhoNext / rho) * (alpha / omega) * (p - omega * v)
+        phat = M(p)
+        v = A.matvec(phat)
+        alpha = rhoNext / A.dot(rhat, v)
+        s = r - alpha * v
+
+        if A.norm(s) <= tol * bnorm:
+            x = x + alpha * phat
+            if callback is not None:
+                callback(x)
+            return x, 0
+
+        shat = M(s)
+        t = A.matvec(shat)
+        tt = A.dot(t, t)
+        if tt == 0:
+            return x + alpha * phat, -1
+        omega = A.dot(t, s) / tt
+
+        x = x + alpha * phat + omega * shat
+        r = s - omega * t
+        rho = rhoNext
+        if callback is not None:
+            callback(x)
+
+        if omega == 0:
+            return x, -1
+
+    if A.norm(r) <= tol * bnorm:
+        return x, 0
+
+    return x, maxiter
+
+def _gmres(A, b, x, tol, maxiter, M, restart=20, callback=None):
+    """Right-preconditioned, restarted GMRES
+    """
+    bnorm = A.norm(b) or 1.
+    iterations = 0
+
+    while True:
+        r = b - A.matvec(x)
+        beta = A.norm(r)
+        if beta <= tol * bnorm:
+            return x, 0
+        if iterations >= maxiter:
+            return x, iterations
+
+        m = min(restart, maxiter - iterations)
+        V = [r / beta]
+        Z = []
+        H = numerix.zeros((m + 1, m))
+        cs = numerix.zeros((m,))
+        sn = numerix.zeros((m,))
+        g = numerix.zeros((m + 1,))
+        g[0] = beta
+
+        for j in range(m):
+            Z.append(M(V[j]))
+            w = A.matvec(Z[j])
+            for i in range(j + 1):
+                H[i, j] = A.dot(w, V[i])
+                w = w - H[i, j] * V[i]
+            h = A.norm(w)
+
+            for i in range(j):
+                H[i, j], H[i + 1, j] = (cs[i] * H[i, j] + sn[i] * H[i + 1, j],
+                                        -sn[i] * H[i, j] + cs[i] * H[i + 1, j])
+            denominator = numerix.sqrt(H[j, j]**2 + h**2)
+            if denominator == 0:
+                return x, -1
+            cs[j] = H[j, j] / denominator
+            sn[j] = h / denominator
+            H[j, j] = denominator
+            g[j + 1] = -sn[j] * g[j]
+            g[j] = cs[j] * g[j]
+            iterations += 1
+            if callback is not None:
+                callback(abs(g[j + 1]) / bnorm)
+
+            if h == 0 or abs(g[j + 1]) <= tol * bnorm:
+                break
+
+            V.append(w / h)
+
+        k = j + 1
+        y = numerix.linalg.solve(H[:k, :k], g[:k])
+        for i in range(k):
+            x = x + y[i] * Z[i]
+
+_solveFunctions = {}
+
+def _solveFunction(scipyFunction):
+    """The distributed counterpart of a `scipy.sparse.linalg` solver, or `None`
+    """
+    if len(_solveFunctions) == 0:
+        from scipy.sparse.linalg import bicgstab, cg, gmres
+        _solveFunctions.update({cg: _cg, bicgstab: _bicgstab, gmres: _gmres})
+    return _solveFunctions.get(scipyFunction)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
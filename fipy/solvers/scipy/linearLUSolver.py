@@ -39,6 +39,7 @@ import os
 from scipy.sparse.linalg import splu
 
 from fipy.solvers.scipy.scipySolver import _ScipySolver
+from fipy.solvers.refreshPolicy import _ReusedSetup
 from fipy.tools import numerix
 
 __all__ = ["LinearLUSolver"]
@@ -48,8 +49,102 @@ class LinearLUSolver(_ScipySolver):
     The `LinearLUSolver` solves a linear system of equations using
     LU-factorisation.  The `LinearLUSolver` is a wrapper class for the
     the Scipy `scipy.sparse.linalg.splu` moduleq.
+
+    With `banded=True`, the matrix of a `UniformGrid` is instead assembled
+    into diagonal bands and factored by LAPACK's banded LU, which is much
+    cheaper for the narrow bands of one-dimensional problems
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=50)
+        >>> var = CellVariable(mesh=mesh)
+        >>> var.constrain(1., mesh.facesLeft)
+        >>> eq = TransientTerm() == DiffusionTerm(coeff=1.)
+        >>> from fipy.solvers.scipy import LinearPCGSolver
+        >>> eq.solve(var=var, dt=1., solver=LinearPCGSolver(tolerance=1e-12))
+        >>> value = var.value.copy()
+        >>> var.value = 0.
+        >>> solver = LinearLUSolver(banded=True)
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._useBanded(solver.matrix)
+        True
+        >>> print numerix.allclose(var, value)
+        True
+
+    By default, the matrix is assembled as usual and factored by `splu`
+
+        >>> var.value = 0.
+        >>> solver = LinearLUSolver()
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._useBanded(solver.matrix)
+        False
+        >>> print numerix.allclose(var, value)
+        True
+
+    The factors can be kept from one solve to the next, for as long as a
+    `RefreshPolicy` allows. The iterative refinement of the solution
+    corrects for the difference between the factored matrix and the
+    current one, and the matrix is factored again if it fails to
+    converge
+
+        >>> var.value = 0.
+        >>> D = Variable(1.)
+        >>> eq = TransientTerm() == DiffusionTerm(coeff=D)
+        >>> solver = LinearLUSolver(refresh=RefreshPolicy(tolerance=0.1))
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> factors = solver._factors.setup
+        >>> D.value = 1.01
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._factors.setup is factors
+        True
+        >>> D.value = 2.
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._factors.setup is factors
+        False
+        >>> print numerix.allclose(solver._calcResidual(), 0., atol=1e-10)
+        True
     """
-    
+
+    def __init__(self, tolerance=1e-10, iterations=1000, precon=None, banded=False, refresh=None):
+        """
+        :Parameters:
+          - `tolerance`: The required error tolerance.
+          - `iterations`: The maximum number of iterative steps to perform.
+          - `precon`: Preconditioner to use. Not used by this solver.
+          - `banded`: Whether to assemble the matrix of a `UniformGrid`
+            into diagonal bands and factor them with LAPACK's banded LU,
+            rather than with `splu`. This pays off for the narrow bands
+            of one-dimensional problems.
+          - `refresh`: The `RefreshPolicy` that decides when the matrix
+            is factored again. By default, it is factored for every solve.
+        """
+        super(LinearLUSolver, self).__init__(tolerance=tolerance, iterations=iterations, precon=precon)
+        self.banded = banded
+        self._factors = _ReusedSetup(refresh)
+
+    def _usesStencil(self):
+        return self.banded
+
+    def _useBanded(self, L):
+        from fipy.matrices.scipyStencilMatrix import _ScipyStencilMatrix
+        return bool(self.banded) and isinstance(L, _ScipyStencilMatrix)
+
+    def _factor(self, L):
+        """Return a function that solves with the LU factors of `L`"""
+        if self._useBanded(L):
+            from scipy.linalg.lapack import dgbtrf, dgbtrs
+            lower, upper = L.bandwidths
+            # gbtrf needs `lower` more rows above the bands for its fill-in
+            LU, pivots, info = dgbtrf(L.banded(upper=lower + upper), lower, upper,
+                                      overwrite_ab=True)
+            if info == 0:
+                return lambda r: dgbtrs(LU, lower, upper, r, pivots)[0]
+
+        return splu(L.matrix.asformat("csc"), diag_pivot_thresh=1.,
+                                              drop_tol=0.,
+                                              relax=1,
+                                              panel_size=10,
+                                              permc_spec=3).solve
+
     def _solve_(self, L, x, b):
         diag = L.takeDiagonal()
         maxdiag = max(numerix.absolute(diag))
@@ -57,23 +152,37 @@ class LinearLUSolver(_ScipySolver):
         L = L * (1 / maxdiag)
         b = b * (1 / maxdiag)
 
-        LU = splu(L.matrix.asformat("csc"), diag_pivot_thresh=1.,
-                                            drop_tol=0.,
-                                            relax=1,
-                                            panel_size=10,
-                                            permc_spec=3)
+        with self._timing("setup"):
+            solve = self._factors.get(L, lambda: self._factor(L))
+        refactored = self._factors.solves == 1
 
+        history = self._residualHistory
+        bNorm = numerix.sqrt(numerix.sum(b**2)) or 1.
         error0 = numerix.sqrt(numerix.sum((L * x - b)**2))
 
         for iteration in range(min(self.iterations, 10)):
-            errorVector = L * x - b
+            with self._timing("solve"):
+                errorVector = L * x - b
+                errorNorm = numerix.sqrt(numerix.sum(errorVector**2))
+                history.append(errorNorm / bNorm)
 
-            if (numerix.sqrt(numerix.sum(errorVector**2)) / error0)  <= self.tolerance:
+            if (errorNorm / error0)  <= self.tolerance:
                 break
 
-            xError = LU.solve(errorVector)
-            x[:] = x - xError
+            if iteration == min(self.iterations, 10) // 2 and not refactored:
+                # the kept factors are too far from `L` to converge
+                with self._timing("setup"):
+                    self._factors.reset()
+                    solve = self._factors.get(L, lambda: self._factor(L))
+                refactored = True
+
+            with self._timing("solve"):
+                xError = solve(errorVector)
+                x[:] = x - xError
             
+        self._factors.solved(iterations=iteration + 1)
+        self.stats['iterations'] = iteration + 1
+
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             from fipy.tools.debug import PRINT        
             PRINT('iterations: %d / %d' % (iteration+1, self.iterations))
@@ -46,15 +46,17 @@ class LinearPCGSolver(_ScipyKrylovSolver):
     with no preconditioning by default.
     """
     
-    def __init__(self, tolerance=1e-15, iterations=2000, precon=None):
+    def __init__(self, tolerance=1e-15, iterations=2000, precon=None, matrixFree=False):
         """
         :Parameters:
           - `tolerance`: The required error tolerance.
           - `iterations`: The maximum number of iterative steps to perform.
           - `precon`: Preconditioner to use.
+          - `matrixFree`: Whether to apply the matrix of a `UniformGrid` by
+            its stencil, without converting it to CSR.
         """
         
-        super(LinearPCGSolver, self).__init__(tolerance=tolerance, iterations=iterations, precon=precon)
+        super(LinearPCGSolver, self).__init__(tolerance=tolerance, iterations=iterations, precon=precon, matrixFree=matrixFree)
         self.solveFnc = cg
 
     def _canSolveAsymmetric(self):
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ # 
+ #  FILE: "newtonKrylovSolver.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #  
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ # 
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from timeit import default_timer as _timer
+
+from scipy.sparse.linalg import gmres, splu, LinearOperator
+
+from fipy.solvers.scipy.scipySolver import _ScipySolver
+from fipy.solvers.refreshPolicy import _ReusedSetup
+from fipy.tools import numerix
+
+__all__ = ["NewtonKrylovSolver"]
+
+class NewtonKrylovSolver(_ScipySolver):
+    r"""
+    The `NewtonKrylovSolver` solves a nonlinear `equation` by Newton's
+    method, without forming its Jacobian.
+
+    The residual :math:`\vec{F}(\vec{x}) = \mathsf{L}(\vec{x}) \vec{x} -
+    \vec{b}(\vec{x})` is found with
+    :meth:`~fipy.terms.term.Term.justResidualVector`. Each Newton step
+    solves :math:`\mathsf{J} \delta\vec{x} = -\vec{F}` with GMRES. The
+    product of the Jacobian with a vector is a finite difference of
+    residuals
+
+    .. math::
+
+       \mathsf{J} \vec{v} \approx \frac{\vec{F}(\vec{x} + \epsilon \vec{v})
+       - \vec{F}(\vec{x})}{\epsilon}
+
+    and the linearized (Picard) matrix :math:`\mathsf{L}(\vec{x})`, which
+    `sweep()` would solve, preconditions GMRES. A backtracking line
+    search keeps each step from increasing the residual. The residual
+    history in the `log` is relative to the initial residual.
+
+    >>> from fipy import *
+    >>> mesh = Grid1D(nx=50, dx=1. / 50)
+    >>> var = CellVariable(mesh=mesh, value=0.)
+    >>> var.constrain(0., mesh.facesLeft)
+    >>> var.constrain(1., mesh.facesRight)
+    >>> eq = DiffusionTerm(coeff=1. + 10. * var**2, var=var)
+    >>> solver = NewtonKrylovSolver(equation=eq, tolerance=1e-10)
+    >>> solver.solve()
+    >>> record = solver.log[-1]
+    >>> print record.iterations < 10
+    True
+    >>> print record.finalResidual < 1e-10 * record.initialResidual
+    True
+    >>> print numerix.allclose(eq.justResidualVector(var=var), 0., atol=1e-8)
+    True
+
+    Picard iteration needs many more sweeps to get as close
+
+    >>> var.value = 0.
+    >>> sweeps = 0
+    >>> residual = 1.
+    >>> while residual > 1e-10 * record.initialResidual and sweeps < 200:
+    ...     residual = eq.sweep(var=var)
+    ...     sweeps += 1
+    >>> print sweeps > record.iterations
+    True
+    """
+
+    def __init__(self, equation, tolerance=1e-10, iterations=50, precon=None, 
+                 krylovTolerance=1e-4, krylovIterations=200, refresh=None):
+        """
+        :Parameters:
+          - `equation`: The `Term` whose residual is driven to zero.
+          - `tolerance`: The required reduction of the norm of the residual.
+          - `iterations`: The maximum number of Newton steps to take.
+          - `precon`: Preconditioner to apply to the Picard matrix, such
+            as a `SmoothedAggregationPreconditioner`. By default, the
+            Picard matrix is LU factored.
+          - `krylovTolerance`: The relative tolerance of each GMRES solve.
+          - `krylovIterations`: The maximum number of GMRES iterations in
+            each Newton step.
+          - `refresh`: The `RefreshPolicy` that decides when the Picard
+            matrix is factored again. By default, it is factored for every
+            Newton step.
+        """
+        super(NewtonKrylovSolver, self).__init__(tolerance=tolerance, iterations=iterations, precon=precon)
+        self.equation = equation
+        self.krylovTolerance = krylovTolerance
+        self.krylovIterations = krylovIterations
+        self._factors = _ReusedSetup(refresh)
+
+    def _residualAt(self, x, dt, boundaryConditions):
+        """Return the residual of `equation` when its variable is `x`
+        """
+        if x is not None:
+            self.var[:] = numerix.reshape(x, self.var.shape)
+        residual = self.equation.justResidualVector(var=getattr(self, "var", None), solver=self, 
+                                                    boundaryConditions=boundaryConditions, dt=dt)
+        if self._record is not None:
+            self._record.times["assembly"] += self._assemblyTime
+            self._assemblyTime = 0.
+        return numerix.array(residual).ravel()
+
+    def _preconditioner(self):
+        """Return the preconditioner built from the Picard matrix that the
+        last residual was assembled with
+        """
+        L = self.matrix
+        if self.preconditioner is None:
+            solve = self._factors.get(L, lambda: splu(L.matrix.asformat("csc")).solve)
+            return LinearOperator(L.matrix.shape, matvec=solve)
+        else:
+            return self.preconditioner._applyToMatrix(L.matrix)
+
+    def solve(self, dt=None, boundaryConditions=()):
+        """Solve `equation` for its variable
+
+        :Parameters:
+          - `dt`: The time step size.
+          - `boundaryConditions`: A tuple of boundaryConditions.
+        """
+        if self.equation.var is not None and self.equation.var.mesh.communicator.Nproc > 1:
+            from fipy.solvers import SerialSolverError
+            raise SerialSolverError(self.__class__.__name__)
+
+        self.stats = {}
+        start = _timer()
+
+        F = self._residualAt(None, dt, boundaryConditions)
+        record = self.log._newRecord(solver=self, var=self.var)
+        record.times["assembly"] = self._assemblyTime
+        self._assemblyTime = 0.
+        self._record = record
+        
+        try:
+            x = numerix.array(self.var).ravel().astype(float)
+            norm = norm0 = numerix.L2norm(F)
+            linearIterations = 0
+            newton = 0
+            
+            while newton < self.iterations and norm > self.tolerance * norm0:
+                with self._timing("setup"):
+                    M = self._preconditioner()
+                    
+                Fx = F
+                epsilon0 = numerix.sqrt(numerix.finfo(float).eps) * (1. + numerix.L2norm(x))
+                def jacobianProduct(v):
+                    vnorm = numerix.L2norm(v)
+                    if vnorm == 0:
+                        return numerix.zeros(v.shape, 'd')
+                    epsilon = epsilon0 / vnorm
+                    return (self._residualAt(x + epsilon * v, dt, boundaryConditions) - Fx) / epsilon
+                J = LinearOperator((len(x), len(x)), matvec=jacobianProduct)
+                
+                iterations = [0]
+                def callback(rk):
+                    iterations[0] += 1
+                    
+                solveStart = _timer()
+                assembly = record.times["assembly"]
+                dx, info = gmres(J, -Fx, numerix.zeros(x.shape, 'd'), 
+                                 tol=self.krylovTolerance, 
+                                 maxiter=self.krylovIterations, 
+                                 M=M, callback=callback)
+                record.times["solve"] += _timer() - solveStart - (record.times["assembly"] - assembly)
+                linearIterations += iterations[0]
+                self._factors.solved(iterations=iterations[0])
+
+                # backtrack until the residual decreases
+                step = 1.
+                for trial in range(10):
+                    Ftrial = self._residualAt(x + step * dx, dt, boundaryConditions)
+                    normTrial = numerix.L2norm(Ftrial)
+                    if normTrial <= (1. - 1e-4 * step) * norm:
+                        break
+                    step /= 2.
+                else:
+                    # no step along `dx` decreases the residual, so stop
+                    # at `x` and warn that the solve did not converge
+                    break
+                    
+                x = x + step * dx
+                F = Ftrial
+                norm = normTrial
+                newton += 1
+                self._residualHistory.append(norm / norm0)
+
+            with self._timing("scatter"):
+                self.var[:] = numerix.reshape(x, self.var.shape)
+        finally:
+            self._record = None
+
+        self.stats['iterations'] = newton
+        self.stats['linearIterations'] = linearIterations
+
+        if norm > self.tolerance * norm0:
+            self._raiseWarning(-1, newton, norm / norm0)
+        
+        record.iterations = newton
+        record.initialResidual = float(norm0)
+        record.finalResidual = float(norm)
+        record.warning = self.stats.get('warning')
+        record.stats = dict(self.stats)
+        record.time = _timer() - start
+        self.log._append(record)
+
+def _test(): 
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+    
+if __name__ == "__main__": 
+    _test()
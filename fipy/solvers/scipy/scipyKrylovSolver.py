@@ -41,6 +41,7 @@ __all__ = []
 import os
 
 from fipy.solvers.scipy.scipySolver import _ScipySolver
+from fipy.tools import numerix
 
 class _ScipyKrylovSolver(_ScipySolver):
     """
@@ -48,22 +49,114 @@ class _ScipyKrylovSolver(_ScipySolver):
     
     .. attention:: This class is abstract. Always create one of its subclasses.
     """
-    
+
+    def __init__(self, tolerance=1e-15, iterations=2000, precon=None, matrixFree=False):
+        """
+        :Parameters:
+          - `tolerance`: The required error tolerance.
+          - `iterations`: The maximum number of iterative steps to perform.
+          - `precon`: Preconditioner to use.
+          - `matrixFree`: Whether to apply the matrix of a `UniformGrid` by
+            its stencil, without converting it to CSR.
+        """
+        super(_ScipyKrylovSolver, self).__init__(tolerance=tolerance, iterations=iterations, precon=precon)
+        self.matrixFree = matrixFree
+
+    def _usesStencil(self):
+        return self.matrixFree
+
     def _solve_(self, L, x, b):
-        A = L.matrix
+        if self.matrixFree:
+            A = L.linearOperator
+        else:
+            A = L.matrix
         if self.preconditioner is None:
             M = None
         else:
-            M = self.preconditioner._applyToMatrix(A)
+            with self._timing("setup"):
+                M = self.preconditioner._applyToMatrix(L.matrix)
             
-        x, info = self.solveFnc(A, b, x, 
-                                tol=self.tolerance,
-                                maxiter=self.iterations,
-                                M=M)
+        iterations = [0]
+        history = self._residualHistory
+        bNorm = numerix.sqrt(numerix.sum(b**2)) or 1.
+        
+        def callback(xk):
+            iterations[0] += 1
+            if numerix.shape(xk) == ():
+                # GMRES reports its relative residual
+                history.append(float(xk))
+            elif self.log.residualHistory:
+                history.append(numerix.sqrt(numerix.sum((b - A * xk)**2)) / bNorm)
+
+        with self._timing("solve"):
+            x, info = self.solveFnc(A, b, x, 
+                                    tol=self.tolerance,
+                                    maxiter=self.iterations,
+                                    M=M,
+                                    callback=callback)
+        self.stats['iterations'] = iterations[0]
+        self.stats['info'] = info
+
+        if hasattr(self.preconditioner, "_solved"):
+            # a kept preconditioner needs to know how well it did
+            self.preconditioner._solved(iterations=iterations[0])
+
+        if 'FIPY_VERBOSE_SOLVER' in os.environ:
+            if info < 0:
+                PRINT('failure', self._warningList[info].__class__.__name__)
+
+        return x
+
+    def _solveDistributed_(self, A, x, b):
+        from fipy.solvers.scipy.distributedKrylov import _solveFunction
+        solveFnc = _solveFunction(self.solveFnc)
+        if solveFnc is None:
+            from fipy.solvers import SerialSolverError
+            raise SerialSolverError(self.__class__.__name__)
+
+        with self._timing("setup"):
+            M = self._blockJacobi(A)
+
+        iterations = [0]
+        history = self._residualHistory
+        if self.log.residualHistory:
+            bNorm = A.norm(b) or 1.
+
+        def callback(xk):
+            iterations[0] += 1
+            if numerix.shape(xk) == ():
+                # GMRES reports its relative residual
+                history.append(float(xk))
+            elif self.log.residualHistory:
+                history.append(A.norm(b - A.matvec(xk)) / bNorm)
+
+        with self._timing("solve"):
+            x, info = solveFnc(A, b, x,
+                               tol=self.tolerance,
+                               maxiter=self.iterations,
+                               M=M,
+                               callback=callback)
+        self.stats['iterations'] = iterations[0]
+        self.stats['info'] = info
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             if info < 0:
+                from fipy.tools.debug import PRINT
                 PRINT('failure', self._warningList[info].__class__.__name__)
 
         return x
 
+    def _blockJacobi(self, A):
+        """Return a function that applies the block-Jacobi preconditioner
+
+        Each processor's block of owned rows and columns is factorized, or
+        handed to the solver's preconditioner, independently of the others.
+        """
+        block = A.localBlock
+        if block.shape[0] == 0:
+            return lambda r: r
+        elif self.preconditioner is None:
+            from scipy.sparse.linalg import splu
+            return splu(block.tocsc()).solve
+        else:
+            return self.preconditioner._applyToMatrix(block).matvec
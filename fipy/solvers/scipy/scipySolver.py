@@ -52,11 +52,85 @@ class _ScipySolver(Solver):
     @property
     def _matrixClass(self):
         return _ScipyMeshMatrix
+
+    def _usesStencil(self):
+        """Whether this solver asks for the matrix of a `UniformGrid` as
+        diagonal bands. The banded matrix does not use cached sparsity
+        patterns or deferred COO assembly, so solvers only ask for it when
+        they make use of the bands.
+        """
+        return False
+
+    def _getMatrixClass(self, mesh):
+        from fipy.meshes.uniformGrid import UniformGrid
+        if self._usesStencil() and isinstance(mesh, UniformGrid):
+            # the fixed stencil is assembled straight into diagonal bands
+            from fipy.matrices.scipyStencilMatrix import _ScipyStencilMatrix
+            return _ScipyStencilMatrix
+        else:
+            return self._matrixClass
                                    
+    def _storeMatrix(self, var, matrix, RHSvector):
+        Solver._storeMatrix(self, var=var, matrix=matrix, RHSvector=RHSvector)
+        self._distributedMatrix = None
+
+    @property
+    def _distributed(self):
+        """The matrix, solution and right-hand side owned by this processor
+
+        The matrix and right-hand side are kept until the next
+        `_storeMatrix()`, as setting up the exchange of their halo is
+        collective. The solution is taken from `var` every time.
+        """
+        if self._distributedMatrix is None:
+            from fipy.matrices.distributedScipyMatrix import _DistributedScipyMatrix
+            A = _DistributedScipyMatrix(self.matrix)
+            self._distributedMatrix = (A, A.owned(numerix.array(self.RHSvector).ravel()))
+        A, b = self._distributedMatrix
+        return A, A.owned(numerix.array(self.var).ravel()), b
+
     def _solve(self):
 
          if self.var.mesh.communicator.Nproc > 1:
-             raise Exception("SciPy solvers cannot be used with multiple processors")
-        
-         self.var[:] = numerix.reshape(self._solve_(self.matrix, self.var.ravel(), numerix.array(self.RHSvector)), self.var.shape)   
+             self.stats = {}
+             A, x, b = self._distributed
+             x = self._solveDistributed_(A, x, b)
+             with self._timing("scatter"):
+                 self.var[:] = numerix.reshape(A.overlapping(x), self.var.shape)
+         else:
+             x = self._initialGuess(self.var.ravel())
+             x = self._solve_(self.matrix, x, numerix.array(self.RHSvector))
+             with self._timing("scatter"):
+                 self.var[:] = numerix.reshape(x, self.var.shape)
+
+    def _solveDistributed_(self, A, x, b):
+        """Solve the system distributed over several processors
+
+        :Parameters:
+          - `A`: The `_DistributedScipyMatrix` of the owned rows.
+          - `x`: The owned entries of the initial guess.
+          - `b`: The owned entries of the right-hand side.
+        """
+        from fipy.solvers import SerialSolverError
+        raise SerialSolverError(self.__class__.__name__)
+
+    def _calcResidualVector(self, residualFn=None):
+        if residualFn is None and self.var.mesh.communicator.Nproc > 1:
+            A, x, b = self._distributed
+            return A.overlapping(A.matvec(x) - b)
+        else:
+            return Solver._calcResidualVector(self, residualFn=residualFn)
+
+    def _calcResidual(self, residualFn=None):
+        if residualFn is None and self.var.mesh.communicator.Nproc > 1:
+            A, x, b = self._distributed
+            return A.norm(A.matvec(x) - b)
+        else:
+            return Solver._calcResidual(self, residualFn=residualFn)
 
+    def _calcRHSNorm(self):
+        if self.var.mesh.communicator.Nproc > 1:
+            A, x, b = self._distributed
+            return A.norm(b)
+        else:
+            return Solver._calcRHSNorm(self)
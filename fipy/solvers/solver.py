@@ -115,7 +115,18 @@ class Solver(object):
         self.iterations = iterations
 
         self.preconditioner = precon
+
+        self.stats = {}
+        
+        from fipy.solvers.solverLog import SolverLog
+        self.log = SolverLog()
+        self._record = None
+        self._assemblyTime = 0.
 	
+    def _getMatrixClass(self, mesh):
+        """The class of the matrix to assemble for `mesh`."""
+        return self._matrixClass
+
     def _storeMatrix(self, var, matrix, RHSvector):
         self.var = var
         self.matrix = matrix
@@ -124,6 +135,92 @@ class Solver(object):
     def _solve(self):
         raise NotImplementedError
         
+    def _loggedSolve(self):
+        """Solve the stored system, and add a record of the solve to `log`"""
+        from timeit import default_timer as timer
+
+        record = self.log._newRecord(solver=self, var=self.var)
+        record.times["assembly"] = self._assemblyTime
+        self._assemblyTime = 0.
+        self.stats = {}
+        
+        self._record = record
+        start = timer()
+        try:
+            if self.log.residuals:
+                record.initialResidual = float(self._calcResidual())
+            self._solve()
+            if self.log.residuals and getattr(self, "var", None) is not None:
+                # solvers that discard the system once solved record
+                # the final residual themselves
+                record.finalResidual = float(self._calcResidual())
+        finally:
+            self._record = None
+        record.time = timer() - start + record.times["assembly"]
+            
+        record.stats = dict(self.stats)
+        record.iterations = self.stats.get("iterations")
+        record.warning = self.stats.get("warning")
+        self.log._append(record)
+        
+    def _timing(self, phase):
+        """Return a context in which time is spent on `phase` of the
+        current solve"""
+        from fipy.solvers.solverLog import _PhaseTimer
+        if self._record is None:
+            return _PhaseTimer({}, phase)
+        else:
+            return _PhaseTimer(self._record.times, phase)
+            
+    @property
+    def _residualHistory(self):
+        """The list of residuals, relative to the norm of the right-hand
+        side, after each iteration of the current solve"""
+        if self._record is None:
+            return []
+        else:
+            return self._record.residualHistory
+
+    def _initialGuess(self, x):
+        """
+        Return the initial guess for the solution of the stored system.
+
+        On the first solve of a time step of a `CellVariable` that keeps
+        previous time levels, this is their extrapolation, if it is a
+        better guess than the flattened value `x`. The residuals of both
+        guesses are recorded in `stats`.
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=20)
+        >>> var = CellVariable(mesh=mesh, hasOld=True, history=2)
+        >>> eq = TransientTerm() == DiffusionTerm() + 1.
+        >>> from fipy.solvers.scipy import LinearPCGSolver
+        >>> solver = LinearPCGSolver(tolerance=1e-10)
+        >>> for step in range(3):
+        ...     var.updateOld()
+        ...     eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver.stats['predicted']
+        True
+        >>> print solver.stats['predictedResidual'] < 1e-10 * solver.stats['residual']
+        True
+        >>> print numerix.allclose(var, 3.)
+        True
+        """
+        self.stats = {'predicted': False}
+
+        predicted = getattr(self.var, "_extrapolate", lambda: None)()
+        if predicted is not None:
+            predicted = predicted.ravel()
+            residual = numerix.L2norm(self.matrix * x - self.RHSvector)
+            predictedResidual = numerix.L2norm(self.matrix * predicted - self.RHSvector)
+            self.stats['residual'] = residual
+            self.stats['predictedResidual'] = predictedResidual
+            if predictedResidual < residual:
+                self.stats['predicted'] = True
+                x = predicted
+            
+        return x
+        
     def _solve_(self, L, x, b):
         raise NotImplementedError
         
@@ -161,6 +258,8 @@ class Solver(object):
         # info can be used as an index from the end
                        
         if info < 0:
+            self.stats['warning'] = self._warningList[info].__name__
+
             # is stacklevel=5 always what's needed to get to the user's scope?
             import warnings
             warnings.warn(self._warningList[info](self, iter, relres), stacklevel=5)
@@ -172,3 +271,10 @@ class Solver(object):
     def _canSolveAsymmetric(self):
         return True
 
+def _test(): 
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+    
+if __name__ == "__main__": 
+    _test()
+
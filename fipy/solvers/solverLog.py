@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "solverLog.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from timeit import default_timer as _timer
+
+__all__ = ["SolverLog"]
+
+_phases = ("assembly", "setup", "solve", "scatter")
+
+class _SolveRecord(object):
+    """What happened in a single solve
+    """
+    def __init__(self, index, solver, var):
+        self.index = index
+        self.solver = solver.__class__.__name__
+        self.var = getattr(var, "name", "")
+        self.size = len(getattr(var, "ravel", lambda: ())())
+        self.tolerance = solver.tolerance
+        self.iterations = None
+        self.initialResidual = None
+        self.finalResidual = None
+        self.residualHistory = []
+        self.warning = None
+        self.stats = {}
+        self.times = dict([(phase, 0.) for phase in _phases])
+        self.time = 0.
+
+    def _asDict(self):
+        return dict(index=self.index,
+                    solver=self.solver,
+                    var=self.var,
+                    size=self.size,
+                    tolerance=self.tolerance,
+                    iterations=self.iterations,
+                    initialResidual=self.initialResidual,
+                    finalResidual=self.finalResidual,
+                    residualHistory=list(self.residualHistory),
+                    warning=self.warning,
+                    stats=dict(self.stats),
+                    times=dict(self.times),
+                    time=self.time)
+
+    def __repr__(self):
+        return "<%s %d: %s iterations, residual %s -> %s, %.3g s>" \
+            % (self.solver, self.index, self.iterations, 
+               self.initialResidual, self.finalResidual, self.time)
+
+class _PhaseTimer(object):
+    def __init__(self, times, phase):
+        self.times = times
+        self.phase = phase
+        
+    def __enter__(self):
+        self.start = _timer()
+        return self
+        
+    def __exit__(self, type, value, traceback):
+        self.times[self.phase] = self.times.get(self.phase, 0.) + _timer() - self.start
+
+class SolverLog(object):
+    r"""A record of every solve made by a :class:`~fipy.solvers.solver.Solver`
+
+    Each record holds the number of iterations, the residual after each
+    iteration, when the solver reports it, any warning, and the wall time
+    spent assembling the matrix, setting up the preconditioner or
+    factorization, solving, and scattering the solution back into the
+    `Variable`. The initial and final residuals
+    :math:`\|\mathsf{L}\vec{x} - \vec{b}\|` cost a matrix-vector product
+    each, so they are only recorded when asked for.
+
+    >>> from fipy import *
+    >>> mesh = Grid1D(nx=20)
+    >>> var = CellVariable(mesh=mesh, name="phi")
+    >>> var.constrain(1., mesh.facesLeft)
+    >>> eq = TransientTerm() == DiffusionTerm()
+    >>> from fipy.solvers.scipy import LinearLUSolver, LinearGMRESSolver
+    >>> solver = LinearLUSolver()
+    >>> solver.log = SolverLog(residuals=True)
+    >>> seen = []
+    >>> solver.log.addCallback(lambda record: seen.append(record.index))
+    >>> for step in range(3):
+    ...     eq.solve(var=var, dt=1., solver=solver)
+    >>> print len(solver.log), seen
+    3 [0, 1, 2]
+    >>> record = solver.log[-1]
+    >>> print record.solver, record.var, record.size
+    LinearLUSolver phi 20
+    >>> print record.finalResidual < 1e-10 * record.initialResidual
+    True
+    >>> print len(record.residualHistory) == record.iterations
+    True
+    >>> print sorted(record.times.keys())
+    ['assembly', 'scatter', 'setup', 'solve']
+    >>> print record.time >= record.times['setup'] + record.times['solve']
+    True
+
+    Records are selected by the value of any field, or by a predicate
+
+    >>> print len(solver.log.select(solver="LinearLUSolver"))
+    3
+    >>> print [r.index for r in solver.log.select(lambda r: r.index > 0)]
+    [1, 2]
+    >>> print solver.log.column("iterations") == [r.iterations for r in solver.log]
+    True
+
+    The residual history is relative to the norm of the right-hand side.
+    GMRES reports it, but the other Krylov solvers only report their
+    solution after each iteration, so their residuals cost a
+    matrix-vector product each and are only recorded when asked for
+
+    >>> from fipy.solvers.scipy import LinearPCGSolver
+    >>> solver = LinearPCGSolver(tolerance=1e-10)
+    >>> eq.solve(var=var, dt=1., solver=solver)
+    >>> print len(solver.log[-1].residualHistory)
+    0
+    >>> solver.log = SolverLog(residualHistory=True)
+    >>> eq.solve(var=var, dt=1., solver=solver)
+    >>> print len(solver.log[-1].residualHistory) == solver.log[-1].iterations > 0
+    True
+    >>> solver = LinearGMRESSolver(tolerance=1e-10)
+    >>> eq.solve(var=var, dt=1., solver=solver)
+    >>> print len(solver.log[-1].residualHistory) == solver.log[-1].iterations > 0
+    True
+
+    A log only keeps the most recent records, 100 unless told otherwise,
+
+    >>> print SolverLog().maxRecords
+    100
+
+    and computes no residuals unless told to
+
+    >>> solver = LinearLUSolver()
+    >>> eq.solve(var=var, dt=1., solver=solver)
+    >>> print solver.log[-1].initialResidual, solver.log[-1].finalResidual
+    None None
+
+    It can be shared by several solvers, limited to fewer records, and
+    summarized
+
+    >>> log = SolverLog(maxRecords=2)
+    >>> for step in range(3):
+    ...     solver = LinearLUSolver()
+    ...     solver.log = log
+    ...     eq.solve(var=var, dt=1., solver=solver)
+    >>> print [r.index for r in log]
+    [1, 2]
+    >>> print log.report() # doctest: +ELLIPSIS
+    index solver               iterations   initial res.     final res.   time (s)  setup (s)  solve (s)
+        1 LinearLUSolver ...
+        2 LinearLUSolver ...
+
+    or exported as JSON
+
+    >>> import json
+    >>> print json.loads(log.toJSON())[0]["solver"]
+    LinearLUSolver
+    """
+    def __init__(self, maxRecords=100, residuals=False, residualHistory=False):
+        """
+        :Parameters:
+          - `maxRecords`: the number of most recent records to keep, or all
+            if `None`. Long runs should keep the default bound, as every
+            solve adds a record.
+          - `residuals`: whether to compute the residual before and after
+            each solve
+          - `residualHistory`: whether to compute the residual after each
+            iteration of solvers that do not report it
+        """
+        self.maxRecords = maxRecords
+        self.residuals = residuals
+        self.residualHistory = residualHistory
+        self._records = []
+        self._callbacks = []
+        self._count = 0
+        
+    def addCallback(self, callback):
+        """Call `callback(record)` after each solve
+        """
+        self._callbacks.append(callback)
+        
+    def removeCallback(self, callback):
+        self._callbacks.remove(callback)
+        
+    def clear(self):
+        """Discard all records
+        """
+        self._records = []
+
+    def _newRecord(self, solver, var):
+        record = _SolveRecord(index=self._count, solver=solver, var=var)
+        self._count += 1
+        return record
+        
+    def _append(self, record):
+        self._records.append(record)
+        if self.maxRecords is not None and len(self._records) > self.maxRecords:
+            del self._records[:len(self._records) - self.maxRecords]
+        for callback in self._callbacks:
+            callback(record)
+            
+    def __len__(self):
+        return len(self._records)
+        
+    def __iter__(self):
+        return iter(self._records)
+        
+    def __getitem__(self, index):
+        return self._records[index]
+        
+    def select(self, predicate=None, **fields):
+        """Return the records that satisfy `predicate(record)` and have
+        the given values of `fields`
+        """
+        return [record for record in self._records
+                if (predicate is None or predicate(record))
+                and not [name for name, value in fields.items() 
+                         if getattr(record, name) != value]]
+                         
+    def column(self, name):
+        """Return the value of field `name` of each record
+        """
+        return [getattr(record, name) for record in self._records]
+        
+    def report(self, number=None):
+        """Return a table of the records
+
+        :Parameters:
+          - `number`: the number of most recent records to list, or all if
+            `None`
+        """
+        records = self._records
+        if number is not None:
+            records = records[-number:]
+
+        def format(value, spec):
+            if value is None:
+                return "%*s" % (int(spec.split('.')[0]), "-")
+            else:
+                return ("%" + spec) % value
+
+        lines = ["%5s %-20s %10s %14s %14s %10s %10s %10s"
+                 % ("index", "solver", "iterations", "initial res.", 
+                    "final res.", "time (s)", "setup (s)", "solve (s)")]
+        for record in records:
+            lines.append("%5d %-20s %s %s %s %10.4f %10.4f %10.4f"
+                         % (record.index, record.solver[:20],
+                            format(record.iterations, "10d"),
+                            format(record.initialResidual, "14.4e"),
+                            format(record.finalResidual, "14.4e"),
+                            record.time, record.times["setup"], record.times["solve"]))
+        return "\n".join(lines)
+        
+    def toJSON(self):
+        """Return the records as a JSON list
+        """
+        import json
+        return json.dumps([record._asDict() for record in self._records])
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -34,12 +34,19 @@
 
 __all__ = []
 
-from fipy.tests.lateImportTest import _LateImportTestSuite
+from fipy.tests.doctestPlus import _LateImportDocTestSuite
 import fipy.tests.testProgram
+from fipy.solvers import solver
+
+if solver == 'scipy' or solver == 'pyamg':
+    docTestModuleNames = ('solver', 'solverLog', 'refreshPolicy', 'scipy.linearLUSolver', 'scipy.newtonKrylovSolver', 'scipy.distributedKrylov')
+else:
+    docTestModuleNames = ()
 
 def _suite():
-    return _LateImportTestSuite(testModuleNames = (), 
-                                base = __name__)
+    return _LateImportDocTestSuite(testModuleNames = (), 
+                                   docTestModuleNames = docTestModuleNames,
+                                   base = __name__)
     
 if __name__ == '__main__':
     fipy.tests.testProgram.main(defaultTest='_suite')
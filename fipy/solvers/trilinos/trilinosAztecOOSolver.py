@@ -76,11 +76,14 @@ class TrilinosAztecOOSolver(TrilinosSolver):
         Solver.SetAztecOption(AztecOO.AZ_output, AztecOO.AZ_none)
 
         if self.preconditioner is not None:
-            self.preconditioner._applyToSolver(solver=Solver, matrix=L)
+            with self._timing("setup"):
+                self.preconditioner._applyToSolver(solver=Solver, matrix=L)
         else:
             Solver.SetAztecOption(AztecOO.AZ_precond, AztecOO.AZ_none)
 
-        output = Solver.Iterate(self.iterations, self.tolerance)
+        with self._timing("solve"):
+            output = Solver.Iterate(self.iterations, self.tolerance)
+        self.stats['iterations'] = Solver.NumIters()
 
         if self.preconditioner is not None:
             if hasattr(self.preconditioner, 'Prec'):
@@ -116,12 +116,17 @@ class TrilinosSolver(Solver):
                      nonOverlappingVector, 
                      nonOverlappingRHSvector)
 
-        overlappingVector.Import(nonOverlappingVector, 
-                                 Epetra.Import(globalMatrix.colMap, 
-                                               globalMatrix.domainMap), 
-                                 Epetra.Insert)
-        
-        self.var.value = numerix.reshape(numerix.array(overlappingVector), self.var.shape)
+        with self._timing("scatter"):
+            overlappingVector.Import(nonOverlappingVector, 
+                                     Epetra.Import(globalMatrix.colMap, 
+                                                   globalMatrix.domainMap), 
+                                     Epetra.Insert)
+            
+            self.var.value = numerix.reshape(numerix.array(overlappingVector), self.var.shape)
+
+        if self._record is not None and self.log.residuals:
+            # the system is discarded below, so record its residual now
+            self._record.finalResidual = float(self._calcResidual())
 
         self._deleteGlobalMatrixAndVectors()
         del self.var
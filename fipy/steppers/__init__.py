@@ -33,6 +33,9 @@ __docformat__ = 'restructuredtext'
 from fipy.steppers.stepper import Stepper
 from fipy.steppers.pseudoRKQSStepper import PseudoRKQSStepper
 from fipy.steppers.pidStepper import PIDStepper
+from fipy.steppers.bdf2Stepper import BDF2Stepper
+from fipy.steppers.andersonSweeper import AndersonSweeper
+from fipy.steppers.subcyclingStepper import SubcyclingStepper
 
 __all__ = ["L1error", "L2error", "LINFerror", "sweepMonotonic"]
 
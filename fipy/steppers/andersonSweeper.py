@@ -0,0 +1,263 @@
+## -*-Pyth-*-
+ # ########################################################################
+ # FiPy - a finite volume PDE solver in Python
+ #
+ # FILE: "andersonSweeper.py"
+ #
+ # Author: Jonathan Guyer <guyer@nist.gov>
+ # Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ # Author: James Warren   <jwarren@nist.gov>
+ #   mail: NIST
+ #    www: <http://www.ctcms.nist.gov/fipy/>
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ########################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+
+__all__ = ["AndersonSweeper"]
+
+class AndersonSweeper:
+    r"""
+    Sweeps the equations of a `Stepper` until their residual drops below
+    `tolerance`, applying Anderson mixing between sweeps.
+
+    Each sweep is a fixed-point map :math:`\vec{x} \to G(\vec{x})` of the
+    solution variables. Rather than taking :math:`G(\vec{x}_k)` as the next
+    iterate, the sweeper keeps the last `depth` iterates and their sweep
+    increments :math:`\vec{f}_k = G(\vec{x}_k) - \vec{x}_k` and takes
+
+    .. math::
+
+       \vec{x}_{k+1} = \vec{x}_k + \beta \vec{f}_k
+       - \sum_i \gamma_i (\Delta\vec{x}_i + \beta \Delta\vec{f}_i)
+
+    where :math:`\vec{\gamma}` minimizes
+    :math:`\|\vec{f}_k - \sum_i \gamma_i \Delta\vec{f}_i\|_2` and
+    :math:`\beta` is the `damping`. The history only lives for one call,
+    so it starts afresh with every time step.
+
+    An instance is passed as the `sweepFn` of any `Stepper`
+
+        >>> stepper.step(dt, sweepFn=AndersonSweeper(depth=3)) # doctest: +SKIP
+
+    A nonlinear diffusion problem, first swept by hand
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=50, dx=1. / 50)
+        >>> def problem():
+        ...     phi = CellVariable(mesh=mesh, value=0.)
+        ...     phi.constrain(0., mesh.facesLeft)
+        ...     phi.constrain(1., mesh.facesRight)
+        ...     eq = DiffusionTerm(coeff=1. + 10. * phi.arithmeticFaceValue**2)
+        ...     return phi, eq
+
+        >>> phi, eq = problem()
+        >>> plain = 0
+        >>> residual = 1.
+        >>> while residual > 1e-6 and plain < 200:
+        ...     residual = eq.sweep(var=phi)
+        ...     plain += 1
+
+    and then with Anderson mixing
+
+        >>> phi2, eq2 = problem()
+        >>> sweeper = AndersonSweeper(depth=3, tolerance=1e-6, sweeps=200)
+        >>> print sweeper(vardata=((phi2, eq2, ()),), dt=None) <= 1e-6
+        True
+        >>> print sweeper.sweepCount < plain
+        True
+        >>> print len(sweeper.residuals) == sweeper.sweepCount
+        True
+        >>> print numerix.allclose(phi, phi2, atol=1e-5)
+        True
+
+    The variables of a coupled equation are mixed together. A coupled
+    equation may be listed once for each of its variables, so that a
+    `Stepper` updates them all, but it is only swept once per iteration
+
+        >>> v0 = CellVariable(mesh=mesh, value=0.)
+        >>> v0.constrain(1., mesh.facesLeft)
+        >>> v1 = CellVariable(mesh=mesh, value=0.)
+        >>> v1.constrain(1., mesh.facesRight)
+        >>> eq0 = DiffusionTerm(coeff=1. + v1.arithmeticFaceValue**2, var=v0) - ImplicitSourceTerm(coeff=1., var=v1)
+        >>> eq1 = DiffusionTerm(coeff=1. + v0.arithmeticFaceValue**2, var=v1) - ImplicitSourceTerm(coeff=1., var=v0)
+        >>> eq = eq0 & eq1
+        >>> print sweeper(vardata=((v0, eq, ()), (v1, eq, ())), dt=None) <= 1e-6
+        True
+        >>> print (len(sweeper._equations(((v0, eq, ()), (v1, eq, ())))),
+        ...        len(sweeper._variables(((v0, eq, ()), (v1, eq, ())))))
+        (1, 2)
+    """
+    def __init__(self, depth=5, tolerance=1e-6, sweeps=20, damping=1., regularization=1e-12, solver=None):
+        """
+        :Parameters:
+          - `depth`: The number of previous iterates used for mixing. A
+            `depth` of 0 is plain sweeping.
+          - `tolerance`: Sweeping stops once the largest residual returned
+            by `sweep()` is no greater than this.
+          - `sweeps`: The maximum number of sweeps per call.
+          - `damping`: The mixing parameter :math:`\\beta`.
+          - `regularization`: Relative Tikhonov regularization of the
+            least-squares problem, which keeps nearly dependent histories
+            from producing wild steps.
+          - `solver`: The solver passed to each `sweep()`.
+        """
+        self.depth = depth
+        self.tolerance = tolerance
+        self.sweeps = sweeps
+        self.damping = damping
+        self.regularization = regularization
+        self.solver = solver
+
+        self.sweepCount = 0
+        self.residuals = []
+
+    @staticmethod
+    def _equations(vardata):
+        from fipy.terms.coupledBinaryTerm import _CoupledBinaryTerm
+
+        equations = []
+        for var, eqn, bcs in vardata:
+            if isinstance(eqn, _CoupledBinaryTerm):
+                var = None
+            if not [e for (v, e, b) in equations if e is eqn]:
+                equations.append((var, eqn, bcs))
+        return equations
+
+    @staticmethod
+    def _variables(vardata):
+        from fipy.terms.coupledBinaryTerm import _CoupledBinaryTerm
+
+        variables = []
+        for var, eqn, bcs in vardata:
+            if isinstance(eqn, _CoupledBinaryTerm):
+                coupled = eqn._vars
+            else:
+                coupled = [var]
+            for v in coupled:
+                if not [u for u in variables if u is v]:
+                    variables.append(v)
+        return variables
+
+    @staticmethod
+    def _snapshot(variables):
+        return numerix.concatenate([numerix.array(var.value, dtype=float).ravel() for var in variables])
+
+    @staticmethod
+    def _restore(variables, x):
+        start = 0
+        for var in variables:
+            size = numerix.array(var.value).size
+            var.setValue(numerix.reshape(x[start:start + size], var.shape))
+            start += size
+
+    @staticmethod
+    def _owned(variables):
+        """Mask of the entries of a snapshot that this processor owns, so
+        that ghost cells are not counted twice in parallel inner products
+        """
+        masks = []
+        for var in variables:
+            owned = numerix.zeros(var.shape[-1:], dtype=bool)
+            owned[var.mesh._localNonOverlappingCellIDs] = True
+            masks.append((numerix.zeros(var.shape, dtype=bool) | owned).ravel())
+        return numerix.concatenate(masks)
+
+    def _sweep(self, equations, dt):
+        residual = 0
+        for var, eqn, bcs in equations:
+            residual = max(residual, eqn.sweep(var=var, dt=dt, boundaryConditions=bcs, solver=self.solver))
+        return residual
+
+    def _mix(self, x, f, dX, dF, owned, communicator):
+        """Anderson update from the current iterate `x`, its increment `f`
+        and the histories of their differences
+        """
+        beta = self.damping
+        if len(dF) == 0:
+            return x + beta * f
+
+        DF = numerix.array(dF)[..., owned]
+        k = len(dF)
+
+        gram = numerix.dot(DF, numerix.transpose(DF))
+        rhs = numerix.dot(DF, f[owned])
+        reduced = communicator.sum(numerix.concatenate((gram.ravel(), rhs))[numerix.newaxis], axis=0)
+        gram = numerix.reshape(reduced[:k * k], (k, k))
+        rhs = reduced[k * k:]
+
+        scale = numerix.trace(gram) or 1.
+        gram = gram + self.regularization * scale * numerix.identity(k)
+        gamma = numerix.linalg.solve(gram, rhs)
+
+        return x + beta * f - numerix.dot(gamma, numerix.array(dX) + beta * numerix.array(dF))
+
+    def __call__(self, vardata, dt, *args, **kwargs):
+        """
+        Sweep the equations of `vardata` with Anderson mixing.
+
+        :Parameters:
+          - `vardata`: A `tuple` of `(var, eqn, boundaryConditions)`
+            `tuple`s, as held by a `Stepper`
+          - `dt`: The time step size
+
+        :Returns: the largest residual of the final sweep
+        """
+        equations = self._equations(vardata)
+        variables = self._variables(vardata)
+        owned = self._owned(variables)
+        communicator = variables[0].mesh.communicator
+
+        self.sweepCount = 0
+        self.residuals = []
+
+        dX = []
+        dF = []
+        xPrev = fPrev = None
+        x = self._snapshot(variables)
+
+        residual = 0
+        for sweep in range(self.sweeps):
+            residual = self._sweep(equations, dt)
+            self.sweepCount += 1
+            self.residuals.append(residual)
+
+            if residual <= self.tolerance:
+                break
+            elif self.depth == 0:
+                x = self._snapshot(variables)
+                continue
+
+            f = self._snapshot(variables) - x
+            if xPrev is not None:
+                dX.append(x - xPrev)
+                dF.append(f - fPrev)
+                if len(dX) > self.depth:
+                    del dX[0]
+                    del dF[0]
+
+            xPrev, fPrev = x, f
+            x = self._mix(x, f, dX, dF, owned, communicator)
+            self._restore(variables, x)
+
+        return residual
@@ -0,0 +1,249 @@
+## -*-Pyth-*-
+ # ########################################################################
+ # FiPy - a finite volume PDE solver in Python
+ #
+ # FILE: "bdf2Stepper.py"
+ #
+ # Author: Jonathan Guyer <guyer@nist.gov>
+ # Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ # Author: James Warren   <jwarren@nist.gov>
+ #   mail: NIST
+ #    www: <http://www.ctcms.nist.gov/fipy/>
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ########################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+from fipy.steppers.stepper import Stepper
+from fipy.tools import numerix
+
+__all__ = ["BDF2Stepper"]
+
+class BDF2Stepper(Stepper):
+    r"""
+    Adaptive stepper using the variable-step, second-order backward
+    differentiation formula
+
+    .. math::
+
+       \frac{1 + 2\omega}{1 + \omega} \phi^{n+1} - (1 + \omega) \phi^n
+       + \frac{\omega^2}{1 + \omega} \phi^{n-1} = \Delta t_n f(\phi^{n+1})
+
+    where :math:`\omega = \Delta t_n / \Delta t_{n-1}`.
+
+    The equations are written as usual, with a first-order
+    `TransientTerm`. The stepper rewrites the formula as a backward Euler
+    step of size :math:`\Delta t_n / a_0` from a combination of the two
+    previous time levels, which it puts in `var.old` for the duration of
+    the sweeps. A coefficient of the `TransientTerm` is therefore held at
+    its value for the new time level.
+
+    The local truncation error is estimated from the difference between
+    the solution and a polynomial extrapolation of the previous time
+    levels, and a step is rejected when its weighted RMS norm
+
+    .. math::
+
+       \sqrt{\frac{1}{N} \sum \left(\frac{\delta}{\mathtt{atol}
+       + \mathtt{rtol} |\phi|}\right)^2}
+
+    exceeds 1. The first step is backward Euler, which is accepted
+    without an estimate, and the second is backward Euler with a
+    first-order estimate.
+
+    Integrating :math:`\partial\phi/\partial t = -\phi`
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=1)
+        >>> def integrate(order):
+        ...     phi = CellVariable(mesh=mesh, value=1., hasOld=True)
+        ...     eq = TransientTerm() == -ImplicitSourceTerm(coeff=1.)
+        ...     stepper = BDF2Stepper(vardata=((phi, eq, ()),), order=order, rtol=1e-4, atol=1e-8)
+        ...     stepper.step(dt=1., dtTry=1e-3)
+        ...     return phi, stepper
+
+    is more accurate with the second-order formula, and takes many fewer
+    steps
+
+        >>> phi2, bdf2 = integrate(order=2)
+        >>> print numerix.allclose(phi2, numerix.exp(-1.), rtol=5e-3)
+        True
+        >>> phi1, euler = integrate(order=1)
+        >>> print numerix.allclose(phi1, numerix.exp(-1.), rtol=2e-2)
+        True
+        >>> print bdf2.nsteps < euler.nsteps / 2
+        True
+        >>> print bdf2.error <= 1.
+        True
+
+    The history of time levels is kept from one call to `step()` to the
+    next. It should be discarded with `reset()` whenever the variables are
+    changed by something other than the stepper
+
+        >>> bdf2.reset()
+        >>> print bdf2.nsteps, bdf2._levels
+        0 []
+    """
+    def __init__(self, vardata=(), order=2, rtol=1e-3, atol=1e-6, safety=0.9, maxGrow=2., minShrink=0.2):
+        """
+        :Parameters:
+          - `vardata`: A `tuple` of `(var, eqn, boundaryConditions)` `tuple`s
+          - `order`: 2 for BDF2, or 1 for backward Euler with error control
+          - `rtol`: The relative error tolerance
+          - `atol`: The absolute error tolerance
+          - `safety`: The fraction of the estimated optimal step to take
+          - `maxGrow`: The largest ratio of successive steps. BDF2 is only
+            zero-stable for ratios below :math:`1 + \\sqrt{2}`.
+          - `minShrink`: The smallest ratio of successive steps
+        """
+        Stepper.__init__(self, vardata=vardata)
+
+        self.order = order
+        self.rtol = rtol
+        self.atol = atol
+        self.safety = safety
+        self.maxGrow = maxGrow
+        self.minShrink = minShrink
+
+        self.reset()
+
+    def reset(self):
+        """
+        Discard the previous time levels, so that the next step starts
+        again from backward Euler.
+        """
+        # ([values of each var], dt) of the previous time levels, most recent first
+        self._levels = []
+        self.error = 0.
+        self.nsteps = 0
+        self.nrej = 0
+
+    def _coefficients(self, dt, order):
+        r"""
+        Return :math:`a_0` and the weights of :math:`\phi^n, \phi^{n-1},
+        \ldots` in the shifted old value.
+        """
+        if order < 2:
+            return 1., [1.]
+        else:
+            omega = dt / self._levels[0][1]
+            a0 = (1. + 2. * omega) / (1. + omega)
+            return a0, [(1. + omega) / a0, -omega**2 / ((1. + omega) * a0)]
+
+    def _pastLevels(self, current, index, order):
+        """
+        Return the values of the `index`-th variable at the current and
+        `order` previous time levels, and their times relative to the
+        current one.
+        """
+        values = [current[index]]
+        times = [0.]
+        t = 0.
+        for levelValues, h in self._levels[:order]:
+            t -= h
+            values.append(levelValues[index])
+            times.append(t)
+        return values, times
+
+    @staticmethod
+    def _extrapolate(values, times, t):
+        """
+        Evaluate the Lagrange polynomial through `values` at `times` at
+        time `t`
+
+            >>> print BDF2Stepper._extrapolate([1., 0., 1.], [0., -1., -2.], 1.)
+            4.0
+        """
+        predicted = 0.
+        for i, (value, ti) in enumerate(zip(values, times)):
+            weight = 1.
+            for j, tj in enumerate(times):
+                if j != i:
+                    weight *= (t - tj) / (ti - tj)
+            predicted = predicted + weight * value
+        return predicted
+
+    def _norm(self, var, delta, previous):
+        scale = self.atol + self.rtol * numerix.maximum(abs(numerix.array(var.value)), abs(previous))
+        scaled = (delta / scale)[..., var.mesh._localNonOverlappingCellIDs]
+        communicator = var.mesh.communicator
+        return numerix.sqrt(communicator.sum(scaled**2)
+                            / communicator.sum(numerix.array([scaled.size])))
+
+    def _step(self, dt, dtPrev, sweepFn, failFn, *args, **kwargs):
+        variables = self._variables
+        current = [numerix.array(var.old.value).copy() for var in variables]
+
+        while 1:
+            order = min(self.order, len(self._levels))
+            if order >= 2:
+                dt = min(dt, self.maxGrow * self._levels[0][1])
+            a0, weights = self._coefficients(dt, order)
+
+            self._saveState()
+
+            predicted = []
+            for index, var in enumerate(variables):
+                values, times = self._pastLevels(current, index, order)
+                if order > 0:
+                    predicted.append(self._extrapolate(values, times, dt))
+                    var.setValue(predicted[-1])
+                var.old.value = sum([w * v for w, v in zip(weights, values)])
+
+            sweepFn(vardata=self.vardata, dt=dt / a0, *args, **kwargs)
+
+            for var, previous in zip(variables, current):
+                var.old.value = previous
+
+            if order == 0:
+                error = 0.
+                break
+
+            span = dt + sum([h for levelValues, h in self._levels[:order]])
+            factor = (dt / a0) / (dt / a0 + span)
+            error = max([self._norm(var, factor * (numerix.array(var.value) - prediction), previous)
+                         for var, prediction, previous in zip(variables, predicted, current)])
+
+            if error > 1. and dt > self.dtMin:
+                # reject the timestep
+                failFn(vardata=self.vardata, dt=dt, *args, **kwargs)
+
+                self.nrej += 1
+
+                self._restoreState()
+
+                dt = self._lowerBound(dt * max(self.minShrink, self.safety * error**(-1. / (order + 1))))
+            else:
+                # step succeeded
+                break
+
+        self.error = error
+        self.nsteps += 1
+        self._levels.insert(0, (current, dt))
+        del self._levels[self.order:]
+
+        if order == 0:
+            dtNext = dt
+        else:
+            growth = self.safety * max(error, 1e-10)**(-1. / (order + 1))
+            dtNext = dt * min(self.maxGrow, max(self.minShrink, growth))
+
+        return dt, dtNext
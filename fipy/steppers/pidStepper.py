@@ -61,6 +61,7 @@ class PIDStepper(Stepper):
         
     def _step(self, dt, dtPrev, sweepFn, failFn, *args, **kwargs):
         while 1:
+            self._saveState()
             self.error[2] = sweepFn(vardata=self.vardata, dt=dt, *args, **kwargs)
             
             # omitting nsa > nsaMax check since it's unclear from 
@@ -71,8 +72,7 @@ class PIDStepper(Stepper):
                 
                 self.nrej += 1
                 
-                for var, eqn, bcs in self.vardata:
-                    var.setValue(var.old)
+                self._restoreState()
 
                 factor = min(1. / self.error[2], 0.8)
                 
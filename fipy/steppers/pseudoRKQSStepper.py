@@ -53,6 +53,7 @@ class PseudoRKQSStepper(Stepper):
     def _step(self, dt, dtPrev, sweepFn, failFn, *args, **kwargs):
         residual = 1e100
         while residual > 1.:
+            self._saveState()
             residual = sweepFn(vardata=self.vardata, dt=dt, *args, **kwargs)
             
             if residual > 1.:
@@ -60,9 +61,9 @@ class PseudoRKQSStepper(Stepper):
                 failFn(vardata=self.vardata, dt=dt, *args, **kwargs)
                     
                 # revert
+                self._restoreState()
+
                 for var, eqn, bcs in self.vardata:
-                    var.setValue(var.old)
-                    
                     dt = max(self.safety * dt * residual**self.pgrow, 0.1 * dt)
                     
                 dt = self._lowerBound(dt)
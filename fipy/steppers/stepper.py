@@ -37,6 +37,30 @@ __all__ = ["Stepper"]
 class Stepper:
     def __init__(self, vardata=()):
         self.vardata = vardata
+        self._checkpoint = None
+
+    @property
+    def _variables(self):
+        variables = []
+        for var, eqn, bcs in self.vardata:
+            if not [v for v in variables if v is var]:
+                variables.append(var)
+        return variables
+
+    def _saveState(self):
+        """Checkpoint the variables before attempting a step"""
+        variables = self._variables
+        if (self._checkpoint is None
+            or [id(var) for var in self._checkpoint.variables] != [id(var) for var in variables]):
+            from fipy.variables.checkpoint import _Checkpoint
+            self._checkpoint = _Checkpoint(variables)
+        self._checkpoint.save()
+
+    def _restoreState(self):
+        """Roll the variables back to the last checkpoint after a rejected
+        step, without recalculating what depends on them
+        """
+        self._checkpoint.restore()
         
     def sweepFn(vardata, dt, *args, **kwargs):
         residual = 0
@@ -0,0 +1,285 @@
+## -*-Pyth-*-
+ # ########################################################################
+ # FiPy - a finite volume PDE solver in Python
+ #
+ # FILE: "subcyclingStepper.py"
+ #
+ # Author: Jonathan Guyer <guyer@nist.gov>
+ # Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ # Author: James Warren   <jwarren@nist.gov>
+ #   mail: NIST
+ #    www: <http://www.ctcms.nist.gov/fipy/>
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ########################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from fipy.steppers.stepper import Stepper
+from fipy.tools import numerix
+
+__all__ = ["SubcyclingStepper"]
+
+class SubcyclingStepper(Stepper):
+    r"""
+    Stepper that advances the explicit terms of each equation with several
+    substeps for every step of its implicit terms.
+
+    Each equation is split, term by term, into
+
+    .. math::
+
+       \frac{\partial (\rho \phi)}{\partial t} = E(\phi^\text{old})
+       \qquad\text{and}\qquad
+       \frac{\partial (\rho \phi)}{\partial t} = I(\phi)
+
+    where :math:`E` holds the terms whose weights have no implicit part,
+    such as `ExplicitUpwindConvectionTerm`, `ExplicitDiffusionTerm` and
+    explicit sources, and :math:`I` holds everything else. The
+    `TransientTerm` appears in both. A step of size :math:`\Delta t` first
+    takes :math:`n` substeps of size :math:`\Delta t / n` of the explicit
+    part with `explicitUpdate()` and then sweeps the implicit part over the
+    whole of :math:`\Delta t`, starting from the result. The splitting is
+    first-order accurate in time.
+
+    Unless it is fixed by `substeps`, :math:`n` is chosen to keep each
+    substep within the stability limit
+
+    .. math::
+
+       \frac{\Delta t}{n} \le \frac{C}{\max_P \frac{1}{\rho_P V_P}
+       \sum_f \left(\tfrac{1}{2} |\vec{u}_f \cdot \hat{n}_f| A_f
+       + \frac{\Gamma_f A_f}{d_{AP}}\right)}
+
+    of the explicit convection and diffusion terms, where :math:`C` is the
+    `courant` number. It is recalculated from the coefficients at every
+    step.
+
+    Advecting a pulse around a periodic domain with implicit diffusion
+
+        >>> from fipy import *
+        >>> mesh = PeriodicGrid1D(nx=100, dx=0.01)
+        >>> x = mesh.cellCenters[0]
+        >>> def pulse():
+        ...     return CellVariable(mesh=mesh, value=(x > 0.1) & (x < 0.3), hasOld=True)
+        >>> phi = pulse()
+        >>> eq = (TransientTerm() + ExplicitUpwindConvectionTerm(coeff=(1.,))
+        ...       == DiffusionTerm(coeff=1e-3))
+        >>> stepper = SubcyclingStepper(vardata=((phi, eq, ()),))
+        >>> for step in range(10):
+        ...     dtPrev, dtNext = stepper.step(dt=0.05)
+
+    takes six explicit substeps to each implicit step, which keeps the
+    solution bounded and conserves it
+
+        >>> print stepper.nsubsteps
+        6
+        >>> values = numerix.array(phi)
+        >>> print values.min() >= -1e-12 and values.max() <= 1 + 1e-12
+        True
+        >>> print numerix.allclose(phi.cellVolumeAverage, 0.2)
+        True
+
+    whereas solving the whole equation at the same step overshoots
+
+        >>> unsplit = pulse()
+        >>> unsplit.updateOld()
+        >>> eq.solve(unsplit, dt=0.05)
+        >>> print numerix.array(unsplit).max() > 1
+        True
+
+    Substeps are not kept as time levels of a variable with a history
+
+        >>> phi = CellVariable(mesh=mesh, value=(x > 0.1) & (x < 0.3), hasOld=True, history=2)
+        >>> stepper = SubcyclingStepper(vardata=((phi, eq, ()),))
+        >>> count = phi._historyCount
+        >>> dtPrev, dtNext = stepper.step(dt=0.05)
+        >>> print phi._historyCount - count
+        1
+
+    An equation without explicit terms is simply swept
+
+        >>> eq2 = TransientTerm() == DiffusionTerm(coeff=1e-3)
+        >>> stepper = SubcyclingStepper(vardata=((phi, eq2, ()),))
+        >>> stepper.step(dt=0.05)
+        (0.05, 0.05)
+        >>> print stepper.nsubsteps
+        0
+
+    and one with explicit terms needs a `TransientTerm`
+
+        >>> SubcyclingStepper(vardata=((phi, ExplicitDiffusionTerm(coeff=1.) == 0, ()),))
+        Traceback (most recent call last):
+            ...
+        TransientTermError: The equation requires a TransientTerm with explicit convection.
+    """
+    def __init__(self, vardata=(), substeps=None, courant=0.9):
+        """
+        :Parameters:
+          - `vardata`: A `tuple` of `(var, eqn, boundaryConditions)` `tuple`s
+          - `substeps`: The number of explicit substeps per step. It is
+            estimated from the stability limit if `None`.
+          - `courant`: The fraction of the stability limit taken by each
+            explicit substep
+        """
+        Stepper.__init__(self, vardata=vardata)
+
+        self.substeps = substeps
+        self.courant = courant
+        self.nsubsteps = 0
+
+        self._splits = [self._split(var, eqn, bcs) for var, eqn, bcs in vardata]
+
+    @staticmethod
+    def _leaves(eqn):
+        from fipy.terms.binaryTerm import _BinaryTerm
+
+        if isinstance(eqn, _BinaryTerm):
+            return SubcyclingStepper._leaves(eqn.term) + SubcyclingStepper._leaves(eqn.other)
+        else:
+            return [eqn]
+
+    @staticmethod
+    def _isExplicit(term, var, transientGeomCoeff, diffusionGeomCoeff):
+        """Whether the weights of `term` leave nothing in the matrix"""
+        from fipy.terms.unaryTerm import _UnaryTerm
+        from fipy.terms.explicitDiffusionTerm import ExplicitDiffusionTerm
+        from fipy.terms.abstractDiffusionTerm import _AbstractDiffusionTerm
+        from fipy.terms.faceTerm import FaceTerm
+        from fipy.terms.cellTerm import CellTerm
+
+        if not isinstance(term, _UnaryTerm) or (term.var is not None and term.var is not var):
+            return False
+        elif isinstance(term, _AbstractDiffusionTerm):
+            return isinstance(term, ExplicitDiffusionTerm)
+
+        try:
+            weight = term._getWeight(var, transientGeomCoeff, diffusionGeomCoeff)
+        except NotImplementedError:
+            return False
+
+        if isinstance(term, FaceTerm):
+            return 'implicit' not in weight
+        elif isinstance(term, CellTerm):
+            return not (numerix.any(weight['new value']) or numerix.any(weight['diagonal']))
+        else:
+            return False
+
+    def _split(self, var, eqn, bcs):
+        """Return `(var, transient, explicit, implicit, bcs)`, where
+        `explicit` and `implicit` are the two parts of `eqn`, both with
+        its `TransientTerm`
+        """
+        from fipy.terms.transientTerm import TransientTerm
+        from fipy.terms import TransientTermError
+
+        transientGeomCoeff = eqn._getTransientGeomCoeff(var)
+        diffusionGeomCoeff = eqn._getDiffusionGeomCoeff(var)
+
+        transient = []
+        explicit = []
+        implicit = []
+        for term in self._leaves(eqn):
+            if isinstance(term, TransientTerm):
+                transient.append(term)
+            elif self._isExplicit(term, var, transientGeomCoeff, diffusionGeomCoeff):
+                explicit.append(term)
+            else:
+                implicit.append(term)
+
+        if len(explicit) == 0:
+            return (var, transient, None, eqn, bcs)
+        elif len(transient) == 0:
+            raise TransientTermError
+
+        return (var, transient, self._sum(transient + explicit), self._sum(transient + implicit), bcs)
+
+    @staticmethod
+    def _sum(terms):
+        eqn = terms[0]
+        for term in terms[1:]:
+            eqn = eqn + term
+        return eqn
+
+    def _rate(self, var, transient, explicit):
+        """The largest inverse stability limit of the explicit terms in
+        any cell
+        """
+        from fipy.terms.abstractConvectionTerm import _AbstractConvectionTerm
+        from fipy.terms.explicitDiffusionTerm import ExplicitDiffusionTerm
+
+        mesh = var.mesh
+        flux = numerix.zeros((mesh.numberOfFaces,), 'd')
+        for term in self._leaves(explicit):
+            if isinstance(term, _AbstractConvectionTerm):
+                coeff = 0.5 * abs(numerix.array(term._getGeomCoeff(var)))
+            elif isinstance(term, ExplicitDiffusionTerm) and term.order == 2:
+                coeff = abs(numerix.array(term._getGeomCoeff(var)[0]))
+            else:
+                continue
+            if coeff.shape == flux.shape:
+                flux += coeff
+
+        rate = numerix.MA.filled(numerix.take(flux, mesh.cellFaceIDs, axis=-1), 0.).sum(0)
+        rate = rate / abs(numerix.array(self._sum(transient)._getTransientGeomCoeff(var)))
+
+        return mesh.communicator.MaxAll(numerix.array([rate[..., mesh._localNonOverlappingCellIDs].max()]))
+
+    def _substeps(self, dt):
+        if self.substeps is not None:
+            return self.substeps
+
+        rate = max([self._rate(var, transient, explicit)
+                    for var, transient, explicit, implicit, bcs in self._splits
+                    if explicit is not None])
+
+        return max(1, int(numerix.ceil(dt * rate / self.courant)))
+
+    def _step(self, dt, dtPrev, sweepFn, failFn, *args, **kwargs):
+        explicitSplits = [split for split in self._splits if split[2] is not None]
+
+        if len(explicitSplits) == 0:
+            self.nsubsteps = 0
+        else:
+            self.nsubsteps = self._substeps(dt)
+
+            variables = self._variables
+            start = [numerix.array(var.old.value).copy() for var in variables]
+
+            # set `old` directly rather than with `updateOld()`, which would
+            # keep each substep as a time level of variables with a history
+            for substep in range(self.nsubsteps):
+                for var in variables:
+                    var.old.value = var.value.copy()
+                for var, transient, explicit, implicit, bcs in explicitSplits:
+                    explicit.explicitUpdate(var=var, boundaryConditions=bcs, dt=dt / self.nsubsteps)
+
+            for var in variables:
+                var.old.value = var.value.copy()
+
+        sweepFn(vardata=tuple([(var, implicit, bcs) for var, transient, explicit, implicit, bcs in self._splits]),
+                dt=dt, *args, **kwargs)
+
+        if len(explicitSplits) > 0:
+            for var, previous in zip(variables, start):
+                var.old.value = previous
+
+        return dt, dt
@@ -30,6 +30,10 @@ class TransientTermError(Exception):
     def __init__(self, s='The equation requires a TransientTerm with explicit convection.'):
         Exception.__init__(self, s)
 
+class _NotDiagonalError(Exception):
+    def __init__(self, s='The matrix of the term is not diagonal.'):
+        Exception.__init__(self, s)
+
 from fipy.terms.transientTerm import *
 from fipy.terms.diffusionTerm import *
 from fipy.terms.explicitDiffusionTerm import *
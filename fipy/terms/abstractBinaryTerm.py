@@ -107,6 +107,10 @@ class _AbstractBinaryTerm(Term):
     def _checkVar(self, var):
         self.term._checkVar(var)
         self.other._checkVar(var)
+
+    def cacheAssembly(self):
+        self.term.cacheAssembly()
+        self.other.cacheAssembly()
     
 
 from fipy.terms.nonDiffusionTerm import _NonDiffusionTerm
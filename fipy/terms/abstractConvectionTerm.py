@@ -186,12 +186,7 @@ class _AbstractConvectionTerm(FaceTerm):
             if (coeffShape is ()) or (coeffShape[0] != var.mesh.dim):
                 raise VectorCoeffError
 
-    def _buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
-        
-        var, L, b = FaceTerm._buildMatrix(self, var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
-
-##        if var.rank != 1:
-
+    def __calcConstraints(self, var, transientGeomCoeff, diffusionGeomCoeff):
         mesh = var.mesh
 
         if (not hasattr(self, 'constraintL')) or (not hasattr(self, 'constraintB')):
@@ -210,12 +205,29 @@ class _AbstractConvectionTerm(FaceTerm):
             self.constraintL = (alpha * constraintMask * exteriorCoeff).divergence * mesh.cellVolumes
             self.constraintB =  -((1 - alpha) * var.arithmeticFaceValue * constraintMask * exteriorCoeff).divergence * mesh.cellVolumes
 
+    def _buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        
+        var, L, b = FaceTerm._buildMatrix(self, var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+##        if var.rank != 1:
+
+        mesh = var.mesh
+
+        self.__calcConstraints(var, transientGeomCoeff, diffusionGeomCoeff)
+
         ids = self._reshapeIDs(var, numerix.arange(mesh.numberOfCells))
         L.addAt(numerix.array(self.constraintL).ravel(), ids.ravel(), ids.swapaxes(0,1).ravel())
         b += numerix.reshape(self.constraintB.value, ids.shape).sum(0).ravel()
 
         return (var, L, b)
 
+    def _buildDiagonal(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        var, diagonal, b = FaceTerm._buildDiagonal(self, var, boundaryConditions=boundaryConditions, dt=dt, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+        self.__calcConstraints(var, transientGeomCoeff, diffusionGeomCoeff)
+
+        return (var, diagonal + numerix.array(self.constraintL).ravel(), b + numerix.array(self.constraintB).ravel())
+
 class __ConvectionTerm(_AbstractConvectionTerm): 
     """
     Dummy subclass for tests
@@ -40,8 +40,10 @@ import os
 
 from fipy.terms.unaryTerm import _UnaryTerm
 from fipy.tools import numerix
+from fipy.tools import vector
 from fipy.terms import TermMultiplyError
 from fipy.terms import AbstractBaseClassError
+from fipy.terms import _NotDiagonalError
 from fipy.variables.faceVariable import FaceVariable
 
 class _AbstractDiffusionTerm(_UnaryTerm):
@@ -222,10 +224,10 @@ class _AbstractDiffusionTerm(_UnaryTerm):
 
         coefficientMatrix = SparseMatrix(mesh=mesh, bandwidth = mesh._maxFacesPerCell + 1)
         interiorCoeff = numerix.take(coeff, interiorFaces, axis=-1).ravel()
-        coefficientMatrix.addAt(interiorCoeff, id1.ravel(), id1.swapaxes(0,1).ravel())
-        coefficientMatrix.addAt(-interiorCoeff, id1.ravel(), id2.swapaxes(0,1).ravel())
-        coefficientMatrix.addAt(-interiorCoeff, id2.ravel(), id1.swapaxes(0,1).ravel())
-        coefficientMatrix.addAt(interiorCoeff, id2.ravel(), id2.swapaxes(0,1).ravel())
+        coefficientMatrix.addAt(numerix.concatenate((interiorCoeff, -interiorCoeff, -interiorCoeff, interiorCoeff)),
+                                numerix.concatenate((id1.ravel(), id1.ravel(), id2.ravel(), id2.ravel())),
+                                numerix.concatenate((id1.swapaxes(0,1).ravel(), id2.swapaxes(0,1).ravel(),
+                                                     id1.swapaxes(0,1).ravel(), id2.swapaxes(0,1).ravel())))
 
 ##         print 'coefficientMatrix',coefficientMatrix
 ##         raw_input('stopped')
@@ -267,10 +269,10 @@ class _AbstractDiffusionTerm(_UnaryTerm):
         boundaryB += bb
         
     def __doBCs(self, SparseMatrix, higherOrderBCs, N, M, coeffs, coefficientMatrix, boundaryB):
-        for boundaryCondition in higherOrderBCs:
-            LL, bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffs)
+        table = self._getBoundaryConditionTable(higherOrderBCs)
+        for LL, bb in table._buildMatrices(SparseMatrix, N, M, coeffs):
             if 'FIPY_DISPLAY_MATRIX' in os.environ:
-                self._viewer.title = r"%s %s" % (boundaryCondition.__class__.__name__, self.__class__.__name__)
+                self._viewer.title = r"boundary conditions %s" % self.__class__.__name__
                 self._viewer.plot(matrix=LL, RHSvector=bb)
                 from fipy import raw_input
                 raw_input()
@@ -278,6 +280,56 @@ class _AbstractDiffusionTerm(_UnaryTerm):
             
         return coefficientMatrix, boundaryB
 
+    def __calcSecondOrderCoeffDict(self, var, mesh):
+        if not hasattr(self, 'coeffDict'):
+
+            coeff = self._getGeomCoeff(var)
+            minusCoeff = -coeff[0]
+
+            coeff[0].dontCacheMe()
+            minusCoeff.dontCacheMe()
+
+            self.coeffDict = {
+                'cell 1 diag':    minusCoeff,
+                'cell 1 offdiag':  coeff[0]
+                }
+
+            self.coeffDict['cell 2 offdiag'] = self.coeffDict['cell 1 offdiag']
+            self.coeffDict['cell 2 diag'] = self.coeffDict['cell 1 diag']
+
+            self.__calcAnisotropySource(coeff, mesh, var)
+
+            del coeff
+            del minusCoeff
+
+    def __calcConstraints(self, var, mesh):
+        if (not hasattr(self, 'constraintL')) or (not hasattr(self, 'constraintB')):
+        
+            normals = FaceVariable(mesh=mesh, rank=1, value=mesh._orientedFaceNormals)
+
+            if len(var.shape) == 1 and len(self.nthCoeff.shape) > 1:
+                nthCoeffFaceGrad = var.faceGrad.dot(self.nthCoeff)
+                normalsNthCoeff =  normals.dot(self.nthCoeff)
+            else:
+
+                if self.nthCoeff.shape != () and not isinstance(self.nthCoeff, FaceVariable):
+                    coeff = self.nthCoeff[...,numerix.newaxis]
+                else:
+                    coeff = self.nthCoeff
+                
+                nthCoeffFaceGrad = coeff[numerix.newaxis] * var.faceGrad[:,numerix.newaxis]
+                s = (slice(0,None,None),) + (numerix.newaxis,) * (len(coeff.shape) - 1) + (slice(0,None,None),)
+                normalsNthCoeff = coeff[numerix.newaxis] * normals[s]
+
+            self.constraintB = -(var.faceGrad.constraintMask * nthCoeffFaceGrad).divergence * mesh.cellVolumes
+
+            constrainedNormalsDotCoeffOverdAP = var.arithmeticFaceValue.constraintMask * \
+                                                normalsNthCoeff / mesh._cellDistances
+
+            self.constraintB -= (constrainedNormalsDotCoeffOverdAP * var.arithmeticFaceValue).divergence * mesh.cellVolumes
+
+            self.constraintL = -constrainedNormalsDotCoeffOverdAP.divergence * mesh.cellVolumes
+
     def _buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
         """
         Test to ensure that a changing coefficient influences the boundary conditions.
@@ -315,40 +367,13 @@ class _AbstractDiffusionTerm(_UnaryTerm):
         
         """
 
-        var, L, b = self.__higherOrderbuildMatrix(var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+        var, L, b = self._cachedBuildMatrix(self.__higherOrderbuildMatrix, var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
         mesh = var.mesh
         
         if self.order == 2:
-            
-            if (not hasattr(self, 'constraintL')) or (not hasattr(self, 'constraintB')):
-            
-                normals = FaceVariable(mesh=mesh, rank=1, value=mesh._orientedFaceNormals)
-
-                if len(var.shape) == 1 and len(self.nthCoeff.shape) > 1:
-                    nthCoeffFaceGrad = var.faceGrad.dot(self.nthCoeff)
-                    normalsNthCoeff =  normals.dot(self.nthCoeff)
-                else:
 
-                    if self.nthCoeff.shape != () and not isinstance(self.nthCoeff, FaceVariable):
-                        coeff = self.nthCoeff[...,numerix.newaxis]
-                    else:
-                        coeff = self.nthCoeff
-                    
-                    nthCoeffFaceGrad = coeff[numerix.newaxis] * var.faceGrad[:,numerix.newaxis]
-                    s = (slice(0,None,None),) + (numerix.newaxis,) * (len(coeff.shape) - 1) + (slice(0,None,None),)
-                    normalsNthCoeff = coeff[numerix.newaxis] * normals[s]
+            self.__calcConstraints(var, mesh)
 
-                self.constraintB = -(var.faceGrad.constraintMask * nthCoeffFaceGrad).divergence * mesh.cellVolumes
-
-                constrainedNormalsDotCoeffOverdAP = var.arithmeticFaceValue.constraintMask * \
-                                                    normalsNthCoeff / mesh._cellDistances
-
-                self.constraintB -= (constrainedNormalsDotCoeffOverdAP * var.arithmeticFaceValue).divergence * mesh.cellVolumes
-
-                ids = self._reshapeIDs(var, numerix.arange(mesh.numberOfCells))
-
-                self.constraintL = -constrainedNormalsDotCoeffOverdAP.divergence * mesh.cellVolumes
-                
             ids = self._reshapeIDs(var, numerix.arange(mesh.numberOfCells))
             L.addAt(self.constraintL.ravel(), ids.ravel(), ids.swapaxes(0,1).ravel())
             b += numerix.reshape(self.constraintB.ravel(), ids.shape).sum(-2).ravel()
@@ -412,27 +437,8 @@ class _AbstractDiffusionTerm(_UnaryTerm):
 
         elif self.order == 2:
 
-            if not hasattr(self, 'coeffDict'):
-
-                coeff = self._getGeomCoeff(var)
-                minusCoeff = -coeff[0]
+            self.__calcSecondOrderCoeffDict(var, mesh)
 
-                coeff[0].dontCacheMe()
-                minusCoeff.dontCacheMe()
-
-                self.coeffDict = {
-                    'cell 1 diag':    minusCoeff,
-                    'cell 1 offdiag':  coeff[0]
-                    }
-
-                self.coeffDict['cell 2 offdiag'] = self.coeffDict['cell 1 offdiag']
-                self.coeffDict['cell 2 diag'] = self.coeffDict['cell 1 diag']
-
-                self.__calcAnisotropySource(coeff, mesh, var)
-
-                del coeff
-                del minusCoeff
-                
             higherOrderBCs, lowerOrderBCs = self.__getBoundaryConditions(boundaryConditions)
             del lowerOrderBCs
 
@@ -453,6 +459,47 @@ class _AbstractDiffusionTerm(_UnaryTerm):
             
         return (var, L, b)
 
+    def _explicitRHS(self, var, boundaryConditions, value):
+        """Return the `b - L * value` of a second-order term on a scalar
+        `var` without building `L`
+        """
+        if self.order != 2 or var.rank != 0:
+            raise _NotDiagonalError
+
+        mesh = var.mesh
+
+        self.__calcSecondOrderCoeffDict(var, mesh)
+        self.__calcConstraints(var, mesh)
+
+        coeff = numerix.array(self.coeffDict['cell 1 diag'])
+        if coeff.shape != (mesh.numberOfFaces,):
+            raise _NotDiagonalError
+
+        higherOrderBCs, lowerOrderBCs = self.__getBoundaryConditions(boundaryConditions)
+        del lowerOrderBCs
+
+        id1, id2 = mesh._adjacentCellIDs
+        interiorFaces = numerix.nonzero(mesh.interiorFaces)[0]
+
+        id1 = numerix.take(id1, interiorFaces)
+        id2 = numerix.take(id2, interiorFaces)
+
+        flux = numerix.take(coeff, interiorFaces) * (numerix.take(value, id1) - numerix.take(value, id2))
+        Lv = numerix.zeros((mesh.numberOfCells,), 'd')
+        vector.putAdd(Lv, id1, flux)
+        vector.putAdd(Lv, id2, -flux)
+
+        diagonal, b = self._getBoundaryConditionTable(higherOrderBCs)._buildDiagonal(mesh.numberOfCells, self.coeffDict)
+        Lv += diagonal * value
+
+        if hasattr(self, 'anisotropySource'):
+            b -= self.anisotropySource
+
+        Lv += numerix.array(self.constraintL) * value
+        b += numerix.array(self.constraintB)
+
+        return b - Lv
+
     def _getDiffusionGeomCoeff(self, var):
         if var is self.var or self.var is None:
             return self._getGeomCoeff(var)
@@ -74,6 +74,26 @@ class _BinaryTerm(_AbstractBinaryTerm):
 
         return (var, matrix, RHSvector)
     
+    def _buildAndAddDiagonals(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None, buildExplicitIfOther=True):
+        """The diagonal counterpart of `_buildAndAddMatrices()`"""
+
+        diagonal = 0
+        RHSvector = 0
+
+        for term in (self.term, self.other):
+
+            tmpVar, tmpDiagonal, tmpRHSvector = term._buildAndAddDiagonals(var,
+                                                                           boundaryConditions=boundaryConditions,
+                                                                           dt=dt,
+                                                                           transientGeomCoeff=transientGeomCoeff,
+                                                                           diffusionGeomCoeff=diffusionGeomCoeff,
+                                                                           buildExplicitIfOther=buildExplicitIfOther)
+
+            diagonal = diagonal + tmpDiagonal
+            RHSvector = RHSvector + tmpRHSvector
+
+        return (var, diagonal, RHSvector)
+
     def _getDefaultSolver(self, var, solver, *args, **kwargs):
         for term in (self.term, self.other):
             defaultSolver = term._getDefaultSolver(var, solver, *args, **kwargs)
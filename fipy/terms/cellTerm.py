@@ -38,6 +38,7 @@ from fipy.terms.nonDiffusionTerm import _NonDiffusionTerm
 from fipy.tools import inline
 from fipy.tools import numerix
 from fipy.terms import AbstractBaseClassError
+from fipy.terms import _NotDiagonalError
 from fipy.variables.cellVariable import CellVariable
 from fipy.variables.faceVariable import FaceVariable
 
@@ -149,6 +150,10 @@ class CellTerm(_NonDiffusionTerm):
         L.addAt(coeffVectors['diagonal'].ravel(), ids.ravel(), ids.swapaxes(0,1).ravel())
             
     def _buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        return self._cachedBuildMatrix(self.__buildMatrix, var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt,
+                                       transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+    def __buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
 
         b = numerix.zeros(var.shape,'d').ravel()
         L = SparseMatrix(mesh=var.mesh)
@@ -164,6 +169,22 @@ class CellTerm(_NonDiffusionTerm):
         
         return (var, L, b)
         
+    def _buildDiagonal(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        if var.rank != 0:
+            raise _NotDiagonalError
+
+        coeffVectors = self._getCoeffVectors_(var=var, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+        dt = self._checkDt(dt)
+
+        ones = numerix.ones(var.shape, 'd')
+        b = (numerix.array(var.old) * numerix.array(coeffVectors['old value']) / dt
+             + numerix.array(coeffVectors['b vector'])) * ones
+        diagonal = (numerix.array(coeffVectors['new value']) / dt
+                    + numerix.array(coeffVectors['diagonal'])) * ones
+
+        return (var, diagonal.ravel(), b.ravel())
+        
     def _test(self):
         """
         The following tests demonstrate how the `CellVariable` objects
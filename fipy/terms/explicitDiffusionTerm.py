@@ -35,6 +35,7 @@
 __docformat__ = 'restructuredtext'
 
 from fipy.terms.abstractDiffusionTerm import _AbstractDiffusionTerm
+from fipy.tools import numerix
 
 __all__ = ["ExplicitDiffusionTerm"]
 
@@ -63,6 +64,14 @@ class ExplicitDiffusionTerm(_AbstractDiffusionTerm):
                                                   transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
 
         return (var, SparseMatrix(mesh=var.mesh), b - L * var.value)
+
+    def _buildDiagonal(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        if hasattr(var, 'old'):
+            varOld = var.old
+        else:
+            varOld = var
+
+        return (var, 0, self._explicitRHS(varOld, boundaryConditions, numerix.array(var.value).ravel()))
         
     def _getNormals(self, mesh):
         return mesh._faceCellToCellNormals
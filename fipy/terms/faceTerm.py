@@ -40,6 +40,7 @@ from fipy.terms.nonDiffusionTerm import _NonDiffusionTerm
 from fipy.tools import vector
 from fipy.tools import numerix
 from fipy.tools import inline
+from fipy.terms import _NotDiagonalError
 
 __all__ = ["FaceTerm"]
 
@@ -71,19 +72,24 @@ class FaceTerm(_NonDiffusionTerm):
         id1 = self._reshapeIDs(var, id1)
         id2 = self._reshapeIDs(var, id2)
 
-        L.addAt(numerix.take(coeffMatrix['cell 1 diag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id1.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 1 offdiag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id2.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 2 offdiag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id1.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 2 diag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id2.swapaxes(0,1).ravel())
+        # all four contributions in one call, so that the matrix sees a
+        # single (cacheable) sparsity pattern per assembly
+        L.addAt(numerix.concatenate((numerix.take(coeffMatrix['cell 1 diag'], interiorFaces, axis=-1).ravel(),
+                                     numerix.take(coeffMatrix['cell 1 offdiag'], interiorFaces, axis=-1).ravel(),
+                                     numerix.take(coeffMatrix['cell 2 offdiag'], interiorFaces, axis=-1).ravel(),
+                                     numerix.take(coeffMatrix['cell 2 diag'], interiorFaces, axis=-1).ravel())),
+                numerix.concatenate((id1.ravel(), id1.ravel(), id2.ravel(), id2.ravel())),
+                numerix.concatenate((id1.swapaxes(0,1).ravel(), id2.swapaxes(0,1).ravel(), 
+                                     id1.swapaxes(0,1).ravel(), id2.swapaxes(0,1).ravel())))
 
         N = mesh.numberOfCells
         M = mesh._maxFacesPerCell
 
-        for boundaryCondition in boundaryConditions:
-            LL, bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffMatrix)
+        table = self._getBoundaryConditionTable(boundaryConditions)
+        for LL, bb in table._buildMatrices(SparseMatrix, N, M, coeffMatrix):
             
             if 'FIPY_DISPLAY_MATRIX' in os.environ:
-                self._viewer.title = r"%s %s" % (boundaryCondition.__class__.__name__, self.__class__.__name__)
+                self._viewer.title = r"boundary conditions %s" % self.__class__.__name__
                 self._viewer.plot(matrix=LL, RHSvector=bb)
                 from fipy import raw_input
                 raw_input()
@@ -102,9 +108,8 @@ class FaceTerm(_NonDiffusionTerm):
         N = mesh.numberOfCells
         M = mesh._maxFacesPerCell
 
-        for boundaryCondition in boundaryConditions:
-
-            LL,bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffMatrix)
+        table = self._getBoundaryConditionTable(boundaryConditions)
+        for LL, bb in table._buildMatrices(SparseMatrix, N, M, coeffMatrix):
             if LL != 0:
 ##              b -= LL.takeDiagonal() * numerix.array(oldArray)
                 b -= LL * numerix.array(oldArray)
@@ -159,9 +164,43 @@ class FaceTerm(_NonDiffusionTerm):
             vector.putAdd(b, id1, -(cell1diag * oldArrayId1 + cell1offdiag * oldArrayId2))
             vector.putAdd(b, id2, -(cell2diag * oldArrayId2 + cell2offdiag * oldArrayId1))
 
+    def _buildDiagonal(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        """The explicit contributions, without the `SparseMatrix` used for
+        the boundary conditions by `_explicitBuildMatrix_()`
+        """
+        weight = self._getWeight(var, transientGeomCoeff, diffusionGeomCoeff)
+        if 'implicit' in weight or var.rank != 0:
+            raise _NotDiagonalError
+
+        mesh = var.mesh
+        id1, id2 = mesh._adjacentCellIDs
+        interiorFaces = numerix.nonzero(mesh.interiorFaces)[0]
+
+        id1 = numerix.take(id1, interiorFaces)
+        id2 = numerix.take(id2, interiorFaces)
+
+        b = numerix.zeros(var.shape,'d').ravel()
+
+        if 'explicit' in weight:
+            coeffMatrix = self._getCoeffMatrix_(var, weight['explicit'])
+
+            self._explicitBuildMatrixInline_(oldArray=var.old, id1=id1, id2=id2, b=b, coeffMatrix=coeffMatrix,
+                                             mesh=mesh, interiorFaces=interiorFaces, dt=dt, weight=weight['explicit'])
+
+            table = self._getBoundaryConditionTable(boundaryConditions)
+            diagonal, bb = table._buildDiagonal(mesh.numberOfCells, coeffMatrix)
+            b -= diagonal * numerix.array(var.old)
+            b += bb
+
+        return (var, 0, b)
+
     def _buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
         """Implicit portion considers
         """
+        return self._cachedBuildMatrix(self.__buildMatrix, var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt,
+                                       transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+    def __buildMatrix(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
         mesh = var.mesh
         id1, id2 = mesh._adjacentCellIDs
         interiorFaces = numerix.nonzero(mesh.interiorFaces)[0]
@@ -39,6 +39,7 @@ import os
 from fipy.tools import numerix
 from fipy.terms import AbstractBaseClassError
 from fipy.terms import SolutionVariableRequiredError
+from fipy.terms import _NotDiagonalError
 
 __all__ = ["Term"]
 
@@ -47,6 +48,9 @@ class Term(object):
     .. attention:: This class is abstract. Always create one of its subclasses.
     """
 
+    _assemblyCache = None
+    _boundaryConditionTable = None
+
     def __init__(self, coeff=1., var=None):
         """
         Create a `Term`.
@@ -66,6 +70,8 @@ class Term(object):
         self._matrix = None
         self._cacheRHSvector = False
         self._RHSvector = None
+        self._sparsityPatterns = None
+        self._assemblyCache = None
         self.var = var
         
     def _calcVars(self):
@@ -82,6 +88,16 @@ class Term(object):
 
     def _buildAndAddMatrices(self, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None, buildExplicitIfOther=False):
         raise NotImplementedError
+
+    def _buildDiagonal(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        """Return `(var, diagonal, b)`, where `diagonal` is the diagonal of
+        the matrix that `_buildMatrix()` would return and `b` is its
+        RHS vector, without building a matrix. Raises `_NotDiagonalError`
+        if the matrix is not diagonal."""
+        raise _NotDiagonalError
+
+    def _buildAndAddDiagonals(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None, buildExplicitIfOther=False):
+        raise _NotDiagonalError
         
     def _checkVar(self, var):
         raise NotImplementedError
@@ -98,6 +114,89 @@ class Term(object):
         else:
             self._RHSvector = None
 
+    def _cachedBuildMatrix(self, build, var, SparseMatrix, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None):
+        """Return `build(var, SparseMatrix, ...)`. Once `cacheAssembly()`
+        has been called, the matrix and vector that it last returned are
+        reused if none of the `Variable` objects it read have changed
+        since, and it is called with the same `var`, kind of
+        `SparseMatrix`, `dt` and boundary conditions.
+
+        A constant coefficient is only assembled once
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=3)
+        >>> v = CellVariable(mesh=m, value=1.)
+        >>> D = Variable(value=1.)
+        >>> term = DiffusionTerm(coeff=D)
+        >>> L = term._buildAndAddMatrices(var=v, SparseMatrix=DefaultSolver()._matrixClass)[1]
+        >>> print term._assemblyCache
+        None
+        >>> term.cacheAssembly()
+        >>> L0 = term._buildAndAddMatrices(var=v, SparseMatrix=DefaultSolver()._matrixClass)[1]
+        >>> v.value = 2.
+        >>> L1 = term._buildAndAddMatrices(var=v, SparseMatrix=DefaultSolver()._matrixClass)[1]
+        >>> print L1 is L0, numerix.allclose(L1.numpyArray, L0.numpyArray)
+        False True
+        >>> cachedL = term._assemblyCache.values()[0][3]
+        >>> print cachedL is L0, cachedL is L1
+        False False
+
+        but is reassembled when it changes
+
+        >>> D.value = 2.
+        >>> L2 = term._buildAndAddMatrices(var=v, SparseMatrix=DefaultSolver()._matrixClass)[1]
+        >>> print numerix.allclose(L2.numpyArray, 2 * L0.numpyArray)
+        True
+        """
+        if self._assemblyCache is None:
+            return build(var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt,
+                         transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+        from fipy.variables.variable import Variable
+        from fipy.variables.stalenessWatcher import _ReadRecorder, _StalenessWatcher
+
+        if dt is None:
+            keyDt = None
+        else:
+            keyDt = float(dt)
+        key = (SparseMatrix._assemblyKey(), keyDt, tuple([id(bc) for bc in boundaryConditions]),
+               transientGeomCoeff is None, diffusionGeomCoeff is None)
+
+        cached = self._assemblyCache.get(build.__name__)
+
+        if (cached is not None and cached[0] is var and cached[1] == key
+            and not cached[2].changed):
+            _, _, watcher, cachedL, cachedb = cached
+            if Variable._readRecorder is not None:
+                # an enclosing build depends on the same variables
+                for required in watcher.requiredVariables:
+                    Variable._readRecorder.record(required)
+            L = SparseMatrix(mesh=var.mesh)
+            L += cachedL
+            return (var, L, cachedb.copy())
+
+        with _ReadRecorder() as reads:
+            var, L, b = build(var, SparseMatrix, boundaryConditions=boundaryConditions, dt=dt,
+                              transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+
+        # the caller may go on to add to `L`, so keep a copy, which shares
+        # rather than sums any contributions that `L` has deferred
+        cachedL = SparseMatrix(mesh=var.mesh)
+        cachedL += L
+        self._assemblyCache[build.__name__] = (var, key, _StalenessWatcher(reads.variables),
+                                               cachedL, numerix.array(b))
+
+        return (var, L, b)
+
+    def _getBoundaryConditionTable(self, boundaryConditions):
+        """The `_BoundaryConditionTable` of `boundaryConditions`, which is
+        kept for as long as the term is built with the same ones."""
+        if (self._boundaryConditionTable is None
+            or not self._boundaryConditionTable.matches(boundaryConditions)):
+            from fipy.boundaryConditions.boundaryConditionTable import _BoundaryConditionTable
+            self._boundaryConditionTable = _BoundaryConditionTable(boundaryConditions)
+        return self._boundaryConditionTable
+
     def _verifyVar(self, var):
         if var is None:
             if self.var is None:
@@ -121,13 +220,15 @@ class Term(object):
             return var.shape[0]
         
     def _getMatrixClass(self, solver, var):
+        SparseMatrix = solver._getMatrixClass(var.mesh)
+        if self._sparsityPatterns is not None:
+            SparseMatrix = SparseMatrix._withSparsityPatterns(self._sparsityPatterns)
+
         if self._vectorSize(var) > 1:
             from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
-            SparseMatrix =  OffsetSparseMatrix(SparseMatrix=solver._matrixClass,
+            SparseMatrix =  OffsetSparseMatrix(SparseMatrix=SparseMatrix,
                                                numberOfVariables=self._vectorSize(var),
                                                numberOfEquations=self._vectorSize(var))
-        else:
-            SparseMatrix = solver._matrixClass
             
         return SparseMatrix
 
@@ -148,6 +249,9 @@ class Term(object):
                 from fipy.viewers.matplotlibViewer.matplotlibSparseMatrixViewer import MatplotlibSparseMatrixViewer
                 Term._viewer = MatplotlibSparseMatrixViewer()
 
+        from timeit import default_timer as timer
+        start = timer()
+        
         var, matrix, RHSvector = self._buildAndAddMatrices(var,
                                                            self._getMatrixClass(solver, var),
                                                            boundaryConditions=boundaryConditions,
@@ -159,6 +263,7 @@ class Term(object):
         self._buildCache(matrix, RHSvector)
         
         solver._storeMatrix(var=var, matrix=matrix, RHSvector=RHSvector)
+        solver._assemblyTime = timer() - start
         
         if 'FIPY_DISPLAY_MATRIX' in os.environ:
             if var is None:
@@ -180,6 +285,118 @@ class Term(object):
             
         return solver
     
+    def _prepareDiagonalSystem(self, var, boundaryConditions, dt):
+        """The diagonal and RHS vector of the `Term`'s linear system, for
+        when it is diagonal. Raises `_NotDiagonalError` otherwise."""
+        var = self._verifyVar(var)
+        self._checkVar(var)
+
+        if type(boundaryConditions) not in (type(()), type([])):
+            boundaryConditions = (boundaryConditions,)
+
+        for bc in boundaryConditions:
+            bc._resetBoundaryConditionApplied()
+
+        var, diagonal, RHSvector = self._buildAndAddDiagonals(var,
+                                                              boundaryConditions=boundaryConditions,
+                                                              dt=dt,
+                                                              transientGeomCoeff=self._getTransientGeomCoeff(var),
+                                                              diffusionGeomCoeff=self._getDiffusionGeomCoeff(var),
+                                                              buildExplicitIfOther=self._buildExplcitIfOther)
+
+        return var, numerix.zeros(var.shape, 'd').ravel() + diagonal, RHSvector
+
+    def evaluate(self, var=None, boundaryConditions=(), dt=None):
+        r"""
+        Evaluates the `Term` at the current value of `var`. Returns the
+        residual vector :math:`\mathsf{L}\vec{x} - \vec{b}` of the
+        `Term`'s linear system, like `justResidualVector()`. Terms that
+        only contribute to the diagonal of the matrix, such as explicit
+        diffusion and convection terms, `TransientTerm` and source terms,
+        are evaluated as face fluxes and cell values, without building a
+        matrix.
+
+        :Parameters:
+
+           - `var`: The variable to evaluate the `Term` for.
+           - `boundaryConditions`: A tuple of boundaryConditions.
+           - `dt`: The time step size.
+
+        The divergence of the explicit diffusive flux of
+        :math:`\phi = x^2`, integrated over the interior cells, is 2
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=5)
+        >>> x = m.cellCenters[0]
+        >>> v = CellVariable(mesh=m, value=x**2, hasOld=True)
+        >>> term = ExplicitDiffusionTerm(coeff=1.)
+        >>> print numerix.allclose(term.evaluate(v)[1:-1], 2.)
+        True
+        >>> print numerix.allclose(term.evaluate(v), term.justResidualVector(v))
+        True
+
+        Terms with off-diagonal entries are evaluated from their matrix
+
+        >>> print numerix.allclose(DiffusionTerm(coeff=1.).evaluate(v)[1:-1], 2.)
+        True
+        """
+        try:
+            var, diagonal, RHSvector = self._prepareDiagonalSystem(var, boundaryConditions, dt)
+        except _NotDiagonalError:
+            return self.justResidualVector(var=var, boundaryConditions=boundaryConditions, dt=dt)
+
+        return diagonal * numerix.array(var).ravel() - RHSvector
+
+    def explicitUpdate(self, var=None, boundaryConditions=(), dt=None):
+        r"""
+        Advances `var` by one time step of an equation whose implicit
+        part is a `TransientTerm`, and possibly an `ImplicitSourceTerm`,
+        and whose other terms are explicit. The update is calculated
+        cell by cell, without building a matrix or calling a solver. Any
+        other equation is solved with `solve()`.
+
+        :Parameters:
+
+           - `var`: The variable to be solved for. Provides the old value and holds the solution on completion.
+           - `boundaryConditions`: A tuple of boundaryConditions.
+           - `dt`: The time step size.
+
+        An explicit upwind step gives the same result both ways
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=10)
+        >>> v0 = CellVariable(mesh=m, value=m.cellCenters[0] < 3, hasOld=True)
+        >>> v0.constrain(1., m.facesLeft)
+        >>> v1 = CellVariable(mesh=m, value=m.cellCenters[0] < 3, hasOld=True)
+        >>> v1.constrain(1., m.facesLeft)
+        >>> eq0 = TransientTerm() + ExplicitUpwindConvectionTerm(coeff=(1.,)) == ExplicitDiffusionTerm(coeff=0.1)
+        >>> eq1 = TransientTerm() + ExplicitUpwindConvectionTerm(coeff=(1.,)) == ExplicitDiffusionTerm(coeff=0.1)
+        >>> for step in range(5):
+        ...     v0.updateOld()
+        ...     v1.updateOld()
+        ...     eq0.solve(v0, dt=0.5)
+        ...     eq1.explicitUpdate(v1, dt=0.5)
+        >>> print numerix.allclose(v0, v1)
+        True
+
+        A `TransientTerm` is needed to make the update explicit
+
+        >>> ExplicitDiffusionTerm(coeff=1.).explicitUpdate(v1) # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        ZeroDivisionError: the equation has no diagonal in some cells
+        """
+        try:
+            var, diagonal, RHSvector = self._prepareDiagonalSystem(var, boundaryConditions, dt)
+        except _NotDiagonalError:
+            self.solve(var=var, boundaryConditions=boundaryConditions, dt=dt)
+            return
+
+        if not numerix.all(diagonal != 0):
+            raise ZeroDivisionError("the equation has no diagonal in some cells")
+
+        var.setValue(numerix.reshape(RHSvector / diagonal, var.shape))
+
     def solve(self, var=None, solver=None, boundaryConditions=(), dt=None):
         r"""
         Builds and solves the `Term`'s linear system once. This method
@@ -197,7 +414,7 @@ class Term(object):
         
         solver = self._prepareLinearSystem(var, solver, boundaryConditions, dt)
         
-        solver._solve()
+        solver._loggedSolve()
 
     def sweep(self, var=None, solver=None, boundaryConditions=(), dt=None, underRelaxation=None, residualFn=None, cacheResidual=False, cacheError=False):
         r"""
@@ -232,13 +449,13 @@ class Term(object):
             var_tmp = solver.var
             RHS_tmp = solver.RHSvector
             solver._storeMatrix(var=self.errorVector, matrix=solver.matrix, RHSvector=self.residualVector)
-            solver._solve()
+            solver._loggedSolve()
             solver._storeMatrix(var=var_tmp, matrix=solver.matrix, RHSvector=RHS_tmp)
             
         if not cacheResidual:
             self.residualVector = None
 
-        solver._solve()
+        solver._loggedSolve()
         
         return residual
 
@@ -325,7 +542,7 @@ class Term(object):
         
         errorVector = solver.var.copy()
         solver._storeMatrix(var=errorVector, matrix=solver.matrix, RHSvector=residualVector)
-        solver._solve()
+        solver._loggedSolve()
 
         return errorVector
 
@@ -352,6 +569,79 @@ class Term(object):
 
         return self._matrix
 
+    def cacheSparsityPattern(self, patterns=None):
+        r"""
+        Informs `solve()` and `sweep()` to remember the sparsity pattern
+        of the matrix and where each face and cell contribution lands in
+        it. Later assemblies of this equation on the same mesh then only
+        fill in the values of the matrix. Only the SciPy matrices make
+        use of the pattern; other solver packages ignore it, as do the
+        banded matrices that the SciPy solvers assemble for a `UniformGrid`
+        with `matrixFree` or `banded`.
+
+        >>> from fipy import *
+        >>> m = Grid2D(nx=3, ny=3)
+        >>> D = CellVariable(mesh=m, value=m.x)
+        >>> v = CellVariable(mesh=m)
+        >>> eq = TransientTerm() == DiffusionTerm(coeff=D) - ImplicitSourceTerm(coeff=D)
+        >>> eq.cacheMatrix()
+        >>> eq.solve(v, dt=1., solver=DummySolver())
+        >>> reference = eq.matrix.numpyArray
+        >>> eq.cacheSparsityPattern()
+        >>> eq.solve(v, dt=1., solver=DummySolver())
+        >>> eq.solve(v, dt=1., solver=DummySolver())
+        >>> print numerix.allclose(eq.matrix.numpyArray, reference)
+        True
+
+        The cached pattern is refilled with the current coefficients.
+
+        >>> D.setValue(2 * m.x)
+        >>> eq.solve(v, dt=1., solver=DummySolver())
+        >>> print numerix.allclose(eq.matrix.numpyArray, 2 * reference - numerix.identity(9))
+        True
+
+        Equations on the same mesh may share their patterns, so that only
+        the first of them works them out.
+
+        >>> patterns = {}
+        >>> eq.cacheSparsityPattern(patterns)
+        >>> eq2 = TransientTerm() == DiffusionTerm(coeff=D) - ImplicitSourceTerm(coeff=D)
+        >>> eq2.cacheSparsityPattern(patterns)
+        >>> print eq._sparsityPatterns is eq2._sparsityPatterns
+        True
+
+        :Parameters:
+          - `patterns`: A `dict` of the patterns to use, which is filled in
+            as new ones are found. The `Term` keeps its own if `None`.
+        """
+        if patterns is not None:
+            self._sparsityPatterns = patterns
+        elif self._sparsityPatterns is None:
+            self._sparsityPatterns = {}
+
+    def cacheAssembly(self):
+        r"""
+        Informs `solve()` and `sweep()` to keep the matrix and vector that
+        each term of the equation assembles, and to reuse them for as long
+        as none of the `Variable` objects that went into them change. This
+        saves the assembly of terms with constant coefficients, at the
+        cost of holding a copy of each of their matrices.
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=3)
+        >>> v = CellVariable(mesh=m)
+        >>> eq = TransientTerm() == DiffusionTerm(coeff=1.)
+        >>> eq.cacheAssembly()
+        >>> eq.cacheMatrix()
+        >>> eq.solve(v, dt=1., solver=DummySolver())
+        >>> reference = eq.matrix.numpyArray
+        >>> eq.solve(v, dt=1., solver=DummySolver())
+        >>> print numerix.allclose(eq.matrix.numpyArray, reference)
+        True
+        """
+        if self._assemblyCache is None:
+            self._assemblyCache = {}
+
     def cacheRHSvector(self):
         r"""        
         Informs `solve()` and `sweep()` to cache their right hand side
@@ -118,6 +118,28 @@ class _UnaryTerm(Term):
              
         return (var, matrix, RHSvector)
 
+    def _buildAndAddDiagonals(self, var, boundaryConditions=(), dt=None, transientGeomCoeff=None, diffusionGeomCoeff=None, buildExplicitIfOther=False):
+        """The diagonal counterpart of `_buildAndAddMatrices()`"""
+        if var is self.var or self.var is None:
+            var, diagonal, RHSvector = self._buildDiagonal(var,
+                                                           boundaryConditions=boundaryConditions,
+                                                           dt=dt,
+                                                           transientGeomCoeff=transientGeomCoeff,
+                                                           diffusionGeomCoeff=diffusionGeomCoeff)
+        elif buildExplicitIfOther:
+            _, diagonal, RHSvector = self._buildDiagonal(self.var,
+                                                         boundaryConditions=boundaryConditions,
+                                                         dt=dt,
+                                                         transientGeomCoeff=transientGeomCoeff,
+                                                         diffusionGeomCoeff=diffusionGeomCoeff)
+            RHSvector = RHSvector - diagonal * numerix.array(self.var).ravel()
+            diagonal = 0
+        else:
+            RHSvector = numerix.zeros(len(var.ravel()),'d')
+            diagonal = 0
+
+        return (var, diagonal, RHSvector)
+
     def _reshapeIDs(self, var, ids):
         shape = (self._vectorSize(var), self._vectorSize(var), ids.shape[-1])
         ids = numerix.resize(ids, shape)
@@ -66,10 +66,29 @@ def _parallelImport():
     from fipy.tools.comms.serialCommWrapper import SerialCommWrapper
     return SerialCommWrapper(Epetra=Epetra), parallelComm
 
+def _mpi4pyImport():
+    from fipy.tools.comms.dummyComm import DummyComm
+    try:
+        from mpi4py import MPI
+    except ImportError:
+        return DummyComm(), DummyComm()
+
+    if MPI.COMM_WORLD.Get_size() > 1:
+        from fipy.tools.comms.pureMpi4pyCommWrapper import PureMpi4pyCommWrapper
+        return DummyComm(), PureMpi4pyCommWrapper(MPI=MPI)
+    else:
+        return DummyComm(), DummyComm()
+
 def _getComms():
     from fipy.tools.parser import _parseSolver
+    import os
     if _parseSolver() in ("trilinos",  "no-pysparse"):
         serialComm, parallelComm = _parallelImport()
+    elif (_parseSolver() in ("scipy", "pyamg")
+          or (_parseSolver() is None 
+              and os.environ.get('FIPY_SOLVERS', '').lower() in ("scipy", "pyamg"))):
+        # the scipy and pyamg solvers are distributed with mpi4py alone
+        serialComm, parallelComm = _mpi4pyImport()
     elif _parseSolver() is None:
         try:
             serialComm, parallelComm = _parallelImport()
@@ -115,6 +134,8 @@ import fipy.tools.vector
 from dimensions.physicalField import PhysicalField
 from fipy.tools.numerix import *
 from fipy.tools.vitals import Vitals
+from fipy.tools.variableProfiler import VariableProfiler
+from fipy.tools.ensemble import Ensemble, EnsembleWriter
 
 __all__ = ["serialComm",
            "parallelComm",
@@ -123,6 +144,9 @@ __all__ = ["serialComm",
            "vector",
            "PhysicalField",
            "Vitals",
+           "VariableProfiler",
+           "Ensemble",
+           "EnsembleWriter",
            "serial",
            "parallel"]
            
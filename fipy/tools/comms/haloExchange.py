@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "haloExchange.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+
+__all__ = []
+
+class _HaloExchange(object):
+    """Fill the overlapping (ghost) entries of a distributed vector
+
+    Each processor owns the entries of a vector at `ownedIDs` and also
+    holds copies of the entries at `overlappingIDs`, some of which are owned
+    by other processors. The owner of each ghost entry is found once, by
+    way of a directory that distributes the global IDs over the processors,
+    so that no processor ever holds the full list of global IDs. Each
+    subsequent exchange is a single all-to-all communication of only the
+    ghost values.
+
+    >>> from fipy.tools import serialComm
+    >>> halo = _HaloExchange(serialComm, ownedIDs=(4, 2, 3), overlappingIDs=(2, 3, 4))
+    >>> print halo.ownedIndices
+    [2 0 1]
+    >>> print halo(numerix.array((40., 20., 30.)))
+    [ 20.  30.  40.]
+
+    :Parameters:
+      - `comm`: The communicator wrapper from :mod:`fipy.tools.comms`.
+      - `ownedIDs`: The global IDs of the entries owned by this processor.
+      - `overlappingIDs`: The global IDs of all entries held by this
+        processor, including `ownedIDs`.
+    """
+    def __init__(self, comm, ownedIDs, overlappingIDs):
+        self.comm = comm
+
+        ownedIDs = numerix.array(ownedIDs, dtype=numerix.INT_DTYPE)
+        overlappingIDs = numerix.array(overlappingIDs, dtype=numerix.INT_DTYPE)
+        self.size = len(overlappingIDs)
+
+        self.ownedIndices = self._indicesOf(ownedIDs, overlappingIDs)
+
+        ghost = numerix.ones((self.size,), dtype=bool)
+        ghost[self.ownedIndices] = False
+        ghostIndices = numerix.nonzero(ghost)[0]
+        ghostIDs = overlappingIDs[ghostIndices]
+
+        owners = self._owners(ownedIDs, ghostIDs)
+
+        procs = range(comm.Nproc)
+        self._recvIndices = [ghostIndices[owners == proc] for proc in procs]
+        requests = comm.alltoall([ghostIDs[owners == proc] for proc in procs])
+        self._sendIndices = [self._indicesOf(IDs, ownedIDs) for IDs in requests]
+
+    @staticmethod
+    def _indicesOf(IDs, inIDs):
+        """Positions of `IDs` in `inIDs`
+        """
+        order = numerix.argsort(inIDs)
+        return order[numerix.searchsorted(inIDs[order], IDs)]
+
+    def _owners(self, ownedIDs, ghostIDs):
+        """Ask the directory for the processors owning `ghostIDs`
+        """
+        N = self.comm.Nproc
+        procs = range(N)
+
+        # global ID `i` is registered with processor `i % N`
+        registered = self.comm.alltoall([ownedIDs[ownedIDs % N == proc] for proc in procs])
+        directoryIDs = numerix.concatenate([numerix.array(IDs, dtype=numerix.INT_DTYPE)
+                                            for IDs in registered])
+        directoryOwners = numerix.concatenate([proc * numerix.ones((len(IDs),), dtype=numerix.INT_DTYPE)
+                                               for proc, IDs in zip(procs, registered)])
+
+        queries = self.comm.alltoall([ghostIDs[ghostIDs % N == proc] for proc in procs])
+        answers = self.comm.alltoall([directoryOwners[self._indicesOf(IDs, directoryIDs)]
+                                      for IDs in queries])
+
+        owners = numerix.zeros((len(ghostIDs),), dtype=numerix.INT_DTYPE)
+        for proc, answer in zip(procs, answers):
+            owners[ghostIDs % N == proc] = answer
+
+        return owners
+
+    def owned(self, overlapping):
+        """Return the owned entries of an `overlapping` vector
+        """
+        return numerix.asarray(overlapping)[self.ownedIndices]
+
+    def __call__(self, owned):
+        """Return the overlapping vector whose owned entries are `owned`
+        """
+        overlapping = numerix.empty((self.size,), dtype=owned.dtype)
+        overlapping[self.ownedIndices] = owned
+        received = self.comm.alltoall([owned[indices] for indices in self._sendIndices])
+        for indices, values in zip(self._recvIndices, received):
+            overlapping[indices] = values
+
+        return overlapping
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -73,3 +73,6 @@ class Mpi4pyCommWrapper(CommWrapper):
 
     def allgather(self, sendobj=None, recvobj=None):
         return self.mpi4py_comm.allgather(sendobj=sendobj, recvobj=recvobj)
+
+    def alltoall(self, sendobj):
+        return self.mpi4py_comm.alltoall(sendobj)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ # 
+ #  FILE: "pureMpi4pyCommWrapper.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #  
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ # 
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #  
+ # ###################################################################
+ ##
+
+
+from fipy.tools.comms.mpi4pyCommWrapper import Mpi4pyCommWrapper
+from fipy.tools import numerix
+
+__all__ = ["PureMpi4pyCommWrapper"]
+
+class PureMpi4pyCommWrapper(Mpi4pyCommWrapper):
+    """MPI Communicator wrapper
+    
+    Encapsulates capabilities needed for mpi4py, without Epetra, for use
+    with the distributed :ref:`SCIPY` and :ref:`PYAMG` solvers.
+    
+    """
+    
+    def __init__(self, MPI):
+        self.MPI = MPI
+        self.mpi4py_comm = self.MPI.COMM_WORLD
+        
+    def __setstate__(self, dict):
+        from mpi4py import MPI
+        self.__init__(MPI=MPI)
+        
+    @property
+    def procID(self):
+        return self.mpi4py_comm.Get_rank()
+        
+    @property
+    def Nproc(self):
+        return self.mpi4py_comm.Get_size()
+        
+    def Barrier(self):
+        self.mpi4py_comm.Barrier()
+
+    def sum(self, a, axis=None):
+        return self.mpi4py_comm.allreduce(numerix.array(a).sum(axis=axis), op=self.MPI.SUM)
+
+    def Norm2(self, vec):
+        return numerix.sqrt(self.sum(numerix.array(vec)**2))
+
+    def MaxAll(self, vec):
+        return numerix.array(self.allgather(numerix.array(vec))).max(axis=0)
+        
+    def MinAll(self, vec):
+        return numerix.array(self.allgather(numerix.array(vec))).min(axis=0)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "ensemble.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+import cPickle
+import gzip
+
+from fipy.tools import parallelComm
+
+__all__ = ["Ensemble", "EnsembleWriter"]
+
+# the `Ensemble` being run, which forked workers inherit rather than
+# receive pickled
+_running = None
+
+def _runMember(task):
+    index, parameters = task
+    return index, parameters, _running._runOne(parameters)
+
+class EnsembleWriter(object):
+    """
+    Streams the results of an `Ensemble` to a gzipped file as they
+    arrive, so that they never need to be held in memory together.
+
+    Each record is an `(index, parameters, result)` `tuple` pickled with
+    `cPickle`, in the order the runs finished. The records are read back
+    one at a time with `records()`.
+
+        >>> import os, tempfile
+        >>> f, filename = tempfile.mkstemp('.gz')
+        >>> writer = EnsembleWriter(filename)
+        >>> writer(1, {'a': 2.}, [4.])
+        >>> writer(0, {'a': 1.}, [1.])
+        >>> writer.close()
+        >>> for record in EnsembleWriter.records(filename):
+        ...     print record
+        (1, {'a': 2.0}, [4.0])
+        (0, {'a': 1.0}, [1.0])
+        >>> os.close(f)
+        >>> os.remove(filename)
+    """
+    def __init__(self, filename):
+        """
+        :Parameters:
+          - `filename`: The name of the file to write the records to
+        """
+        self.filename = filename
+        self.fileStream = gzip.GzipFile(filename=filename, mode='w')
+
+    def __call__(self, index, parameters, result):
+        cPickle.dump((index, parameters, result), self.fileStream, cPickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        self.fileStream.close()
+
+    @staticmethod
+    def records(filename):
+        """Generate the `(index, parameters, result)` records of `filename`"""
+        fileStream = gzip.GzipFile(filename=filename, mode='r')
+        try:
+            while True:
+                try:
+                    yield cPickle.load(fileStream)
+                except EOFError:
+                    break
+        finally:
+            fileStream.close()
+
+class Ensemble(object):
+    """
+    Runs a model for many sets of parameters on a single mesh.
+
+    The `model` is a function `model(mesh, patterns, **parameters)` that
+    builds its variables and equations on `mesh`, solves them and returns
+    a picklable result. It should pass `patterns` to the
+    `cacheSparsityPattern()` of its equations, so that the sparsity
+    patterns of the matrices are worked out once for the whole ensemble,
+    rather than once per run.
+
+    The mesh, and with it its geometry and topology, is built once by the
+    caller. The first run is made in the calling process, which fills in
+    the patterns and whatever the mesh calculates on demand. The
+    remaining runs are then shared out among forked worker processes,
+    which inherit all of this copy-on-write instead of recalculating it.
+    With `processes=1`, or when FiPy itself is running in parallel, the
+    runs are made one after the other in the calling process, where they
+    share the same structure.
+
+        >>> from fipy import *
+        >>> def decay(mesh, patterns, rate):
+        ...     phi = CellVariable(mesh=mesh, value=1., hasOld=True)
+        ...     eq = TransientTerm() == DiffusionTerm(coeff=1.) - ImplicitSourceTerm(coeff=rate)
+        ...     eq.cacheSparsityPattern(patterns)
+        ...     for step in range(10):
+        ...         phi.updateOld()
+        ...         eq.solve(var=phi, dt=0.1)
+        ...     return float(numerix.array(phi).mean())
+        >>> ensemble = Ensemble(model=decay, mesh=Grid1D(nx=10))
+        >>> rates = (0., 1., 2., 3.)
+        >>> expected = [(1. + 0.1 * rate)**-10 for rate in rates]
+
+    The results are returned in the order of the parameters
+
+        >>> results = ensemble.run([{'rate': rate} for rate in rates], processes=2)
+        >>> print numerix.allclose(results, expected, rtol=1e-4)
+        True
+        >>> results = ensemble.run([{'rate': rate} for rate in rates], processes=1)
+        >>> print numerix.allclose(results, expected, rtol=1e-4)
+        True
+
+    unless they are streamed to a `writer` as they arrive
+
+        >>> import os, tempfile
+        >>> f, filename = tempfile.mkstemp('.gz')
+        >>> writer = EnsembleWriter(filename)
+        >>> ensemble.run([{'rate': rate} for rate in rates], writer=writer, processes=2)
+        >>> writer.close()
+        >>> records = sorted(EnsembleWriter.records(filename))
+        >>> print [index for index, parameters, result in records]
+        [0, 1, 2, 3]
+        >>> print numerix.allclose([result for index, parameters, result in records], expected, rtol=1e-4)
+        True
+        >>> os.close(f)
+        >>> os.remove(filename)
+    """
+    def __init__(self, model, mesh):
+        """
+        :Parameters:
+          - `model`: The function that makes a single run
+          - `mesh`: The mesh shared by all the runs
+        """
+        self.model = model
+        self.mesh = mesh
+        self.sparsityPatterns = {}
+
+    def _runOne(self, parameters):
+        return self.model(self.mesh, self.sparsityPatterns, **parameters)
+
+    def run(self, parameters, writer=None, processes=None, chunksize=1):
+        """
+        Run the model once for each set of parameters.
+
+        :Parameters:
+          - `parameters`: A sequence of `dict`s of the keyword arguments
+            of each run
+          - `writer`: A function `writer(index, parameters, result)`,
+            such as an `EnsembleWriter`, called in the calling process as
+            each run finishes
+          - `processes`: The number of worker processes. All the
+            available processors are used if `None`.
+          - `chunksize`: The number of runs handed to a worker at a time
+
+        :Returns: the `list` of results, in the order of `parameters`, or
+          `None` if they were given to `writer`
+        """
+        global _running
+
+        parameters = list(parameters)
+
+        if writer is None:
+            results = [None] * len(parameters)
+            def writer(index, parameters, result):
+                results[index] = result
+        else:
+            results = None
+
+        tasks = list(enumerate(parameters))
+
+        if len(tasks) > 0:
+            index, first = tasks.pop(0)
+            writer(index, first, self._runOne(first))
+
+        if parallelComm.Nproc > 1 or processes == 1 or len(tasks) <= 1:
+            for index, member in tasks:
+                writer(index, member, self._runOne(member))
+        else:
+            import multiprocessing
+
+            _running = self
+            pool = multiprocessing.Pool(processes)
+            try:
+                for index, member, result in pool.imap_unordered(_runMember, tasks, chunksize):
+                    writer(index, member, result)
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+                _running = None
+
+        return results
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
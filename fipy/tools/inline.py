@@ -1,16 +1,314 @@
 __all__ = ["doInline"]
 
+import ast
 import inspect
 import os
+import re
 import sys
 
+def _chooseBackend(requested):
+    """Return the kernel backend to use when inlining is `requested`
+
+    C kernels are compiled with `scipy.weave` when it is available.
+    Otherwise, `Variable` expressions are evaluated with `numexpr`, or, failing
+    that, with plain NumPy. `FIPY_INLINE_BACKEND` forces a choice.
+    """
+    if not requested:
+        return None
+        
+    backend = os.environ.get('FIPY_INLINE_BACKEND', '').lower()
+    if backend in ('weave', 'numexpr', 'numpy'):
+        return backend
+        
+    try:
+        from scipy import weave
+        return 'weave'
+    except ImportError:
+        pass
+        
+    try:
+        import numexpr
+        return 'numexpr'
+    except ImportError:
+        return 'numpy'
+
 if '--inline' in [s.lower() for s in sys.argv[1:]]:
-    doInline = True
+    backend = _chooseBackend(requested=True)
 else:
-    doInline = 'FIPY_INLINE' in os.environ
+    backend = _chooseBackend(requested='FIPY_INLINE' in os.environ)
+
+# hand-written C kernels are only available from weave
+doInline = (backend == 'weave')
     
 _inlineFrameComment = 'FIPY_INLINE_COMMENT' in os.environ
 
+_indexPattern = re.compile(r"\[(0|i|j|k|i \+ j \* ni|j \+ k \* nj"
+                           r"|i \+ k \* ni \* nj|i \+ j \* ni \+ k \* ni \* nj)\]")
+_cFunctionPattern = re.compile(r"\b(asinh|acosh|atanh|asin|acos|atan2|atan|fabs)\(")
+_numpyFunctions = {
+    'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan', 'atan2': 'arctan2',
+    'asinh': 'arcsinh', 'acosh': 'arccosh', 'atanh': 'arctanh', 'fabs': 'fabs'
+}
+_numexprFunctions = dict(_numpyFunctions, fabs='abs')
+
+def _vectorize(cstring, functions=_numpyFunctions):
+    """Turn the element-wise C expression of a `Variable` into an array
+    expression
+
+        >>> print _vectorize('(var0[i + j * ni] * asin(var10[j]))')
+        (var0 * arcsin(var10))
+        >>> print _vectorize('atan2(var0[i], var1[0]) + fabs(var2)', 
+        ...                  functions=_numexprFunctions)
+        arctan2(var0, var1) + abs(var2)
+    """
+    cstring = _indexPattern.sub("", cstring)
+    return _cFunctionPattern.sub(lambda match: functions[match.group(1)] + "(", cstring)
+
+class _Unfusable(Exception):
+    pass
+
+class _FusedExpression(object):
+    """Array expression compiled to a sequence of NumPy ufunc calls
+
+    Intermediate results are written into scratch buffers that belong to
+    the `_FusedExpression` and are reused from one evaluation to the next,
+    and a register is released as soon as its value has been consumed, so
+    evaluating a large expression tree needs only as many temporary arrays
+    as the tree is deep.
+
+        >>> import numpy
+        >>> expr = _FusedExpression('((var0 * var1) + (var0 * var2)) / sqrt(var1)')
+        >>> len(expr.steps), expr.registers
+        (5, 2)
+        >>> args = dict(var0=numpy.array((1., 2.)), 
+        ...             var1=numpy.array((4., 9.)), 
+        ...             var2=numpy.array((2., 0.)))
+        >>> print expr(args)
+        [ 3.  6.]
+
+    Once the types of the intermediate results are known, the result can be
+    written into an existing array
+
+        >>> out = numpy.empty((2,))
+        >>> expr(args, out=out) is out
+        True
+        >>> print out
+        [ 3.  6.]
+
+    but not if it has the wrong shape or type
+    
+        >>> out = numpy.empty((2,), dtype=int)
+        >>> expr(args, out=out) is out
+        False
+
+    There is never more than one scratch buffer per register, whatever
+    the shapes of the arguments
+    
+        >>> for n in range(1, 5):
+        ...     result = expr(dict(var0=numpy.ones(n), var1=numpy.ones(n), var2=numpy.ones(n)))
+        ...     result = expr(dict(var0=numpy.ones(n), var1=numpy.ones(n), var2=numpy.ones(n)))
+        >>> len(expr._scratch) <= expr.registers
+        True
+
+    Comparisons, unary operators, and constants are supported, but anything
+    else is rejected
+    
+        >>> print _FusedExpression('~(var0 > 1.5) * 2. + 1')(args)
+        [ 3.  1.]
+        >>> print _FusedExpression('-var0 + pi')(args)
+        [ 2.14159265  1.14159265]
+        >>> _FusedExpression('var0[0]')
+        Traceback (most recent call last):
+            ...
+        _Unfusable: Subscript
+    """
+    _binaryUfuncs = {
+        'Add': 'add', 'Sub': 'subtract', 'Mult': 'multiply', 'Div': 'divide',
+        'Pow': 'power', 'Mod': 'remainder', 'FloorDiv': 'floor_divide',
+        'LShift': 'left_shift', 'RShift': 'right_shift',
+        'BitAnd': 'bitwise_and', 'BitXor': 'bitwise_xor', 'BitOr': 'bitwise_or',
+        'Eq': 'equal', 'NotEq': 'not_equal', 'Lt': 'less', 'LtE': 'less_equal',
+        'Gt': 'greater', 'GtE': 'greater_equal'
+    }
+    _unaryUfuncs = {
+        'USub': 'negative', 'UAdd': 'positive', 'Invert': 'invert', 'Not': 'logical_not'
+    }
+
+    def __init__(self, expression):
+        import numpy
+
+        # one buffer per register, replaced when the shape or type of the
+        # arguments changes, so the scratch space stays bounded
+        self._scratch = {}
+        self.namespace = dict(numpy.__dict__)
+        self.namespace['pow'] = numpy.power
+        self.steps = []
+        self.registers = 0
+        self._free = []
+        self.result = self._compile(ast.parse(expression, mode='eval').body)
+        del self._free
+
+    def _compile(self, node):
+        """Append the steps that evaluate `node`, returning the operand
+        that holds its result
+        """
+        kind = node.__class__.__name__
+        
+        if kind == 'Name':
+            return ('name', node.id)
+        elif kind == 'Num':
+            return ('constant', node.n)
+        elif kind == 'BinOp':
+            ufunc = self._binaryUfuncs.get(node.op.__class__.__name__)
+            operands = [node.left, node.right]
+        elif kind == 'UnaryOp':
+            ufunc = self._unaryUfuncs.get(node.op.__class__.__name__)
+            operands = [node.operand]
+        elif kind == 'Compare' and len(node.ops) == 1:
+            ufunc = self._binaryUfuncs.get(node.ops[0].__class__.__name__)
+            operands = [node.left] + node.comparators
+        elif (kind == 'Call' and node.func.__class__.__name__ == 'Name'
+              and not node.keywords and node.starargs is None and node.kwargs is None):
+            ufunc = node.func.id
+            operands = node.args
+        else:
+            raise _Unfusable(kind)
+            
+        ufunc = self.namespace.get(ufunc)
+        if not isinstance(ufunc, self.namespace['ufunc']):
+            raise _Unfusable(kind)
+
+        operands = [self._compile(operand) for operand in operands]
+        
+        for operand in operands:
+            if operand[0] == 'register':
+                self._free.append(operand[1])
+        if self._free:
+            register = self._free.pop()
+        else:
+            register = self.registers
+            self.registers += 1
+            
+        self.steps.append([ufunc, operands, register, {}])
+        
+        return ('register', register)
+
+    def __call__(self, argDict, out=None):
+        """Evaluate the expression with the values in `argDict`
+
+        The result is written into `out` when it is compatible.
+        """
+        import numpy
+        from fipy.tools.numerix import _ufuncShortcut
+        
+        registers = {}
+        
+        def resolve(operand):
+            kind, value = operand
+            if kind == 'register':
+                return registers[value]
+            elif kind == 'name':
+                if value in argDict:
+                    return argDict[value]
+                else:
+                    return self.namespace[value]
+            else:
+                return value
+
+        if len(self.steps) == 0:
+            result = numpy.array(resolve(self.result))
+        
+        for index, (ufunc, operands, register, types) in enumerate(self.steps):
+            args = [resolve(operand) for operand in operands]
+            ufunc, args = _ufuncShortcut(ufunc, args)
+            signature = tuple(getattr(arg, 'dtype', type(arg)) for arg in args)
+            last = (index == len(self.steps) - 1)
+            
+            if signature not in types:
+                # the first time through, let NumPy choose the type
+                result = ufunc(*args)
+                types[signature] = result.dtype
+            else:
+                shape = numpy.broadcast(*args).shape
+                dtype = types[signature]
+                if not last:
+                    scratch = self._scratch.get(register)
+                    if (scratch is None 
+                        or scratch.shape != shape or scratch.dtype != dtype):
+                        scratch = self._scratch[register] = numpy.empty(shape, dtype=dtype)
+                    result = ufunc(*args, out=scratch)
+                elif (out is not None and out.shape == shape and out.dtype == dtype):
+                    result = ufunc(*args, out=out)
+                else:
+                    result = ufunc(*args)
+                    
+            registers[register] = result
+
+        if (out is not None and result is not out 
+            and out.shape == result.shape and out.dtype == result.dtype):
+            out[...] = result
+            result = out
+            
+        return result
+
+_compiled = {}
+
+def _evaluate(cstring, argDict, out=None):
+    """Evaluate the element-wise C expression of a `Variable` in one pass
+    over arrays, with `numexpr` if it is the selected backend and can
+    handle the expression, or with a `_FusedExpression` otherwise
+
+        >>> import numpy
+        >>> print _evaluate('(var0[i] * var1[i]) + sin(var2)', 
+        ...                 dict(var0=numpy.array((1., 2.)), 
+        ...                      var1=numpy.array((3., 4.)), 
+        ...                      var2=0.))
+        [ 3.  8.]
+        >>> print _evaluate('pow(var0[i], var1)', 
+        ...                 dict(var0=numpy.array((1., 2.)), var1=2))
+        [ 1.  4.]
+        
+    The result is written into `out` if it has the right shape and type
+    
+        >>> out = numpy.empty((2,))
+        >>> for i in range(2):
+        ...     result = _evaluate('(var0[i] * var1[i])',
+        ...                        dict(var0=numpy.array((1., 2.)),
+        ...                             var1=numpy.array((3., 4.))),
+        ...                        out=out)
+        >>> result is out
+        True
+    """
+    if backend == 'numexpr':
+        import numexpr
+        try:
+            result = numexpr.evaluate(_vectorize(cstring, functions=_numexprFunctions), 
+                                      local_dict=argDict, global_dict={})
+        except (KeyError, NotImplementedError, SyntaxError, TypeError, ValueError):
+            # numexpr does not know every NumPy function or type
+            pass
+        else:
+            if (out is not None 
+                and out.shape == result.shape and out.dtype == result.dtype):
+                out[...] = result
+                result = out
+            return result
+            
+    if cstring not in _compiled:
+        expression = _vectorize(cstring)
+        try:
+            _compiled[cstring] = _FusedExpression(expression)
+        except _Unfusable:
+            _compiled[cstring] = compile(expression, '<fipy inline>', 'eval')
+            
+    fused = _compiled[cstring]
+    
+    if isinstance(fused, _FusedExpression):
+        return fused(argDict, out=out)
+    else:
+        import numpy
+        return eval(fused, dict(numpy.__dict__, pow=numpy.power), argDict)
+
 def _getframeinfo(level, context=1):
     """
     Much faster alternative to `inspect.getouterframes(inspect.currentframe())[level]`
@@ -182,3 +480,9 @@ static int arrayIndex(PyArrayObject* array, int i, int vec[])
 }
                  """)
 
+def _test(): 
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+    
+if __name__ == "__main__": 
+    _test() 
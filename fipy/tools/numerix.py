@@ -478,8 +478,57 @@ else:
         ## We can't use Numeric.dot on an array of vectors
         return sqrt(dot(a1, a2))
 
+class _NearestTree(object):
+    """Spatial index for repeated nearest neighbor queries on fixed `data`
+
+    When `scipy.spatial` is available, the (D, N) `data` are held in a
+    KD-tree, so each query costs O(log N). Otherwise, or when `data` carries
+    physical dimensions, queries fall back to a chunked all-pairs search.
+
+    >>> from fipy import *
+    >>> m0 = Grid2D(dx=(.1, 1., 10.), dy=(.1, 1., 10.))
+    >>> m1 = Grid2D(nx=2, ny=2, dx=5., dy=5.)
+    >>> tree = _NearestTree(m0.cellCenters.globalValue)
+    >>> print tree.query(m1.cellCenters.globalValue)
+    [4 5 7 8]
+    >>> print tree.query(m1.cellCenters.globalValue[..., ::-1])
+    [8 7 5 4]
+    >>> print tree.query(numerix.zeros((2, 0)))
+    []
+    >>> print _NearestTree(numerix.zeros((2, 0))).query(m1.cellCenters.globalValue)
+    []
+    """
+    def __init__(self, data, max_mem=1e8):
+        self.data = asanyarray(data)
+        self.max_mem = max_mem
+        self._tree = None
+
+        if self.data.shape[-1] > 0 and not _isPhysical(self.data):
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                pass
+            else:
+                self._tree = cKDTree(NUMERIX.asarray(self.data, dtype=float).T)
+
+    def query(self, points):
+        """Return the indices of `data` that are closest to `points`
+        """
+        points = asanyarray(points)
+
+        if self._tree is None or _isPhysical(points):
+            return _bruteNearest(self.data, points, max_mem=self.max_mem)
+        elif points.shape[-1] == 0:
+            return arange(0)
+        else:
+            distances, indices = self._tree.query(NUMERIX.asarray(points, dtype=float).T)
+            return NUMERIX.asarray(indices, dtype=INT_DTYPE)
+
 def nearest(data, points, max_mem=1e8):
     """find the indices of `data` that are closest to `points`
+
+    Callers that query the same `data` repeatedly should hold on to a
+    `_NearestTree` instead.
     
     >>> from fipy import *
     >>> m0 = Grid2D(dx=(.1, 1., 10.), dy=(.1, 1., 10.))
@@ -491,6 +540,20 @@ def nearest(data, points, max_mem=1e8):
     >>> print nearest(m0.cellCenters.globalValue, m1.cellCenters.globalValue, max_mem=10000)
     [4 5 7 8]
     """
+    return _NearestTree(data, max_mem=max_mem).query(points)
+
+def _bruteNearest(data, points, max_mem=1e8):
+    """find the indices of `data` that are closest to `points` by
+    comparing every point against every datum
+    
+    >>> from fipy import *
+    >>> m0 = Grid2D(dx=(.1, 1., 10.), dy=(.1, 1., 10.))
+    >>> m1 = Grid2D(nx=2, ny=2, dx=5., dy=5.)
+    >>> print _bruteNearest(m0.cellCenters.globalValue, m1.cellCenters.globalValue)
+    [4 5 7 8]
+    >>> print _bruteNearest(m0.cellCenters.globalValue, m1.cellCenters.globalValue, max_mem=100)
+    [4 5 7 8]
+    """
     data = asanyarray(data)
     points = asanyarray(points)
     
@@ -546,6 +609,24 @@ def nearest(data, points, max_mem=1e8):
         
     return nearestIndices 
 
+def _ufuncShortcut(ufunc, args):
+    """Replace `power` by a cheaper ufunc for the exponents that
+    `ndarray.__pow__` treats specially
+    
+    >>> print _ufuncShortcut(power, (arange(3.), 2))
+    (<ufunc 'square'>, (array([ 0.,  1.,  2.]),))
+    >>> print _ufuncShortcut(power, (arange(3.), 3))[0]
+    <ufunc 'power'>
+    """
+    if (ufunc is NUMERIX.power and NUMERIX.isrealobj(args[1]) 
+        and NUMERIX.ndim(args[1]) == 0):
+        shortcut = {2: NUMERIX.square, 
+                    0.5: NUMERIX.sqrt}.get(float(args[1]))
+        if shortcut is not None:
+            return (shortcut, args[:1])
+            
+    return (ufunc, args)
+
 def allequal(first, second):
     """
     Returns `true` if every element of `first` is equal to the corresponding
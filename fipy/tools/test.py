@@ -43,6 +43,10 @@ def _suite():
             'numerix',
             'dump',
             'vector',
+            'inline',
+            'variableProfiler',
+            'ensemble',
+            'comms.haloExchange',
         ), base = __name__)
 
     return theSuite
@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "variableProfiler.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+import weakref
+from timeit import default_timer as _timer
+
+__all__ = ["VariableProfiler"]
+
+class _VariableRecord(object):
+    """Statistics gathered for a single `Variable`
+    """
+    def __init__(self, var, index):
+        self.ref = weakref.ref(var)
+        self.index = index
+        self.label = _label(var)
+        self.className = var.__class__.__name__
+        self.required = []
+        self.ancestors = None
+        self.changes = 0
+        self.signature = None
+        self.recomputes = 0
+        self.redundant = 0
+        self.time = 0.
+        self.selfTime = 0.
+        self.bytes = 0
+        self.invalidations = 0
+        self.propagations = 0
+        self.fanOut = 0
+
+    def _asDict(self):
+        return dict(id=self.index,
+                    label=self.label,
+                    className=self.className,
+                    recomputes=self.recomputes,
+                    redundant=self.redundant,
+                    time=self.time,
+                    selfTime=self.selfTime,
+                    bytes=self.bytes,
+                    invalidations=self.invalidations,
+                    propagations=self.propagations,
+                    fanOut=self.fanOut)
+
+def _label(var, width=40):
+    label = var.name
+    if len(label) == 0 and hasattr(var, "_getRepresentation"):
+        try:
+            label = var._getRepresentation(style="name")
+        except Exception:
+            label = ""
+    if len(label) == 0:
+        label = var.__class__.__name__
+    if len(label) > width:
+        label = label[:width - 3] + "..."
+    return label
+
+def _nbytes(value):
+    value = getattr(value, "value", value)
+    return getattr(value, "nbytes", 0)
+
+class VariableProfiler(object):
+    """Record how often, and at what cost, `Variable` objects are recomputed
+
+    While a profiler is running, every recalculation of a
+    :class:`~fipy.variables.variable.Variable` is counted and timed, along
+    with the bytes of the arrays it allocates for its results, and every
+    change that marks dependent variables as stale is traced through the
+    dependency graph.
+
+    >>> from fipy import *
+    >>> a = Variable(value=1., name="a")
+    >>> k = Variable(value=2., name="k")
+    >>> b = a * k
+    >>> c = numerix.sin(b + a)
+    >>> d = numerix.cos(b - a)
+    >>> c.cacheMe(recursive=True)
+    >>> with VariableProfiler() as profiler:
+    ...     for i in range(3):
+    ...         a.value = i
+    ...         values = (c.value, d.value, d.value)
+    >>> print profiler.report(sort="recomputes") # doctest: +ELLIPSIS
+    label                    recomputes redundant invalidations fan-out      bytes   time (s)   self (s)
+    ((a * k) - a)                     6         3             3       3         48 ...
+    cos(((a * k) - a))                6         3             5       0         48 ...
+    (a * k)                           3         0             3       0         24 ...
+    sin(((a * k) + a))                3         0             2       0         24 ...
+    ((a * k) + a)                     3         0             2       0         24 ...
+    a                                 0         0             0      12          0 ...
+    k                                 0         0             0       0          0 ...
+
+    Operator variables are not cached by default, so `d` and `b - a` are
+    recomputed every time `d` is requested, even though `a` has not
+    changed. Once `b - a` is recomputed, it marks `d` as stale again, which
+    shows up as fan-out. The profiler stops recording when the block exits
+
+    >>> a.value = 5
+    >>> print profiler.records[a].fanOut
+    12
+
+    The dependency graph, annotated with these statistics, can be exported
+    in the Graphviz DOT language, with the most expensive variables
+    highlighted and each edge labeled by the number of changes that
+    propagated along it
+
+    >>> print profiler.toDOT() # doctest: +ELLIPSIS
+    digraph variables {
+        node [shape=box, style=filled];
+        n0 [label="a\\nrecomputes: 0\\nredundant: 0\\n...\\nfan-out: 12", fillcolor="0.000 0.000 1.000"];
+    ...
+        n0 -> n1 [label="3", penwidth=...];
+    ...
+    }
+
+    or as JSON
+
+    >>> import json
+    >>> trace = json.loads(profiler.toJSON())
+    >>> print len(trace["nodes"]), len(trace["edges"])
+    7 8
+    >>> print trace["nodes"][0]["label"], trace["nodes"][0]["fanOut"]
+    a 12
+    """
+    def __init__(self):
+        self.reset()
+        self._previous = None
+
+    def reset(self):
+        """Discard all statistics gathered so far
+        """
+        self._records = {}
+        self._retired = []
+        self._edges = {}
+        self._recomputing = []
+        self._propagating = []
+        self._freshening = None
+
+    def start(self):
+        """Begin recording `Variable` activity
+        """
+        from fipy.variables.variable import Variable
+        self._previous = Variable._profiler
+        Variable._profiler = self
+
+    def stop(self):
+        """Stop recording `Variable` activity
+        """
+        from fipy.variables.variable import Variable
+        Variable._profiler = self._previous
+        self._previous = None
+        self._recomputing = []
+        self._propagating = []
+        self._freshening = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def _record(self, var):
+        record = self._records.get(id(var))
+        if record is None or record.ref() is not var:
+            if record is not None:
+                # `var` has been garbage collected and its `id` reused
+                self._retired.append(record)
+            record = _VariableRecord(var, index=len(self._records) + len(self._retired))
+            self._records[id(var)] = record
+        return record
+
+    def _calcValue(self, var):
+        """Recompute `var`, accumulating its statistics
+        """
+        record = self._record(var)
+        previous = var._value
+
+        self._recomputing.append(0.)
+        start = _timer()
+        try:
+            value = var._calcValue()
+        finally:
+            elapsed = _timer() - start
+            children = self._recomputing.pop()
+            if len(self._recomputing) > 0:
+                self._recomputing[-1] += elapsed
+
+        if record.ancestors is None:
+            record.ancestors = self._ancestors(var)
+        signature = sum([ancestor.changes for ancestor in record.ancestors])
+        if record.recomputes > 0 and signature == record.signature:
+            # nothing `var` depends on has changed since it was last computed
+            record.redundant += 1
+        record.signature = signature
+        record.recomputes += 1
+        record.time += elapsed
+        record.selfTime += elapsed - children
+        if value is not previous:
+            record.bytes += _nbytes(value)
+        record.required = [self._record(required) for required in var.requiredVariables]
+
+        # `var` is about to mark its dependents stale,
+        # but that is not a change to their inputs
+        self._freshening = var
+
+        return value
+
+    def _ancestors(self, var):
+        """Return the records of `var` and every `Variable` it depends on
+        """
+        ancestors = {}
+        unvisited = [var]
+        while len(unvisited) > 0:
+            v = unvisited.pop()
+            if id(v) not in ancestors:
+                ancestors[id(v)] = self._record(v)
+                unvisited.extend(v.requiredVariables)
+        return ancestors.values()
+
+    def _startPropagation(self, var):
+        record = self._record(var)
+        if len(self._propagating) == 0 and var is not self._freshening:
+            record.changes += 1
+        self._freshening = None
+        self._propagating.append(record)
+
+    def _endPropagation(self, var):
+        root = self._propagating.pop()
+        if len(self._propagating) == 0:
+            root.propagations += 1
+
+    def _invalidated(self, var):
+        record = self._record(var)
+        record.invalidations += 1
+        if len(self._propagating) == 0:
+            record.changes += 1
+        else:
+            self._propagating[0].fanOut += 1
+            edge = (self._propagating[-1], record)
+            self._edges[edge] = self._edges.get(edge, 0) + 1
+
+    def _allRecords(self):
+        records = self._retired + self._records.values()
+        for record in records:
+            var = record.ref()
+            if var is not None:
+                record.required = [self._record(required) for required in var.requiredVariables]
+        # `_record()` may have found new variables
+        records = self._retired + self._records.values()
+        records.sort(key=lambda record: record.index)
+        return records
+
+    @property
+    def records(self):
+        """The statistics gathered for each live `Variable`, keyed by the
+        `Variable` itself
+        """
+        return _Records(self)
+
+    def _graph(self):
+        records = self._allRecords()
+        edges = {}
+        for record in records:
+            for required in record.required:
+                edges[(required, record)] = self._edges.get((required, record), 0)
+        return records, edges
+
+    def report(self, sort="selfTime", number=None):
+        """Return a table of the recorded statistics
+
+        :Parameters:
+          - `sort`: the statistic to rank the variables by
+          - `number`: the number of variables to list, or all if `None`
+        """
+        records = self._allRecords()
+        records.sort(key=lambda record: -getattr(record, sort))
+        if number is not None:
+            records = records[:number]
+
+        lines = ["%-24s %10s %9s %13s %7s %10s %10s %10s"
+                 % ("label", "recomputes", "redundant", "invalidations",
+                    "fan-out", "bytes", "time (s)", "self (s)")]
+        for record in records:
+            lines.append("%-24s %10d %9d %13d %7d %10d %10.4f %10.4f"
+                         % (record.label[:24], record.recomputes, record.redundant,
+                            record.invalidations, record.fanOut, record.bytes,
+                            record.time, record.selfTime))
+        return "\n".join(lines)
+
+    def toDOT(self, hot=10):
+        """Return the dependency graph in the Graphviz DOT language
+
+        Variables are shaded in proportion to the time spent recomputing
+        them, exclusive of the variables they require, and the `hot` most
+        expensive are outlined in red. Each edge is labeled with the
+        number of times a change propagated along it.
+        """
+        records, edges = self._graph()
+
+        maxTime = max([record.selfTime for record in records] + [0.])
+        hottest = sorted(records, key=lambda record: -record.selfTime)[:hot]
+        hottest = set([record for record in hottest if record.selfTime > 0])
+        maxCount = max(edges.values() + [1])
+
+        lines = ["digraph variables {",
+                 "    node [shape=box, style=filled];"]
+        for record in records:
+            label = "\\n".join([record.label.replace('"', '\\"'),
+                                "recomputes: %d" % record.recomputes,
+                                "redundant: %d" % record.redundant,
+                                "self time: %.3g s" % record.selfTime,
+                                "bytes: %d" % record.bytes,
+                                "fan-out: %d" % record.fanOut])
+            if maxTime > 0:
+                heat = record.selfTime / maxTime
+            else:
+                heat = 0.
+            attributes = 'label="%s", fillcolor="0.000 %.3f 1.000"' % (label, heat)
+            if record in hottest:
+                attributes += ", color=red, penwidth=2"
+            lines.append("    n%d [%s];" % (record.index, attributes))
+        for (required, record), count in sorted(edges.items(),
+                                                key=lambda item: (item[0][0].index, item[0][1].index)):
+            lines.append('    n%d -> n%d [label="%d", penwidth=%.2f];'
+                         % (required.index, record.index, count, 1. + 4. * count / maxCount))
+        lines.append("}")
+
+        return "\n".join(lines)
+
+    def toJSON(self):
+        """Return the dependency graph and its statistics as a JSON string
+        """
+        import json
+
+        records, edges = self._graph()
+        return json.dumps(dict(nodes=[record._asDict() for record in records],
+                               edges=[dict(source=required.index,
+                                           target=record.index,
+                                           propagations=count)
+                                      for (required, record), count in edges.items()]))
+
+class _Records(object):
+    """Lookup of the statistics of live `Variable` objects
+    """
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def __getitem__(self, var):
+        record = self.profiler._records.get(id(var))
+        if record is None or record.ref() is not var:
+            raise KeyError(var)
+        return record
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
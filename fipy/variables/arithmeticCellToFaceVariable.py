@@ -64,6 +64,18 @@ class _ArithmeticCellToFaceVariable(_CellToFaceVariable):
         def _calcValue_(self, alpha, id1, id2):
             cell1 = numerix.take(self.var, id1, axis=-1)
             cell2 = numerix.take(self.var, id2, axis=-1)
-            return (cell2 - cell1) * alpha + cell1
+            
+            out = None
+            if type(cell1) is type(cell2) is type(numerix.array(1)):
+                out = self._outputBuffer(shape=cell1.shape, 
+                                         dtype=numerix.result_type(cell1, alpha))
+            
+            if out is None:
+                return (cell2 - cell1) * alpha + cell1
+            else:
+                # cell2 is a fresh copy that can hold the difference
+                numerix.subtract(cell2, cell1, out=cell2)
+                numerix.multiply(cell2, alpha, out=out)
+                return numerix.add(out, cell1, out=out)
 
         
@@ -78,7 +78,7 @@ def _BinaryOperatorVariable(operatorClass=None):
                     self.var[1] = physicalField.PhysicalField(value=self.var[1])
                 val1 = self.var[1]
 
-            return self.op(self.var[0].value, val1)
+            return self._applyOp(self.var[0].value, val1)
 
         @property
         def unit(self):
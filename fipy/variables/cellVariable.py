@@ -63,7 +63,25 @@ class CellVariable(_MeshVariable):
         
     """
 
-    def __init__(self, mesh, name='', value=0., rank=None, elementshape=None, unit=None, hasOld=0):
+    # the ring buffer of previous time levels
+    _historyLength = 0
+    _history = None
+    _historyCount = 0
+    _extrapolated = True
+
+    def __init__(self, mesh, name='', value=0., rank=None, elementshape=None, unit=None, hasOld=0, history=0):
+        """
+        :Parameters:
+          - `mesh`: the mesh that defines the geometry of this `Variable`
+          - `name`: the user-readable name of the `Variable`
+          - `value`: the initial value
+          - `rank`: the rank (number of dimensions) of each element
+          - `elementshape`: the shape of each element
+          - `unit`: the physical units of the `Variable`
+          - `hasOld`: whether to keep the value of the previous time step
+          - `history`: the number of previous time levels to keep, from
+            which iterative solvers extrapolate their initial guess
+        """
         _MeshVariable.__init__(self, mesh=mesh, name=name, value=value, 
                                rank=rank, elementshape=elementshape, unit=unit)
 
@@ -72,6 +90,8 @@ class CellVariable(_MeshVariable):
         else:
             self._old = None
 
+        self._historyLength = history
+
     @property
     def _variableClass(self):
         return CellVariable
@@ -126,7 +146,9 @@ class CellVariable(_MeshVariable):
                     
                     self._old = self.__class__(op=self.op, var=oldVar, 
                                                opShape=self.opShape, 
-                                               canInline=self.canInline)
+                                               canInline=self.canInline,
+                                               ufunc=self.ufunc,
+                                               swapUfunc=self.swapUfunc)
                                   
                 return self._old
                 
@@ -166,10 +188,8 @@ class CellVariable(_MeshVariable):
 
     def __call__(self, points=None, order=0, nearestCellIDs=None):
         r"""
-        Interpolates the CellVariable to a set of points using a
-        method that has a memory requirement on the order of Ncells by
-        Npoints in general, but uses only Ncells when the
-        CellVariable's mesh is a UniformGrid object.
+        Interpolates the CellVariable to a set of points in the cells
+        that contain them.
 
         :Parameters:
 
@@ -198,11 +218,32 @@ class CellVariable(_MeshVariable):
             [ 0.125  0.25   0.5    0.625  0.25   0.375  0.875  1.     0.5    0.875
               1.875  2.25   0.625  1.     2.25   2.625]
 
+        Points take the value of the cell that contains them, even when
+        they are closer to the center of another cell
+        
+            >>> from fipy.meshes.mesh2D import Mesh2D
+            >>> m = Mesh2D(vertexCoords=numerix.array(((0., 4., 0., 4.), (0., 0., 1., 1.))),
+            ...            faceVertexIDs=numerix.array(((0, 1, 2, 1, 3), (1, 2, 0, 3, 2))),
+            ...            cellFaceIDs=numerix.array(((0, 1), (1, 3), (2, 4))))
+            >>> v = CellVariable(mesh=m, value=(1., 2.))
+            >>> print v(((3.5, 0.5), (0.1, 0.9)))
+            [ 1.  2.]
+
+        The interpolation weights for a fixed set of points can be reused
+        for any number of variables
+        
+            >>> m = Tri2D(nx=3, ny=3)
+            >>> interpolator = m._getInterpolator(((0.9, 1.5, 2.2), (0.5, 1.5, 1.7)))
+            >>> print numerix.allclose(interpolator(m.x), (0.9, 1.5, 2.2))
+            True
+            >>> print numerix.allclose(interpolator(m.x * m.y), (0.45, 2.25, 3.74), atol=0.1)
+            True
+
         """           
         if points is not None:
 
             if nearestCellIDs is None:
-                nearestCellIDs = self.mesh._getNearestCellID(points)
+                nearestCellIDs = self.mesh._getContainingCellID(points)
 
             if order == 0:
                 return self.globalValue[..., nearestCellIDs]
@@ -498,6 +539,58 @@ class CellVariable(_MeshVariable):
         else:
             self._old.value = self.value.copy()
 
+        if self._historyLength > 0:
+            self._keepTimeLevel()
+
+    def _keepTimeLevel(self):
+        value = numerix.array(self.numericValue)
+        if self._history is None:
+            self._history = numerix.empty((self._historyLength,) + value.shape, value.dtype)
+        self._history[self._historyCount % self._historyLength] = value
+        self._historyCount += 1
+        self._extrapolated = False
+
+    def _extrapolate(self):
+        r"""
+        Return the value at the next time level, extrapolated from the
+        kept time levels by a polynomial through them, or `None`.
+
+        The time steps are assumed to be equal. Only the first call after
+        `updateOld()` extrapolates, so that the following sweeps of a time
+        step start from their latest solution.
+
+        >>> from fipy import *
+        >>> v = CellVariable(mesh=Grid1D(nx=2), hasOld=True, history=3)
+        >>> for t in range(3):
+        ...     v.value = t**2
+        ...     v.updateOld()
+        ...     print v._extrapolate()
+        None
+        [ 2.  2.]
+        [ 9.  9.]
+        >>> print v._extrapolate()
+        None
+        >>> for t in range(3, 5):
+        ...     v.value = t**2
+        ...     v.updateOld()
+        >>> print v._extrapolate()
+        [ 25.  25.]
+        """
+        levels = min(self._historyCount, self._historyLength)
+        if self._extrapolated or levels < 2:
+            return None
+            
+        self._extrapolated = True
+        
+        # the newest level is weighted by `levels`, and the older ones by
+        # the following binomial coefficients of alternating sign
+        value = numerix.zeros(self._history.shape[1:], 'd')
+        coeff = 1
+        for age in range(levels):
+            coeff = coeff * (levels - age) / (age + 1)
+            value += (-1)**age * coeff * self._history[(self._historyCount - 1 - age) % self._historyLength]
+        return value
+
     def _resetToOld(self):
         if self._old is not None:
             self.value = (self._old.value)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "checkpoint.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.variables.stalenessWatcher import _StalenessWatcher
+
+def _copy(value):
+    if hasattr(value, "copy"):
+        return value.copy()
+    else:
+        return value
+
+class _Checkpoint(object):
+    """Save the values of some variables, and roll them back, without
+    recalculating what depends on them
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=3)
+        >>> var = CellVariable(mesh=mesh, value=(1., 2., 3.))
+        >>> square = var**2
+        >>> square.cacheMe()
+        >>> print square
+        [ 1.  4.  9.]
+        >>> checkpoint = _Checkpoint((var,))
+        >>> checkpoint.save()
+        >>> var.setValue((4., 5., 6.))
+        >>> print square
+        [ 16.  25.  36.]
+
+    Rolling back swaps the saved buffer in as the value of `var`, and
+    `square` gets back the value it had when the checkpoint was saved
+
+        >>> checkpoint.restore()
+        >>> print var
+        [ 1.  2.  3.]
+        >>> print square.stale
+        0
+        >>> print square
+        [ 1.  4.  9.]
+
+    A checkpoint can only be restored once for each `save()`
+
+        >>> checkpoint.restore() # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        RuntimeError: the checkpoint has not been saved
+
+    Cached values are only restored if nothing else that they depend on
+    has changed since the checkpoint was saved
+
+        >>> factor = Variable(value=1.)
+        >>> scaled = var * factor
+        >>> scaled.cacheMe()
+        >>> print scaled
+        [ 1.  2.  3.]
+        >>> checkpoint.save()
+        >>> var.setValue(0.)
+        >>> factor.setValue(2.)
+        >>> checkpoint.restore()
+        >>> print scaled.stale
+        1
+        >>> print scaled
+        [ 2.  4.  6.]
+
+    The cached values are saved as copies, so they are restored even if
+    they are recalculated in place in the meantime
+
+        >>> cubed = var**3
+        >>> cubed._recomputeInPlace = True
+        >>> cubed.cacheMe()
+        >>> print cubed
+        [  1.   8.  27.]
+        >>> checkpoint.save()
+        >>> var.setValue(2.)
+        >>> print cubed
+        [ 8.  8.  8.]
+        >>> checkpoint.restore()
+        >>> print cubed.stale
+        0
+        >>> print cubed
+        [  1.   8.  27.]
+    """
+    def __init__(self, variables):
+        """
+        :Parameters:
+          - `variables`: the `CellVariable` objects whose values are saved
+        """
+        self.variables = list(variables)
+        self._buffers = {}
+        self._caches = []
+        self._watcher = None
+        self._saved = False
+
+    def _downstream(self):
+        """Everything that is calculated from the saved variables"""
+        seen = set([id(var) for var in self.variables])
+        downstream = []
+        stack = list(self.variables)
+        while len(stack) > 0:
+            var = stack.pop()
+            for subscriber in var.subscribedVariables:
+                subscriber = subscriber()
+                if subscriber is not None and id(subscriber) not in seen:
+                    seen.add(id(subscriber))
+                    downstream.append(subscriber)
+                    stack.append(subscriber)
+        return downstream, seen
+
+    def save(self):
+        """
+        Copy the values of the variables into buffers that are kept from
+        one `save()` to the next, and copy those of the values calculated
+        from them that are current.
+        """
+        for var in self.variables:
+            value = var._array
+            buffer = self._buffers.get(id(var))
+            if (buffer is None or buffer is value
+                or buffer.shape != value.shape or buffer.dtype != value.dtype):
+                self._buffers[id(var)] = value.copy()
+            else:
+                buffer[...] = value
+
+        downstream, seen = self._downstream()
+
+        # copy the values, as a recalculation may overwrite them in place
+        self._caches = [(var, _copy(var._value), _copy(var._constrainedValue))
+                        for var in downstream
+                        if not var.stale and var._isCached() and var._value is not None]
+
+        inputs = {}
+        for var, value, constrained in self._caches:
+            for required in var.requiredVariables:
+                if id(required) not in seen:
+                    inputs[id(required)] = required
+        self._watcher = _StalenessWatcher(inputs.values())
+
+        self._saved = True
+
+    def restore(self):
+        """
+        Swap the saved buffers back in as the values of the variables.
+
+        Arrays obtained from the `value` of the variables before the
+        rollback are not changed by it.
+        """
+        if not self._saved:
+            raise RuntimeError("the checkpoint has not been saved")
+
+        for var in self.variables:
+            buffer = self._buffers[id(var)]
+            self._buffers[id(var)] = var._array
+            var._setNumericValue(buffer)
+            var._markFresh()
+
+        if not self._watcher.changed:
+            for var, value, constrained in self._caches:
+                var._value = value
+                var._constrainedValue = constrained
+                var.stale = 0
+
+        self._caches = []
+        self._watcher = None
+        self._saved = False
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -175,7 +175,25 @@ class _FaceGradVariable(FaceVariable):
         T1 = (t1grad1 + t1grad2) / 2.
         T2 = (t2grad1 + t2grad2) / 2.
 
-        return normals[s] * N[numerix.newaxis] + tangents1[s] * T1[numerix.newaxis] + tangents2[s] * T2[numerix.newaxis]
+        normals, N = normals[s], N[numerix.newaxis]
+        tangents1, T1 = tangents1[s], T1[numerix.newaxis]
+        tangents2, T2 = tangents2[s], T2[numerix.newaxis]
+        
+        out = None
+        if not [a for a in (normals, N, tangents1, T1, tangents2, T2) 
+                if type(a) is not type(numerix.array(1))]:
+            out = self._outputBuffer(shape=numerix.broadcast(normals, N).shape,
+                                     dtype=numerix.result_type(normals, N, 
+                                                               tangents1, T1, 
+                                                               tangents2, T2))
+            
+        if out is None:
+            return normals * N + tangents1 * T1 + tangents2 * T2
+        else:
+            numerix.multiply(normals, N, out=out)
+            out += tangents1 * T1
+            out += tangents2 * T2
+            return out
 
 def _test(): 
     import fipy.tests.doctestPlus
@@ -41,8 +41,13 @@ from fipy.tools import numerix
 
 def _OperatorVariableClass(baseClass=object):
     class _OperatorVariable(baseClass):
-        def __init__(self, op, var, opShape=(), canInline=True, unit=None, inlineComment=None, *args, **kwargs):
+        def __init__(self, op, var, opShape=(), canInline=True, unit=None, inlineComment=None, 
+                     ufunc=None, swapUfunc=False, *args, **kwargs):
             self.op = op
+            if ufunc is None and isinstance(op, numerix.ufunc) and op.nout == 1:
+                ufunc = op
+            self.ufunc = ufunc
+            self.swapUfunc = swapUfunc
             self.var = var
             self.opShape = opShape
             self._unit = unit
@@ -74,12 +79,37 @@ def _OperatorVariableClass(baseClass=object):
                 from fipy.tools import inline
                 if inline.doInline:
                     return self._execInline(comment=self.comment)
+                elif inline.backend is not None and self.opShape != ():
+                    return self._execVectorized()
                 else:
                     return self._calcValue_()
 
         def _calcValue_(self):
             pass
 
+        def _applyOp(self, *args):
+            """Apply `op` to `args`, writing the result into the current
+            value if it can be recomputed in place
+            """
+            if self._recomputeInPlace and self._value is not None:
+                ufunc = self.ufunc
+                if (ufunc is not None
+                    and [a for a in args if type(a) is type(numerix.array(1))]
+                    and not [a for a in args if type(a) is not type(numerix.array(1))
+                                                and not numerix.isscalar(a)]):
+                    if self.swapUfunc:
+                        args = args[::-1]
+                    ufunc, args = numerix._ufuncShortcut(ufunc, args)
+                    # let NumPy pick the type of the result from a 
+                    # single element of each argument
+                    samples = [a[(slice(0, 1),) * numerix.ndim(a)] for a in args]
+                    out = self._outputBuffer(shape=numerix.broadcast(*args).shape, 
+                                             dtype=ufunc(*samples).dtype)
+                    if out is not None:
+                        return ufunc(*args, out=out)
+
+            return self.op(*args)
+
         def _isCached(self):
             return (Variable._isCached(self) 
                     or (len(self.subscribedVariables) > 1 and not self._cacheNever))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "stalenessWatcher.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.variables.variable import Variable
+
+class _ReadRecorder(object):
+    """Collect the `Variable` objects whose values are read while the
+    recorder is active
+
+        >>> a = Variable(value=1.)
+        >>> b = Variable(value=2.)
+        >>> c = a * b
+        >>> with _ReadRecorder() as outer:
+        ...     with _ReadRecorder() as inner:
+        ...         print c.value
+        ...     print b.value
+        2.0
+        2.0
+        >>> print sorted([v is c for v in inner.variables])
+        [False, False, True]
+        >>> print len(outer.variables)
+        3
+
+    The reads made inside a nested recorder are also reads of the
+    enclosing one.
+    """
+    def __init__(self):
+        self._reads = {}
+
+    def record(self, var):
+        self._reads[id(var)] = var
+
+    @property
+    def variables(self):
+        return self._reads.values()
+
+    def __enter__(self):
+        self._previous = Variable._readRecorder
+        Variable._readRecorder = self
+        return self
+
+    def __exit__(self, type, value, traceback):
+        Variable._readRecorder = self._previous
+        if self._previous is not None:
+            self._previous._reads.update(self._reads)
+
+class _StalenessWatcher(Variable):
+    """Notice when any of a collection of `Variable` objects changes
+
+        >>> a = Variable(value=1.)
+        >>> b = Variable(value=2.)
+        >>> c = a * b
+        >>> c.dontCacheMe()
+        >>> print c
+        2.0
+        >>> watcher = _StalenessWatcher((c,))
+        >>> print watcher.changed
+        False
+
+    Uncached variables are recalculated, and notify their subscribers,
+    every time they are read, so `_StalenessWatcher` watches what they
+    depend on instead
+
+        >>> print c
+        2.0
+        >>> print watcher.changed
+        False
+        >>> b.value = 3.
+        >>> print watcher.changed
+        True
+    """
+    def __init__(self, variables):
+        Variable.__init__(self, value=None)
+
+        for var in self._watchable(variables):
+            self._requires(var)
+
+        self.changed = False
+
+    @staticmethod
+    def _watchable(variables):
+        watchable = {}
+        seen = set()
+        stack = list(variables)
+        while len(stack) > 0:
+            var = stack.pop()
+            if id(var) not in seen:
+                seen.add(id(var))
+                if var._isCached() or len(var.requiredVariables) == 0:
+                    watchable[id(var)] = var
+                else:
+                    stack.extend(var.requiredVariables)
+        return watchable.values()
+
+    def _markStale(self):
+        self.changed = True
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
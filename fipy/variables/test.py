@@ -64,7 +64,9 @@ def _suite():
             'fipy.variables.surfactantConvectionVariable',
             'fipy.variables.surfactantVariable',
             'fipy.variables.levelSetDiffusionVariable',
-            'fipy.variables.distanceVariable'
+            'fipy.variables.distanceVariable',
+            'fipy.variables.stalenessWatcher',
+            'fipy.variables.checkpoint'
         ))
     
 if __name__ == '__main__':
@@ -64,7 +64,7 @@ def _UnaryOperatorVariable(operatorClass=None):
     
     class unOp(operatorClass):
         def _calcValue_(self):
-            return self.op(self.var[0].value)
+            return self._applyOp(self.var[0].value)
 
         @property
         def unit(self):
@@ -75,6 +75,20 @@ class Variable(object):
 
     _cacheNever = False
     
+    _recomputeInPlace = (os.getenv("FIPY_INPLACE") is not None) or False
+    if parser.parse("--no-inplace", action="store_true"):
+        _recomputeInPlace = False
+    if parser.parse("--inplace", action="store_true"):
+        _recomputeInPlace = True
+
+    # the active :class:`~fipy.tools.variableProfiler.VariableProfiler`, if any
+    _profiler = None
+    _readRecorder = None
+
+    # the value with the constraints applied, and the indices of the constraints
+    _constrainedValue = None
+    _constraintIndices = None
+
     def __new__(cls, *args, **kwds):
         return object.__new__(cls)
     
@@ -506,10 +520,23 @@ class Variable(object):
             >>> b.value
             7
 
+        As with the value of an unconstrained `Variable`, the value of a
+        constrained `Variable` that is cached is the same array until the
+        `Variable` or a constraint changes, so it must not be modified
+
+            >>> c = Variable((0, 1, 2))
+            >>> c.constrain(5, where=Variable((True, False, False)))
+            >>> print c.value is c.value
+            True
         """
-        
+        if Variable._readRecorder is not None:
+            Variable._readRecorder.record(self)
+
         if self.stale or not self._isCached() or self._value is None:
-            value = self._calcValue()
+            if Variable._profiler is None:
+                value = self._calcValue()
+            else:
+                value = Variable._profiler._calcValue(self)
             if self._isCached():
                 self._setValueInternal(value=value)
             else:
@@ -518,24 +545,112 @@ class Variable(object):
         else:
             value = self._value
 
-        if len(self.constraints) > 0:
-            value = value.copy()
-            for constraint in self.constraints:
-                if constraint.where is None:
-                    value[:] = constraint.value
-                else:
-                    mask = constraint.where
-                    if not hasattr(mask, 'dtype') or mask.dtype != bool:
-                        mask = numerix.array(mask, dtype=numerix.NUMERIX.bool)
-
-                    if 0 not in value.shape:
+        constraints = self.constraints
+        if len(constraints) > 0:
+            indices = self._getConstraintIndices(constraints)
+            if self._constrainedValue is None or not self._isCached():
+                value = value.copy()
+                for constraint, ids in zip(constraints, indices):
+                    if ids is None:
+                        value[:] = constraint.value
+                    elif 0 not in value.shape:
                         try:
-                            value[..., mask] = constraint.value
+                            value[..., ids] = constraint.value
                         except:
-                            value[..., mask] = numerix.array(constraint.value)[..., mask]
+                            value[..., ids] = numerix.array(constraint.value)[..., ids]
+                if self._isCached():
+                    self._constrainedValue = value
+            else:
+                value = self._constrainedValue
 
         return value
 
+    def _getConstraintIndices(self, constraints):
+        """
+        Return the indices selected by the mask of each of `constraints`,
+        or `None` for a constraint that applies everywhere.
+
+        The indices are only recomputed when the constraints are added to or
+        removed, or when a `Variable` mask changes
+
+            >>> v = Variable((0, 1, 2, 3))
+            >>> mask = Variable((True, False, False, False))
+            >>> v.constrain(5, where=mask)
+            >>> indices = v._getConstraintIndices(v.constraints)
+            >>> print indices
+            [array([0])]
+            >>> print v._getConstraintIndices(v.constraints) is indices
+            True
+            >>> mask[:] = (False, False, False, True)
+            >>> print v._getConstraintIndices(v.constraints)
+            [array([3])]
+            >>> print v
+            [0 1 2 5]
+
+        and the constrained value is only recomputed when the `Variable` or
+        a constraint changes
+
+            >>> value = v.value
+            >>> print v.value is value
+            True
+            >>> v.constrain(7)
+            >>> print v.value is value, v
+            False [7 7 7 7]
+
+        A mask that is not a `Variable` may be changed in place without
+        notice, so its indices, and the constrained value, are worked out
+        every time
+
+            >>> v = Variable((0, 1, 2, 3))
+            >>> mask = numerix.array((True, False, False, False))
+            >>> v.constrain(5, where=mask)
+            >>> print v
+            [5 1 2 3]
+            >>> mask[:] = (False, False, False, True)
+            >>> print v
+            [0 1 2 5]
+        """
+        if [constraint for constraint in constraints
+            if constraint.where is not None and not isinstance(constraint.where, Variable)]:
+            self._constraintIndices = None
+            self._constrainedValue = None
+            return [self._maskIndices(constraint.where) for constraint in constraints]
+
+        cached = self._constraintIndices
+        if (cached is None 
+            or len(cached[0]) != len(constraints)
+            or [c for c, other in zip(cached[0], constraints) if c is not other]
+            or (cached[1] is not None and cached[1].changed)):
+            
+            masks = [constraint.where for constraint in constraints 
+                     if isinstance(constraint.where, Variable)]
+            if len(masks) > 0:
+                from fipy.variables.stalenessWatcher import _StalenessWatcher
+                watcher = _StalenessWatcher(masks)
+            else:
+                watcher = None
+                
+            indices = [self._maskIndices(constraint.where) for constraint in constraints]
+
+            # hold on to the constraints, so that they are not mistaken
+            # for new ones with the same id
+            cached = self._constraintIndices = (list(constraints), watcher, indices)
+            self._constrainedValue = None
+            
+        return cached[2]
+
+    @staticmethod
+    def _maskIndices(where):
+        """The indices selected by the constraint mask `where`"""
+        if where is None:
+            return None
+        else:
+            mask = numerix.array(where, dtype=numerix.NUMERIX.bool)
+            if len(mask.shape) == 1:
+                return numerix.nonzero(mask)[0]
+            else:
+                return mask
+
     def _setValueProperty(self, newVal):
         """Since `self.setValue` contains optional, named parameters, we will
         punt the property's set method off to that."""
@@ -636,6 +751,39 @@ class Variable(object):
             for var in self.requiredVariables:
                 var.dontCacheMe(recursive=False)
 
+    def _outputBuffer(self, shape, dtype):
+        """
+        Return the current value, for `_calcValue()` to overwrite, if
+        in-place recomputation is enabled and the value is an array of the
+        expected `shape` and `dtype`. Otherwise, return `None`.
+
+        Any array obtained from :attr:`value` is overwritten when the
+        `Variable` is recomputed in place, so in-place recomputation is only
+        enabled by :envvar:`FIPY_INPLACE` or the ``--inplace`` flag.
+
+            >>> a = Variable(value=(1., 2.))
+            >>> b = a * 2
+            >>> b.cacheMe()
+            >>> b._recomputeInPlace = True
+            >>> value = b.value
+            >>> b._outputBuffer(shape=(2,), dtype=numerix.dtype(float)) is value
+            True
+            >>> print b._outputBuffer(shape=(3,), dtype=numerix.dtype(float))
+            None
+            >>> print b._outputBuffer(shape=(2,), dtype=numerix.dtype(int))
+            None
+            >>> a.value = (3., 4.)
+            >>> print b.value is value, value
+            True [ 6.  8.]
+        """
+        value = self._value
+        if (self._recomputeInPlace 
+            and type(value) is type(numerix.array(1))
+            and value.shape == shape and value.dtype == dtype):
+            return value
+        else:
+            return None
+
     def _setValueInternal(self, value, unit=None, array=None):
         self._value = self._makeValue(value=value, unit=unit, array=array)
      
@@ -824,6 +972,9 @@ class Variable(object):
                                    _setSubscribedVariables)
         
     def __markStale(self):
+        profiler = Variable._profiler
+        if profiler is not None:
+            profiler._startPropagation(self)
         for subscriber in self.subscribedVariables:
             if subscriber() is not None:
                 ## Even though getSubscribedVariables() strips out dead 
@@ -833,14 +984,20 @@ class Variable(object):
                 ## dependencies of this subscriber. 
                 ## See <https://github.com/usnistgov/fipy/issues/103> for more explanation.
                 subscriber()._markStale()
+        if profiler is not None:
+            profiler._endPropagation(self)
                 
     def _markFresh(self):
         self.stale = 0
+        self._constrainedValue = None
         self.__markStale()
 
     def _markStale(self):
+        self._constrainedValue = None
         if not self.stale:
             self.stale = 1
+            if Variable._profiler is not None:
+                Variable._profiler._invalidated(self)
             self.__markStale()
             
     def _requires(self, var):
@@ -959,6 +1116,66 @@ class Variable(object):
 
         return argDict['result']
 
+    def _execVectorized(self):
+        """
+        Evaluates the same expression as `_execInline()` with array
+        operations, rather than compiled C. Like `_applyOp()`, it only
+        writes into the existing value when in-place recomputation is
+        enabled (see `_outputBuffer()`).
+
+            >>> from fipy.tools import inline
+            >>> backend = inline.backend
+            >>> inline.backend = 'numpy'
+            >>> a = Variable((1., 2., 3.))
+            >>> b = Variable((4., 5., 6.))
+            >>> c = (a * b + numerix.sin(a)**2) / b
+            >>> print numerix.allclose(c._execVectorized(),
+            ...                        (a.value * b.value + numerix.sin(a.value)**2) / b.value)
+            True
+
+        An array obtained from a cached result is left alone when it goes
+        stale
+
+            >>> c.cacheMe()
+            >>> value = c.value
+            >>> a.value = (3., 2., 1.)
+            >>> c.value is value
+            False
+            >>> print numerix.allclose(value[0], (1 * 4 + numerix.sin(1.)**2) / 4)
+            True
+            >>> print numerix.allclose(c.value[0], (3 * 4 + numerix.sin(3.)**2) / 4)
+            True
+
+        unless in-place recomputation is enabled
+
+            >>> c._recomputeInPlace = True
+            >>> value = c.value
+            >>> a.value = (1., 2., 3.)
+            >>> c.value is value
+            True
+            >>> print numerix.allclose(value[0], (1 * 4 + numerix.sin(1.)**2) / 4)
+            True
+            >>> inline.backend = backend
+        """
+        from fipy.tools import inline
+        argDict = {}
+        string = self._getCstring(argDict=argDict, freshen=True)
+        
+        try:
+            shape = self.opShape
+        except AttributeError:
+            shape = self.shape
+
+        # the result takes the type of the expression, so only a buffer
+        # of the type already computed can be reused
+        out = self._outputBuffer(shape, getattr(self._value, 'dtype', None))
+            
+        result = numerix.asarray(inline._evaluate(string, argDict, out=out))
+        if result.shape != shape:
+            result = result + numerix.zeros(shape, dtype=result.dtype)
+        
+        return result
+
     def _broadcastShape(self, other):
         ignore, ignore, broadcastshape = numerix._broadcastShapes(self.shape, numerix.getShape(other))
         
@@ -1005,8 +1222,15 @@ class Variable(object):
         baseClass = baseClass or self._variableClass
         return operatorVariable._OperatorVariableClass(baseClass=baseClass)
             
-    def _UnaryOperatorVariable(self, op, operatorClass=None, opShape=None, canInline=True, unit=None):
+    def _UnaryOperatorVariable(self, op, operatorClass=None, opShape=None, canInline=True, unit=None, ufunc=None):
         """
+        :Parameters:
+          - `op`: the operator function to apply (takes one argument for `self`)
+          - `operatorClass`: the `Variable` class that the unary operator should inherit from 
+          - `opShape`: the shape that should result from the operation
+          - `ufunc`: the element-wise NumPy ufunc that `op` applies, if any,
+            which lets the result be recomputed in place
+
         Check that unit works for unOp
 
             >>> (-Variable(value="1 m")).unit
@@ -1029,7 +1253,8 @@ class Variable(object):
             canInline = False
 
         return unOp(op=op, var=[self], opShape=opShape, canInline=canInline, unit=unit, 
-                    inlineComment=inline._operatorVariableComment(canInline=canInline))
+                    inlineComment=inline._operatorVariableComment(canInline=canInline),
+                    ufunc=ufunc)
 
     def _shapeClassAndOther(self, opShape, operatorClass, other):
         """
@@ -1049,13 +1274,27 @@ class Variable(object):
 
         return (opShape, baseClass, other)
         
-    def _BinaryOperatorVariable(self, op, other, operatorClass=None, opShape=None, canInline=True, unit=None):
+    def _BinaryOperatorVariable(self, op, other, operatorClass=None, opShape=None, canInline=True, unit=None, 
+                                ufunc=None, swapUfunc=False):
         """
         :Parameters:
           - `op`: the operator function to apply (takes two arguments for `self` and `other`)
           - `other`: the quantity to be operated with
           - `operatorClass`: the `Variable` class that the binary operator should inherit from 
           - `opShape`: the shape that should result from the operation
+          - `ufunc`: the element-wise NumPy ufunc that `op` applies, if any,
+            which lets the result be recomputed in place
+          - `swapUfunc`: whether `ufunc` takes `other` before `self`
+
+        Only the operators that name their `ufunc` can be recomputed in place
+
+            >>> a = Variable(value=(1., 2.))
+            >>> print (a * a).ufunc
+            <ufunc 'multiply'>
+            >>> print (2 - a).ufunc, (2 - a).swapUfunc
+            <ufunc 'subtract'> True
+            >>> print a._BinaryOperatorVariable(lambda x, y: x * y, a).ufunc
+            None
         """
         if not isinstance(other, Variable):
             from fipy.variables.constant import _Constant
@@ -1076,14 +1315,15 @@ class Variable(object):
         binOp = binaryOperatorVariable._BinaryOperatorVariable(operatorClass)
         
         return binOp(op=op, var=[self, other], opShape=opShape, canInline=canInline, unit=unit, 
-                     inlineComment=inline._operatorVariableComment(canInline=canInline))
+                     inlineComment=inline._operatorVariableComment(canInline=canInline),
+                     ufunc=ufunc, swapUfunc=swapUfunc)
     
     def __add__(self, other):
         from fipy.terms.term import Term
         if isinstance(other, Term):
             return other + self
         else:
-            return self._BinaryOperatorVariable(lambda a,b: a+b, other)
+            return self._BinaryOperatorVariable(lambda a,b: a+b, other, ufunc=numerix.add)
         
     __radd__ = __add__
 
@@ -1092,17 +1332,17 @@ class Variable(object):
         if isinstance(other, Term):
             return -other + self
         else:
-            return self._BinaryOperatorVariable(lambda a,b: a-b, other)
+            return self._BinaryOperatorVariable(lambda a,b: a-b, other, ufunc=numerix.subtract)
         
     def __rsub__(self, other):
-        return self._BinaryOperatorVariable(lambda a,b: b-a, other)
+        return self._BinaryOperatorVariable(lambda a,b: b-a, other, ufunc=numerix.subtract, swapUfunc=True)
             
     def __mul__(self, other):
         from fipy.terms.term import Term
         if isinstance(other, Term):
             return other * self
         else:
-            return self._BinaryOperatorVariable(lambda a,b: a*b, other)
+            return self._BinaryOperatorVariable(lambda a,b: a*b, other, ufunc=numerix.multiply)
 
     __rmul__ = __mul__
     
@@ -1110,23 +1350,23 @@ class Variable(object):
         return self._BinaryOperatorVariable(lambda a,b: numerix.fmod(a, b), other)
             
     def __pow__(self, other):
-        return self._BinaryOperatorVariable(lambda a,b: pow(a,b), other)
+        return self._BinaryOperatorVariable(lambda a,b: pow(a,b), other, ufunc=numerix.power)
             
     def __rpow__(self, other):
-        return self._BinaryOperatorVariable(lambda a,b: pow(b,a), other)
+        return self._BinaryOperatorVariable(lambda a,b: pow(b,a), other, ufunc=numerix.power, swapUfunc=True)
             
     def __truediv__(self, other):
-        return self._BinaryOperatorVariable(lambda a,b: a/b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a/b, other, ufunc=numerix.divide)
         
     __div__ = __truediv__
     
     def __rtruediv__(self, other):
-        return self._BinaryOperatorVariable(lambda a,b: b/a, other)
+        return self._BinaryOperatorVariable(lambda a,b: b/a, other, ufunc=numerix.divide, swapUfunc=True)
             
     __rdiv__ = __rtruediv__
     
     def __neg__(self):
-        return self._UnaryOperatorVariable(lambda a: -a)
+        return self._UnaryOperatorVariable(lambda a: -a, ufunc=numerix.negative)
         
     def __pos__(self):
         return self
@@ -1141,7 +1381,7 @@ class Variable(object):
             1.1
 
         """
-        return self._UnaryOperatorVariable(lambda a: numerix.fabs(a))
+        return self._UnaryOperatorVariable(lambda a: numerix.fabs(a), ufunc=numerix.fabs)
 
     def __invert__(self):
         """
@@ -1177,7 +1417,7 @@ class Variable(object):
             >>> 4 > Variable(value=3)
             (Variable(value=array(3)) < 4)
         """
-        return self._BinaryOperatorVariable(lambda a,b: a<b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a<b, other, ufunc=numerix.less)
 
     def __le__(self,other):
         """
@@ -1196,7 +1436,7 @@ class Variable(object):
             >>> print b()
             0
         """
-        return self._BinaryOperatorVariable(lambda a,b: a<=b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a<=b, other, ufunc=numerix.less_equal)
         
     def __eq__(self,other):
         """
@@ -1209,7 +1449,7 @@ class Variable(object):
             >>> b()
             0
         """
-        return self._BinaryOperatorVariable(lambda a,b: a==b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a==b, other, ufunc=numerix.equal)
         
     __hash__ = object.__hash__
     
@@ -1224,7 +1464,7 @@ class Variable(object):
             >>> b()
             1
         """
-        return self._BinaryOperatorVariable(lambda a,b: a!=b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a!=b, other, ufunc=numerix.not_equal)
         
     def __gt__(self,other):
         """
@@ -1240,7 +1480,7 @@ class Variable(object):
             >>> print b()
             1
         """
-        return self._BinaryOperatorVariable(lambda a,b: a>b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a>b, other, ufunc=numerix.greater)
         
     def __ge__(self,other):
         """
@@ -1259,7 +1499,7 @@ class Variable(object):
             >>> print b()
             1
         """
-        return self._BinaryOperatorVariable(lambda a,b: a>=b, other)
+        return self._BinaryOperatorVariable(lambda a,b: a>=b, other, ufunc=numerix.greater_equal)
 
     def __and__(self, other):
         """